@@ -0,0 +1,10 @@
+"""
+Micro-benchmarks for the bot hot paths.
+
+Every module in this package is a standalone script, run it from the project folder:
+
+python -m benchmarks.shanten_cache_key
+
+Hands for benchmarks are taken from the recorded games in system testing fixtures,
+so numbers are close to what we have in the real games.
+"""
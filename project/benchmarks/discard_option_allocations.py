@@ -0,0 +1,89 @@
+"""
+How many discard options, danger handlers and valuations are built during the bot turn,
+and the turn time with lazy discard options compared with options that build everything in the constructor
+(as it was before).
+
+For each recorded hand we emulate the bot turn: search of discard options and discard decision.
+All AI caches (including second level ukeire) are warmed up, so we see the cost of the decision logic itself.
+Decision logs are disabled as in bots battles, otherwise all options are serialized for the log.
+"""
+from optparse import OptionParser
+
+import game.ai.hand_builder as hand_builder_module
+from benchmarks.recorded_hands import load_recorded_hands, measure, print_results
+from game.ai.discard import DiscardOption
+from game.table import Table
+from utils.settings_handler import settings
+
+
+class CountingDiscardOption(DiscardOption):
+    __slots__ = ()
+
+    counts = {"options": 0, "dangers": 0, "valuations": 0}
+
+    def __init__(self, *args, **kwargs):
+        CountingDiscardOption.counts["options"] += 1
+        super().__init__(*args, **kwargs)
+
+    @property
+    def danger(self):
+        if self._danger is None:
+            CountingDiscardOption.counts["dangers"] += 1
+        return DiscardOption.danger.fget(self)
+
+    def calculate_valuation(self):
+        CountingDiscardOption.counts["valuations"] += 1
+        super().calculate_valuation()
+
+
+class EagerDiscardOption(DiscardOption):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.danger
+        self.calculate_valuation()
+
+
+def play_turns(player, hands, discard_option_class):
+    hand_builder_module.DiscardOption = discard_option_class
+    try:
+        results = []
+        for hand in hands:
+            player.tiles = hand[:]
+            results.append(player.ai.hand_builder.choose_tile_to_discard().tile_to_discard_136)
+        return results
+    finally:
+        hand_builder_module.DiscardOption = DiscardOption
+
+
+def main(number_of_hands):
+    settings.PRINT_LOGS = False
+    hands = load_recorded_hands(number_of_hands)
+    print(f"Recorded hands: {len(hands)}")
+
+    player = Table().player
+
+    # warm up AI caches and check that decisions are the same
+    expected = play_turns(player, hands, EagerDiscardOption)
+    assert play_turns(player, hands, DiscardOption) == expected
+
+    play_turns(player, hands, CountingDiscardOption)
+    counts = CountingDiscardOption.counts
+    print(f"Discard options per turn: {counts['options'] / len(hands):.1f}")
+    print(f"  danger handlers built: {counts['dangers'] / len(hands):.1f}")
+    print(f"  valuations calculated: {counts['valuations'] / len(hands):.1f}")
+
+    results = []
+    for name, discard_option_class in [("eager options", EagerDiscardOption), ("lazy options", DiscardOption)]:
+        seconds = measure(lambda: play_turns(player, hands, discard_option_class), repeat=3)
+        results.append((name, seconds, len(hands)))
+    print_results("Discard decision:", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=300, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
@@ -0,0 +1,65 @@
+"""
+Compare discard options search with default shanten calculator (discards are checked one by one)
+and with the table based calculator (the whole discard x draw shanten matrix is calculated at once).
+
+Shanten cache is erased before each hand, to see the cost of the first search for the hand.
+"""
+from optparse import OptionParser
+
+from benchmarks.recorded_hands import load_recorded_hands, measure, print_results
+from game.ai.configs.default import BotDefaultConfig
+from game.ai.helpers.shanten import TableShanten
+from game.table import Table
+from mahjong.shanten import Shanten
+from mahjong.tile import TilesConverter
+
+
+class TableShantenConfig(BotDefaultConfig):
+    SHANTEN_CALCULATOR_CLASS = TableShanten
+
+
+def find_discard_options(player, hands):
+    results = []
+    for hand in hands:
+        player.tiles = hand[:]
+        player.ai.hand_cache_shanten.clear()
+        discard_options, _ = player.ai.hand_builder.find_discard_options()
+        results.append([(x.tile_to_discard_136, x.shanten, x.waiting, x.ukeire) for x in discard_options])
+    return results
+
+
+def main(number_of_hands):
+    hands_136 = load_recorded_hands(number_of_hands)
+    print(f"Recorded hands: {len(hands_136)}")
+
+    shanten = Shanten()
+    hands_by_shanten = {}
+    for hand in hands_136:
+        hand_shanten = min(shanten.calculate_shanten_for_regular_hand(TilesConverter.to_34_array(hand)), 4)
+        hands_by_shanten.setdefault(hand_shanten, []).append(hand)
+
+    players = [
+        ("default", Table().player),
+        ("table matrix", Table(TableShantenConfig()).player),
+    ]
+
+    for hand_shanten in sorted(hands_by_shanten.keys()):
+        hands = hands_by_shanten[hand_shanten]
+
+        expected = find_discard_options(players[0][1], hands)
+        for name, player in players:
+            assert find_discard_options(player, hands) == expected, f"{name} discard options are different"
+
+        results = []
+        for name, player in players:
+            seconds = measure(lambda: find_discard_options(player, hands), repeat=3)
+            results.append((name, seconds, len(hands)))
+        print_results(f"Hands with shanten {hand_shanten}{hand_shanten == 4 and '+' or ''}:", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=300, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
@@ -0,0 +1,94 @@
+"""
+Accuracy and speed of the approximate hand value estimator compared with the exact hand calculator.
+
+For each recorded hand we take tempai discard options and estimate the cost of each wait
+(tsumo and ron, with and without riichi for closed hands).
+Also we check how often both calculators choose the same discard by cost_x_ukeire.
+"""
+import random
+from optparse import OptionParser
+
+from benchmarks.recorded_hands import load_recorded_hands, measure
+from game.table import Table
+
+
+def main(number_of_hands):
+    rand = random.Random(42)
+
+    cases = []
+    choices = []
+    for hand in load_recorded_hands(number_of_hands):
+        table = Table()
+        player = table.player
+        table.add_dora_indicator(rand.choice([x for x in range(0, 136) if x not in hand]))
+        player.tiles = hand[:]
+
+        options, _ = player.ai.hand_builder.find_discard_options()
+        options = [x for x in options if x.shanten == 0]
+        if not options:
+            continue
+
+        hand_cases = []
+        for option in options:
+            tiles = hand[:]
+            tiles.remove(option.tile_to_discard_136)
+            for waiting in option.waiting:
+                for call_riichi in player.is_open_hand and [False] or [False, True]:
+                    for is_tsumo in [False, True]:
+                        hand_cases.append((player, option, waiting, tiles, is_tsumo, call_riichi))
+        cases.extend(hand_cases)
+
+        if len(options) > 1:
+            choices.append((player, options))
+
+    estimator_results = []
+    exact_results = []
+    for player, _, waiting, tiles, is_tsumo, call_riichi in cases:
+        estimator_results.append(player.ai.hand_value_estimator.estimate_cost(waiting, tiles, is_tsumo, call_riichi))
+        exact_results.append(_exact_cost(player, waiting, tiles, is_tsumo, call_riichi))
+
+    count = len(cases)
+    estimated = [(x, y) for x, y in zip(estimator_results, exact_results) if x is not None]
+    print(f"Tempai waits to estimate: {count}")
+    print(f"  ambiguous (exact calculator is used): {count - len(estimated)} ({(count - len(estimated)) / count:.1%})")
+    print(f"  estimated: {len(estimated)}")
+    print(f"  same cost: {len([x for x in estimated if x[0] == x[1]]) / len(estimated):.1%}")
+    print(f"  estimated cost is lower: {len([x for x in estimated if x[0] < x[1]]) / len(estimated):.1%}")
+    print(f"  estimated cost is higher: {len([x for x in estimated if x[0] > x[1]]) / len(estimated):.1%}")
+    relative_errors = [abs(x - y) / y for x, y in estimated if y]
+    print(f"  mean relative error: {sum(relative_errors) / len(relative_errors):.1%}")
+
+    same_choice = 0
+    for player, options in choices:
+        exact_best = max(options, key=lambda x: player.ai.hand_builder._estimate_cost_x_ukeire(x, False)[0])
+        approximate_best = max(
+            options, key=lambda x: player.ai.hand_builder._estimate_cost_x_ukeire(x, False, approximate=True)[0]
+        )
+        same_choice += exact_best.tile_to_discard_34 == approximate_best.tile_to_discard_34
+    print(f"Hands with several tempai discards: {len(choices)}, same best discard: {same_choice / len(choices):.1%}")
+
+    def run_estimator():
+        for player, _, waiting, tiles, is_tsumo, call_riichi in cases:
+            player.ai.hand_value_estimator.estimate_cost(waiting, tiles, is_tsumo, call_riichi)
+
+    def run_exact():
+        for player, _, waiting, tiles, is_tsumo, call_riichi in cases:
+            player.ai.hand_cache_estimation.clear()
+            _exact_cost(player, waiting, tiles, is_tsumo, call_riichi)
+
+    estimator_seconds = measure(run_estimator, repeat=3)
+    exact_seconds = measure(run_exact, repeat=3)
+    print(f"Exact calculator: {exact_seconds / count * 1_000_000:.1f}us/call")
+    print(f"Estimator: {estimator_seconds / count * 1_000_000:.1f}us/call")
+
+
+def _exact_cost(player, waiting, tiles, is_tsumo, call_riichi):
+    return player.ai.hand_builder._estimate_hand_cost(waiting, tiles, call_riichi, is_tsumo, approximate=False) or 0
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=1000, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
@@ -0,0 +1,86 @@
+"""
+Compare player turn with cached hand views (closed hand, meld tiles, meld 34 tiles and open hand flag)
+and with views that are built from scratch on each access (as it was before).
+
+For each recorded hand we emulate the bot turn: search of discard options and discard decision.
+All AI caches (including second level ukeire) are warmed up, so we see the cost of the decision logic itself.
+"""
+from optparse import OptionParser
+
+from benchmarks.recorded_hands import load_recorded_hands, measure, print_results
+from game.player import Player
+from game.table import Table
+
+
+class UncachedViewsPlayer(Player):
+    views_accesses = 0
+
+    @property
+    def is_open_hand(self):
+        UncachedViewsPlayer.views_accesses += 1
+        opened_melds = [x for x in self.melds if x.opened]
+        return len(opened_melds) > 0
+
+    @property
+    def closed_hand(self):
+        UncachedViewsPlayer.views_accesses += 1
+        tiles = self.tiles[:]
+        return [item for item in tiles if item not in self.meld_tiles]
+
+    @property
+    def meld_tiles(self):
+        UncachedViewsPlayer.views_accesses += 1
+        result = []
+        for meld in self.melds:
+            result.extend(meld.tiles)
+        return result
+
+    @property
+    def meld_34_tiles(self):
+        UncachedViewsPlayer.views_accesses += 1
+        melds = [x.tiles[:] for x in self.melds]
+        results = []
+        for meld in melds:
+            meld_34 = [meld[0] // 4, meld[1] // 4, meld[2] // 4]
+            if len(meld) > 3:
+                meld_34.append(meld[3] // 4)
+            results.append(meld_34)
+        return results
+
+
+def play_turns(player, hands):
+    results = []
+    for hand in hands:
+        player.tiles = hand[:]
+        results.append(player.ai.hand_builder.choose_tile_to_discard().tile_to_discard_136)
+    return results
+
+
+def main(number_of_hands):
+    hands = load_recorded_hands(number_of_hands)
+    print(f"Recorded hands: {len(hands)}")
+
+    cached_player = Table().player
+    uncached_player = Table().player
+    uncached_player.__class__ = UncachedViewsPlayer
+
+    # warm up AI caches and check that decisions are the same
+    assert play_turns(cached_player, hands) == play_turns(uncached_player, hands)
+
+    UncachedViewsPlayer.views_accesses = 0
+    play_turns(uncached_player, hands)
+    print(f"Hand views accesses per turn: {UncachedViewsPlayer.views_accesses / len(hands):.1f}")
+
+    results = []
+    for name, player in [("uncached views", uncached_player), ("cached views", cached_player)]:
+        seconds = measure(lambda: play_turns(player, hands), repeat=3)
+        results.append((name, seconds, len(hands)))
+    print_results("Discard decision:", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=300, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
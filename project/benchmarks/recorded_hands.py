@@ -0,0 +1,99 @@
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, List
+
+from mahjong.tile import TilesConverter
+
+fixtures_folder = Path(__file__).parent.parent.absolute() / "system_testing" / "fixtures"
+
+DRAW_TAGS = "TUVW"
+DISCARD_TAGS = "DEFG"
+
+
+def load_recorded_hands(limit=None) -> List[List[int]]:
+    """
+    Return closed 14 tiles hands (136 format) that players had after each draw in the recorded games.
+    We stop following player hand after the first called meld, since we need only closed hands here.
+    """
+    hands = []
+    for log_path in sorted(fixtures_folder.glob("*.txt")):
+        hands.extend(_load_hands_from_log(log_path))
+        if limit and len(hands) >= limit:
+            return hands[:limit]
+    return hands
+
+
+def _load_hands_from_log(log_path):
+    hands = []
+    players_tiles = [None, None, None, None]
+    for tag in ET.parse(log_path).getroot():
+        if tag.tag == "INIT":
+            players_tiles = [[int(x) for x in tag.attrib[f"hai{seat}"].split(",")] for seat in range(0, 4)]
+            continue
+
+        if tag.tag == "N":
+            # we are not interested in open hands
+            players_tiles[int(tag.attrib["who"])] = None
+            continue
+
+        name = tag.tag
+        if len(name) < 2 or not name[1:].isdigit():
+            continue
+
+        tile = int(name[1:])
+        if name[0] in DRAW_TAGS:
+            tiles = players_tiles[DRAW_TAGS.index(name[0])]
+            if tiles is not None:
+                tiles.append(tile)
+                hands.append(sorted(tiles))
+        elif name[0] in DISCARD_TAGS:
+            tiles = players_tiles[DISCARD_TAGS.index(name[0])]
+            if tiles is not None:
+                tiles.remove(tile)
+    return hands
+
+
+def prepare_hands_for_waits(hands_136):
+    """
+    Return all 34 arrays that would be checked for shanten during discard options search
+    """
+    hands_34 = []
+    for hand_136 in hands_136:
+        tiles_34 = TilesConverter.to_34_array(hand_136)
+        for discard_34 in range(0, 34):
+            if not tiles_34[discard_34]:
+                continue
+
+            tiles_34[discard_34] -= 1
+            hands_34.append(tiles_34[:])
+            for draw_34 in range(0, 34):
+                if tiles_34[draw_34] == 4:
+                    continue
+                tiles_34[draw_34] += 1
+                hands_34.append(tiles_34[:])
+                tiles_34[draw_34] -= 1
+            tiles_34[discard_34] += 1
+    return hands_34
+
+
+def measure(function: Callable, repeat=5) -> float:
+    """
+    Return the best time (in seconds) from several runs of the function
+    """
+    results = []
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        function()
+        results.append(time.perf_counter() - start)
+    return min(results)
+
+
+def print_results(title, results):
+    print(title)
+    baseline = None
+    for name, seconds, count in results:
+        if baseline is None:
+            baseline = seconds
+        per_call = seconds / count * 1_000_000
+        print(f"  {name:<30} {seconds:8.3f}s  {per_call:8.3f}us/call  x{baseline / seconds:.2f}")
@@ -0,0 +1,65 @@
+"""
+Compare shanten cache key schemes on the hands from recorded games.
+
+For each hand we build keys in the same way as HandBuilder.calculate_waits does it:
+for each discard candidate and for each possible draw.
+"""
+import hashlib
+import marshal
+from optparse import OptionParser
+from typing import List
+
+from benchmarks.recorded_hands import load_recorded_hands, measure, prepare_hands_for_waits, print_results
+from utils.cache import build_shanten_cache_key
+
+
+def build_md5_shanten_cache_key(tiles_34: List[int], use_chiitoitsu: bool):
+    """
+    Previous version of the key, we keep it here only for comparison
+    """
+    prepared_array = tiles_34 + [int(use_chiitoitsu)]
+    return hashlib.md5(marshal.dumps(prepared_array)).hexdigest()
+
+
+def main(number_of_hands):
+    hands_136 = load_recorded_hands(number_of_hands)
+    hands_34 = prepare_hands_for_waits(hands_136)
+    count = len(hands_34)
+    print(f"Recorded hands: {len(hands_136)}, shanten lookups: {count}")
+
+    key_builders = [
+        ("md5(marshal)", build_md5_shanten_cache_key),
+        ("packed int", build_shanten_cache_key),
+    ]
+
+    results = []
+    for name, key_builder in key_builders:
+        seconds = measure(lambda: [key_builder(x, True) for x in hands_34])
+        results.append((name, seconds, count))
+    print_results("Key building:", results)
+
+    results = []
+    for name, key_builder in key_builders:
+        cache = {}
+        for x in hands_34:
+            cache[key_builder(x, True)] = 0
+        # keys have to be unique for both schemes
+        print(f"  {name:<30} unique keys: {len(cache)}")
+
+        def lookup():
+            for x in hands_34:
+                key = key_builder(x, True)
+                if key in cache:
+                    cache[key]
+
+        seconds = measure(lookup)
+        results.append((name, seconds, count))
+    print_results("Cache hits (key building + lookup):", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=500, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
@@ -0,0 +1,41 @@
+"""
+Compare default shanten calculator with the table based one on the hands from recorded games.
+
+Hands are the same that HandBuilder.calculate_waits checks: for each discard candidate and for each possible draw.
+"""
+from optparse import OptionParser
+
+from benchmarks.recorded_hands import load_recorded_hands, measure, prepare_hands_for_waits, print_results
+from game.ai.helpers.shanten import TableShanten
+from mahjong.shanten import Shanten
+
+
+def main(number_of_hands):
+    hands_136 = load_recorded_hands(number_of_hands)
+    hands_34 = prepare_hands_for_waits(hands_136)
+    count = len(hands_34)
+    print(f"Recorded hands: {len(hands_136)}, shanten calculations: {count}")
+
+    calculators = [
+        ("default", Shanten()),
+        ("table", TableShanten()),
+    ]
+
+    expected = [calculators[0][1].calculate_shanten_for_regular_hand(x) for x in hands_34]
+    for name, calculator in calculators:
+        results = [calculator.calculate_shanten_for_regular_hand(x) for x in hands_34]
+        assert results == expected, f"{name} calculator results are different"
+
+    results = []
+    for name, calculator in calculators:
+        seconds = measure(lambda: [calculator.calculate_shanten_for_regular_hand(x) for x in hands_34], repeat=3)
+        results.append((name, seconds, count))
+    print_results("Regular hand shanten:", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hands", type="int", default=100, help="Number of recorded hands to use")
+    opts, _ = parser.parse_args()
+
+    main(opts.hands)
@@ -0,0 +1,100 @@
+"""
+Bots battle simulator overhead for walls: wall generation, dealing, draws and dora indicators of one hanchan.
+The wall with cursors is compared with the wall that was sliced and copied on each draw (as it was before).
+
+Bots decisions are not included, we emulate rounds where all live wall tiles are drawn
+and each second round has a kan with rinshan draw and kan dora.
+"""
+from optparse import OptionParser
+
+from benchmarks.recorded_hands import measure, print_results
+from game.bots_battle.game_manager import GameManager
+from game.bots_battle.wall import Wall
+
+ROUNDS_PER_HANCHAN = 10
+
+
+class SlicedWall:
+    """
+    Remaining tiles are copied to the new list on each draw
+    """
+
+    def __init__(self, tiles):
+        self.tiles = tiles
+        self.dead_wall = self._cut_tiles(Wall.DEAD_WALL_SIZE)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def draw_tile(self):
+        return self._cut_tiles(1)[0]
+
+    def draw_tiles(self, count_of_tiles):
+        return self._cut_tiles(count_of_tiles)
+
+    def draw_rinshan_tile(self):
+        return self._cut_tiles(1)[0]
+
+    def dora_indicator(self, number):
+        return self.dead_wall[Wall.DORA_INDICATOR_INDEX + number]
+
+    def _cut_tiles(self, count_of_tiles):
+        result = self.tiles[0:count_of_tiles]
+        self.tiles = self.tiles[count_of_tiles : len(self.tiles)]
+        return result
+
+
+def play_hanchans(manager, wall_class, number_of_hanchans):
+    drawn_tiles = 0
+    for _ in range(0, number_of_hanchans):
+        for round_number in range(0, ROUNDS_PER_HANCHAN):
+            manager.round_number = round_number
+            wall = wall_class(manager._generate_wall())
+            dora_indicators = [wall.dora_indicator(0)]
+
+            hands = [[], [], [], []]
+            for _ in range(0, 3):
+                for hand in hands:
+                    hand += wall.draw_tiles(4)
+            for hand in hands:
+                hand += wall.draw_tiles(1)
+
+            while len(wall):
+                drawn_tiles += 1
+                wall.draw_tile()
+                if round_number % 2 == 0 and len(wall) == 30:
+                    wall.draw_rinshan_tile()
+                    dora_indicators.append(wall.dora_indicator(len(dora_indicators)))
+    return drawn_tiles
+
+
+def main(number_of_hanchans):
+    manager = GameManager([], "", "", seed_value=1)
+
+    # check that both walls give the same tiles without kans
+    for round_number in range(0, ROUNDS_PER_HANCHAN):
+        manager.round_number = round_number
+        sliced_wall = SlicedWall(manager._generate_wall())
+        wall = Wall(manager._generate_wall())
+        assert sliced_wall.dead_wall == wall.dead_wall
+        assert sliced_wall.draw_tiles(52) == wall.draw_tiles(52)
+        assert [sliced_wall.draw_tile() for _ in range(len(sliced_wall))] == [
+            wall.draw_tile() for _ in range(len(wall))
+        ]
+
+    drawn_tiles = play_hanchans(manager, Wall, 1)
+    print(f"Hanchans: {number_of_hanchans}, draws per hanchan: {drawn_tiles}")
+
+    results = []
+    for name, wall_class in [("sliced wall", SlicedWall), ("wall with cursors", Wall)]:
+        seconds = measure(lambda: play_hanchans(manager, wall_class, number_of_hanchans), repeat=3)
+        results.append((name, seconds, number_of_hanchans))
+    print_results("Walls overhead per hanchan:", results)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("-n", "--hanchans", type="int", default=300, help="Number of hanchans to emulate")
+    opts, _ = parser.parse_args()
+
+    main(opts.hanchans)
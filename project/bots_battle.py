@@ -2,13 +2,16 @@ import datetime
 import logging
 import os
 import random
+from multiprocessing import Pool
 from optparse import OptionParser
 
-import game.bots_battle
 from game.bots_battle.battle_config import BattleConfig
+from game.bots_battle.battle_summary import build_battle_summary
 from game.bots_battle.game_manager import GameManager
 from game.bots_battle.local_client import LocalClient
-from tqdm import trange
+from game.bots_battle.sequential_test import PlacementSequentialTest
+from tqdm import tqdm
+from utils.cache import SHARED_AGARI_CACHE, SHARED_SHANTEN_CACHE, enable_shared_caches, get_shared_cache
 from utils.logger import DATE_FORMAT, LOG_FORMAT
 from utils.settings_handler import settings
 
@@ -19,7 +22,11 @@ if not os.path.exists(battle_results_folder):
     os.mkdir(battle_results_folder)
 
 
-def main(number_of_games, print_logs):
+def main(number_of_games, print_logs, shared_cache=False, workers=1, duplicate=False, sequential_test=None):
+    """
+    :param sequential_test: PlacementSequentialTest, games are stopped when it is finished,
+    number of games is the maximum number of games then
+    """
     seeds = []
     seed_file = "seeds.txt"
     if os.path.exists(seed_file):
@@ -27,42 +34,192 @@ def main(number_of_games, print_logs):
             seeds = f.read().split("\n")
             seeds = [int(x.strip()) for x in seeds if x.strip()]
 
-    replays_directory = os.path.join(battle_results_folder, "replays")
-    if not os.path.exists(replays_directory):
-        os.mkdir(replays_directory)
-
-    for i in trange(number_of_games):
+    # all seeds are chosen before the start,
+    # so the game results don't depend on the number of workers and the games order
+    games = []
+    for i in range(0, number_of_games):
         if i < len(seeds):
             seed_value = seeds[i]
         else:
             seed_value = random.getrandbits(64)
 
-        replay_name = GameManager.generate_replay_name()
+        # in duplicate mode each seed is played with all seats rotations,
+        # so each bot plays with each wall from each seat
+        for seat_rotation in duplicate and range(0, 4) or [0]:
+            games.append((len(games), seed_value, seat_rotation))
+
+    replays_directory = os.path.join(battle_results_folder, "replays")
+    if not os.path.exists(replays_directory):
+        os.mkdir(replays_directory)
+
+    if workers > 1:
+        initargs = (replays_directory, print_logs, shared_cache, settings.PRINT_LOGS)
+        with Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            # imap returns results in the games order
+            # not started games are terminated with the pool when the sequential test is finished
+            results = _collect_results(pool.imap(_play_worker_game, games), len(games), sequential_test)
+    else:
+        if shared_cache:
+            enable_shared_caches()
+
+        games_results = (
+            play_game(game_number, seed_value, seat_rotation, replays_directory, print_logs, shared_cache)
+            for game_number, seed_value, seat_rotation in games
+        )
+        results = _collect_results(games_results, len(games), sequential_test)
+
+    if shared_cache:
+        _print_shared_caches_report(results)
+
+    _print_summary(results)
+    if sequential_test:
+        _print_lines(sequential_test.build_report())
+
+
+def _collect_results(games_results, number_of_games, sequential_test):
+    results = []
+    progress = tqdm(games_results, total=number_of_games)
+    for result in progress:
+        results.append(result)
+
+        if sequential_test:
+            sequential_test.add_result(result)
+            progress.set_postfix_str(sequential_test.progress())
+            if sequential_test.is_finished:
+                break
+    progress.close()
+    return results
+
+
+def play_game(game_number, seed_value, seat_rotation, replays_directory, print_logs, shared_cache=False):
+    """
+    Play one hanchan with the seed and return its result
+    """
+    replay_name = GameManager.generate_replay_name()
+
+    clients = [
+        LocalClient(BattleConfig.CLIENTS_CONFIGS[x](), print_logs, replay_name, game_number) for x in range(0, 4)
+    ]
+    manager = GameManager(clients, replays_directory, replay_name, seed_value, seat_rotation)
+
+    crashed = False
+    try:
+        manager.play_game()
+    except Exception as e:
+        crashed = True
+        manager.replay.save_failed_log()
+        logger.error(f"Hanchan seed={seed_value} crashed", exc_info=e)
+
+    result = {
+        "game_number": game_number,
+        "seed": seed_value,
+        "seat_rotation": seat_rotation,
+        "replay_name": replay_name,
+        "crashed": crashed,
+        "rounds": manager.round_number,
+        "players": [],
+        "shared_caches": None,
+    }
+    if not crashed:
+        result["players"] = [
+            {
+                "name": x.player.name,
+                "position": x.player.position,
+                "scores": x.player.scores,
+                "wins": x.number_of_wins,
+                "deal_ins": x.number_of_deal_ins,
+            }
+            for x in clients
+        ]
+    if shared_cache:
+        # caches are shared only inside the process, so we remember whose stats they are
+        result["shared_caches"] = (
+            os.getpid(),
+            {x: get_shared_cache(x).stats() for x in [SHARED_SHANTEN_CACHE, SHARED_AGARI_CACHE]},
+        )
+    return result
+
+
+# worker process state, it is set by the pool initializer
+_worker_options = None
+
+
+def _init_worker(replays_directory, print_logs, shared_cache, print_bot_logs):
+    global _worker_options
+    _worker_options = (replays_directory, print_logs, shared_cache)
+
+    # forked worker has the same random state as other workers,
+    # replay names are random, so they could be the same without it
+    random.seed()
+
+    _set_up_settings(print_bot_logs)
+    if shared_cache:
+        enable_shared_caches()
+
+    # each worker writes to its own log file
+    _set_up_bots_battle_game_logger(f"_worker_{os.getpid()}")
+
 
-        clients = [LocalClient(BattleConfig.CLIENTS_CONFIGS[x](), print_logs, replay_name, i) for x in range(0, 4)]
-        manager = GameManager(clients, replays_directory, replay_name)
+def _play_worker_game(game_with_seed):
+    game_number, seed_value, seat_rotation = game_with_seed
+    replays_directory, print_logs, shared_cache = _worker_options
+    return play_game(game_number, seed_value, seat_rotation, replays_directory, print_logs, shared_cache)
 
-        try:
-            game.bots_battle.game_manager.shuffle_seed = lambda: seed_value
-            manager.play_game()
-        except Exception as e:
-            manager.replay.save_failed_log()
-            logger.error(f"Hanchan seed={seed_value} crashed", exc_info=e)
 
+def _print_summary(results):
+    _print_lines(build_battle_summary(results))
 
-def _set_up_bots_battle_game_logger():
+
+def _print_lines(lines):
+    for line in lines:
+        logger.info(line)
+        print(line)
+
+
+def _print_shared_caches_report(results):
+    # each process has its own caches with cumulative stats, so we need the latest stats of each process
+    processes_stats = {}
+    for result in results:
+        pid, stats = result["shared_caches"]
+        processes_stats[pid] = stats
+
+    for name in [SHARED_SHANTEN_CACHE, SHARED_AGARI_CACHE]:
+        stats = {"hits": 0, "misses": 0, "shared_hits": 0, "evictions": 0}
+        for process_stats in processes_stats.values():
+            for key in stats.keys():
+                stats[key] += process_stats[name][key]
+        lookups = stats["hits"] + stats["misses"]
+        saved = lookups and stats["shared_hits"] / lookups * 100 or 0
+        message = (
+            f"Shared {name} cache: {lookups} lookups, {stats['hits']} hits, "
+            f"{stats['shared_hits']} calculations saved by sharing ({saved:.1f}%), {stats['evictions']} evictions"
+        )
+        logger.info(message)
+        print(message)
+
+
+def _set_up_settings(print_logs):
+    settings.FIVE_REDS = True
+    settings.OPEN_TANYAO = True
+    settings.PRINT_LOGS = print_logs
+
+
+def _set_up_bots_battle_game_logger(suffix=""):
     logs_directory = os.path.join(battle_results_folder, "logs")
     if not os.path.exists(logs_directory):
         os.mkdir(logs_directory)
 
     formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
-    file_name = f"{datetime.datetime.now().strftime('%Y-%m-%d_%H_%M_%S')}.log"
+    file_name = f"{datetime.datetime.now().strftime('%Y-%m-%d_%H_%M_%S')}{suffix}.log"
     fh = logging.FileHandler(os.path.join(logs_directory, file_name), encoding="utf-8")
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(formatter)
 
     logger = logging.getLogger("game")
     logger.setLevel(logging.DEBUG)
+    # forked worker inherits the coordinator handler
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
     logger.addHandler(fh)
 
 
@@ -82,13 +239,57 @@ if __name__ == "__main__":
         action="store_true",
         help="Enable logs for bots, use it only for debug, not for live games",
     )
+    parser.add_option(
+        "--shared-cache",
+        action="store_true",
+        help="Share shanten and agari caches between all bots in the process",
+    )
+    parser.add_option(
+        "-w",
+        "--workers",
+        type="int",
+        default=1,
+        help="Number of processes to play games in parallel, each of them writes its own logs",
+    )
+    parser.add_option(
+        "--duplicate",
+        action="store_true",
+        help="Play each seed four times with rotated seats, number of games is the number of seeds then",
+    )
+    parser.add_option(
+        "--sprt",
+        type="string",
+        help="Names of two bots to compare, e.g. Ichihime,Kaavi. "
+        "Games are stopped when the difference is found or rejected, number of games is the maximum then",
+    )
+    parser.add_option(
+        "--sprt-delta",
+        type="float",
+        default=3.0,
+        help="Placement points difference we are looking for (1st +30, 2nd +10, 3rd -10, 4th -30)",
+    )
+    parser.add_option(
+        "--confidence",
+        type="float",
+        default=0.95,
+        help="Confidence of the sequential test result and the printed intervals",
+    )
     opts, _ = parser.parse_args()
 
-    settings.FIVE_REDS = True
-    settings.OPEN_TANYAO = True
-    settings.PRINT_LOGS = False
+    sequential_test = None
+    if opts.sprt:
+        bots = opts.sprt.split(",")
+        bots_names = [x.name for x in BattleConfig.CLIENTS_CONFIGS]
+        if len(bots) != 2 or any([x not in bots_names for x in bots]):
+            parser.error(f"--sprt should have two names from battle config: {', '.join(bots_names)}")
+        sequential_test = PlacementSequentialTest(
+            bots[0],
+            bots[1],
+            games_per_seed=opts.duplicate and 4 or 1,
+            delta=opts.sprt_delta,
+            confidence=opts.confidence,
+        )
 
-    if opts.logs:
-        settings.PRINT_LOGS = True
+    _set_up_settings(bool(opts.logs))
 
-    main(opts.games, opts.logs)
+    main(opts.games, opts.logs, opts.shared_cache, opts.workers, opts.duplicate, sequential_test)
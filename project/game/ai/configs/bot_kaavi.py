@@ -3,3 +3,6 @@ from game.ai.configs.default import BotDefaultConfig
 
 class KaaviConfig(BotDefaultConfig):
     name = "Kaavi"
+
+    # compare with other bots in the bots battle before enabling it by default
+    FEATURE_APPROXIMATE_SECOND_LEVEL_COST = True
@@ -1,5 +1,8 @@
 from game.ai.configs.default import BotDefaultConfig
+from game.ai.helpers.shanten import TableShanten
 
 
 class XeniaConfig(BotDefaultConfig):
     name = "Xenia"
+
+    SHANTEN_CALCULATOR_CLASS = TableShanten
@@ -1,3 +1,4 @@
+from game.ai.helpers.shanten import ShantenCalculator
 from game.ai.open_hand import OpenHandHandler
 from game.ai.placement import PlacementHandler
 from game.ai.riichi import Riichi
@@ -7,10 +8,25 @@ class BotDefaultConfig:
     # all features that we are testing should starts with FEATURE_ prefix
     # with that it will be easier to track these flags usage over the code
     FEATURE_DEFENCE_ENABLED = True
+    # use approximate hand cost to compare 1-shanten discards by their second level tempai costs
+    FEATURE_APPROXIMATE_SECOND_LEVEL_COST = False
 
     PLACEMENT_HANDLER_CLASS = PlacementHandler
     OPEN_HAND_HANDLER_CLASS = OpenHandHandler
     RIICHI_HANDLER_CLASS = Riichi
+    # game.ai.helpers.shanten.TableShanten can be used here as a faster alternative,
+    # it gives the same results but keeps the suits table (~20MB) in memory
+    SHANTEN_CALCULATOR_CLASS = ShantenCalculator
+
+    # max number of items in AI caches, caches live as long as the bot instance and survive between rounds.
+    # Shanten and agari sizes are not used when shared caches are enabled (see utils.cache.enable_shared_caches)
+    SHANTEN_CACHE_SIZE = 50000
+    AGARI_CACHE_SIZE = 5000
+    HAND_VALUE_CACHE_SIZE = 5000
+
+    # time budget in seconds for one discard decision (call to meld is one decision for all meld candidates),
+    # when it is over we stop to calculate second level ukeire for less promising options. None means no limit
+    DISCARD_TIME_BUDGET = None
 
     TUNE_DANGER_BORDER_TEMPAI_VALUE = 0
     TUNE_DANGER_BORDER_1_SHANTEN_VALUE = 0
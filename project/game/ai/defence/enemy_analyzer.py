@@ -9,16 +9,24 @@ from game.ai.defence.yaku_analyzer.yakuhai import YakuhaiAnalyzer
 from game.ai.helpers.defence import EnemyDanger, TileDanger
 from game.ai.helpers.possible_forms import PossibleFormsAnalyzer
 from game.ai.statistics_collector import StatisticsCollector
+from mahjong.constants import AKA_DORA_LIST
 from mahjong.meld import Meld
-from mahjong.tile import TilesConverter
-from mahjong.utils import is_honor, is_terminal, plus_dora
-from utils.general import separate_tiles_by_suits
+from mahjong.utils import is_honor, is_terminal
 
 
 class EnemyAnalyzer:
     enemy = None
     threat_reason = None
 
+    # threat analysis result and enemy state it was calculated for
+    _is_threatening = False
+    _threat_state_key = None
+    # assumed hand cost for each tile (see _get_hand_cost_index) and table state it was calculated for
+    _hand_costs = None
+    _hand_costs_key = None
+    # part of riichi hand statistics that is the same for all tiles, calculated for the same table state
+    _riichi_hand_stat = None
+
     RIICHI_COST_SCALE = [2000, 3900, 5200, 8000, 8000, 12000, 12000, 16000, 16000, 32000]
     RIICHI_DEALER_COST_SCALE = [2900, 5800, 7700, 12000, 12000, 18000, 18000, 24000, 24000, 48000]
 
@@ -30,6 +38,16 @@ class EnemyAnalyzer:
         self.main_player = self.table.player
         self.possible_forms_analyzer = PossibleFormsAnalyzer(self.main_player)
 
+        # yaku analyzers are kept between threat analyses, they cache their meld checks by themselves
+        self.yakuhai_analyzer = YakuhaiAnalyzer(self.enemy)
+        self.yaku_analyzers = [
+            ChinitsuAnalyzer(self.enemy),
+            HonitsuAnalyzer(self.enemy),
+            ToitoiAnalyzer(self.enemy),
+            TanyaoAnalyzer(self.enemy),
+        ]
+        self.atodzuke_analyzer = AtodzukeAnalyzer(self.enemy)
+
     def serialize(self):
         return {"seat": self.enemy.seat, "threat_reason": self.threat_reason}
 
@@ -69,8 +87,46 @@ class EnemyAnalyzer:
     @property
     def is_threatening(self) -> bool:
         """
-        We are trying to determine other players current threat
+        We are trying to determine other players current threat.
+        Analysis is repeated only after enemy state was changed.
         """
+        key = self._get_threat_state_key()
+        if self._threat_state_key != key:
+            self._is_threatening = self._analyze_threat()
+            self._threat_state_key = key
+        return self._is_threatening
+
+    def erase_threat_cache(self):
+        self._threat_state_key = None
+
+    def _get_threat_state_key(self):
+        # discards, melds, riichi, dora indicators and winds are everything that threat analysis depends on
+        return (
+            self.enemy.state_version,
+            len(self.enemy.discards),
+            len(self.enemy.melds),
+            self.enemy.in_riichi,
+            self.enemy.dealer_seat,
+            self.table.round_wind_number,
+            len(self.table.dora_indicators),
+            self.table.has_aka_dora,
+        )
+
+    def _get_hand_costs_key(self):
+        # hand cost depends on the threat analysis, on all revealed tiles (table version) and on our hand
+        return (
+            self._get_threat_state_key(),
+            self.enemy.is_ippatsu,
+            self.table.version,
+            self.main_player.hand_state,
+        )
+
+    @staticmethod
+    def _get_hand_cost_index(tile_136, can_be_used_for_ryanmen):
+        # the same tiles have the same cost, except aka dora
+        return ((tile_136 // 4) * 2 + (can_be_used_for_ryanmen and 1 or 0)) * 2 + (tile_136 in AKA_DORA_LIST and 1 or 0)
+
+    def _analyze_threat(self) -> bool:
         round_step = len(self.enemy.discards)
 
         if self.enemy.in_riichi:
@@ -85,24 +141,16 @@ class EnemyAnalyzer:
         active_yaku = []
         sure_han = 0
 
-        yakuhai_analyzer = YakuhaiAnalyzer(self.enemy)
-        if yakuhai_analyzer.is_yaku_active():
-            active_yaku.append(yakuhai_analyzer)
-            sure_han = yakuhai_analyzer.melds_han()
+        if self.yakuhai_analyzer.is_yaku_active():
+            active_yaku.append(self.yakuhai_analyzer)
+            sure_han = self.yakuhai_analyzer.melds_han()
 
-        yaku_analyzers = [
-            ChinitsuAnalyzer(self.enemy),
-            HonitsuAnalyzer(self.enemy),
-            ToitoiAnalyzer(self.enemy),
-            TanyaoAnalyzer(self.enemy),
-        ]
-
-        for x in yaku_analyzers:
+        for x in self.yaku_analyzers:
             if x.is_yaku_active():
                 active_yaku.append(x)
 
         if not active_yaku:
-            active_yaku.append(AtodzukeAnalyzer(self.enemy))
+            active_yaku.append(self.atodzuke_analyzer)
             sure_han = 1
 
         # FIXME: probably our approach here should be refactored and we should not care about cost
@@ -114,9 +162,7 @@ class EnemyAnalyzer:
                 sure_han = 1
 
         meld_tiles = self.enemy.meld_tiles
-        dora_count = sum(
-            [plus_dora(x, self.table.dora_indicators, add_aka_dora=self.table.has_aka_dora) for x in meld_tiles]
-        )
+        dora_count = sum([self.table.is_dora(x) for x in meld_tiles])
         sure_han += dora_count
 
         if len(melds) == 1 and round_step > 5 and sure_han >= 4:
@@ -159,7 +205,35 @@ class EnemyAnalyzer:
 
     def get_assumed_hand_cost(self, tile_136, can_be_used_for_ryanmen=False) -> int:
         """
-        How much the hand could cost
+        How much the hand could cost.
+        Cost is the same for all discard options with the same tile until the table state is changed,
+        so it is calculated once and stored in the table of costs.
+        """
+        key = self._get_hand_costs_key()
+        if self._hand_costs_key != key:
+            self._hand_costs = [None] * 136
+            self._hand_costs_key = key
+            self._riichi_hand_stat = None
+
+        index = self._get_hand_cost_index(tile_136, can_be_used_for_ryanmen)
+        cost = self._hand_costs[index]
+        if cost is None:
+            if self.enemy.in_riichi:
+                if self._riichi_hand_stat is None:
+                    self._riichi_hand_stat = StatisticsCollector.collect_stat_for_enemy_riichi_hand(
+                        self.enemy, self.main_player
+                    )
+                cost = self._calculate_assumed_hand_cost_for_riichi(
+                    tile_136, can_be_used_for_ryanmen, self._riichi_hand_stat
+                )
+            else:
+                cost = self._calculate_assumed_hand_cost(tile_136)
+            self._hand_costs[index] = cost
+        return cost
+
+    def calculate_assumed_hand_cost(self, tile_136, can_be_used_for_ryanmen=False) -> int:
+        """
+        The same as get_assumed_hand_cost, but calculated from scratch without the table of costs
         """
         if self.enemy.in_riichi:
             return self._calculate_assumed_hand_cost_for_riichi(tile_136, can_be_used_for_ryanmen)
@@ -169,18 +243,20 @@ class EnemyAnalyzer:
     def number_of_unverified_suji(self) -> int:
         maximum_number_of_suji = 18
         verified_suji = 0
-        suits = separate_tiles_by_suits(TilesConverter.to_34_array([x * 4 for x in self.enemy.all_safe_tiles]))
-        for suit in suits:
+        safe_tiles_mask = self.enemy.all_safe_tiles_mask
+        for suit_start in [0, 9, 18]:
+            suit_mask = safe_tiles_mask >> suit_start
             # indices started from 0
             suji_indices = [[0, 3, 6], [1, 4, 7], [2, 5, 8]]
             for suji in suji_indices:
-                if suit[suji[0]] and suit[suji[2]]:
+                first, middle, last = [suit_mask >> x & 1 for x in suji]
+                if first and last:
                     verified_suji += 2
-                elif suit[suji[0]] or suit[suji[2]]:
+                elif first or last:
                     verified_suji += 1
-                    if suit[suji[1]]:
+                    if middle:
                         verified_suji += 1
-                elif suit[suji[1]]:
+                elif middle:
                     verified_suji += 2
         result = maximum_number_of_suji - verified_suji
         assert result >= 0, "number of unverified suji can't be less than 0"
@@ -198,10 +274,10 @@ class EnemyAnalyzer:
         tile_34 = tile_136 // 4
         scale_bonus = 0
 
-        dora_count = plus_dora(tile_136, self.table.dora_indicators, add_aka_dora=self.table.has_aka_dora)
+        dora_count = self.table.is_dora(tile_136)
 
         if is_honor(tile_34):
-            closed_hand_34 = TilesConverter.to_34_array(self.main_player.closed_hand)
+            closed_hand_34 = self.main_player.hand_state.closed_hand_34
             revealed_tiles = self.main_player.number_of_revealed_tiles(tile_34, closed_hand_34)
             if revealed_tiles < 2:
                 scale_bonus += dora_count * 3
@@ -248,7 +324,10 @@ class EnemyAnalyzer:
 
         return scale[scale_index - 1]
 
-    def _calculate_assumed_hand_cost_for_riichi(self, tile_136, can_be_used_for_ryanmen) -> int:
+    def _calculate_assumed_hand_cost_for_riichi(self, tile_136, can_be_used_for_ryanmen, riichi_stat=None) -> int:
+        """
+        :param riichi_stat: tile independent part of riichi hand statistics, collected if it wasn't passed
+        """
         scale_index = 0
 
         if self.enemy.is_dealer:
@@ -256,9 +335,9 @@ class EnemyAnalyzer:
         else:
             scale = EnemyAnalyzer.RIICHI_COST_SCALE
 
-        riichi_stat = StatisticsCollector.collect_stat_for_enemy_riichi_hand_cost(
-            tile_136, self.enemy, self.main_player
-        )
+        if riichi_stat is None:
+            riichi_stat = StatisticsCollector.collect_stat_for_enemy_riichi_hand(self.enemy, self.main_player)
+        tile_category = StatisticsCollector.get_tile_category(tile_136 // 4, self.enemy)
 
         # it wasn't early riichi, let's think that it could be more expensive
         if 6 <= riichi_stat["riichi_called_on_step"] <= 11:
@@ -290,12 +369,12 @@ class EnemyAnalyzer:
 
         # additional danger for tiles that could be used for tanyao
         # 456
-        if riichi_stat["tile_category"] == "middle":
+        if tile_category == "middle":
             scale_index += 1
 
         # additional danger for tiles that could be used for tanyao
         # 23 or 78
-        if riichi_stat["tile_category"] == "edge" and can_be_used_for_ryanmen:
+        if tile_category == "edge" and can_be_used_for_ryanmen:
             scale_index += 1
 
         if scale_index > len(scale) - 1:
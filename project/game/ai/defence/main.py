@@ -5,196 +5,170 @@ from game.ai.defence.enemy_analyzer import EnemyAnalyzer
 from game.ai.discard import DiscardOption
 from game.ai.helpers.defence import DangerBorder, TileDanger
 from game.ai.helpers.kabe import Kabe
-from game.ai.helpers.possible_forms import PossibleFormsAnalyzer
-from mahjong.tile import TilesConverter
-from mahjong.utils import is_honor, is_man, is_pin, is_sou, is_terminal, plus_dora, simplify
-from utils.general import is_dora_connector, is_tiles_same_suit
+from game.ai.helpers.possible_forms import PossibleFormsAnalyzer, PossibleFormsTracker
+from mahjong.utils import is_honor, is_man, is_pin, is_sou, is_terminal, simplify
+from utils.general import ALL_TILES_MASK, is_dora_connector, is_tiles_same_suit, tiles_34_to_mask
 
 
 class TileDangerHandler:
     player = None
     _analyzed_enemies: Optional[List[EnemyAnalyzer]] = None
-    _threats_cache: Optional[List[EnemyAnalyzer]] = None
+    # total danger of each tile (34 format) against each enemy seat (1, 2, 3), calculated for the last threats
+    danger_matrix: Optional[List[List[int]]] = None
 
     def __init__(self, player):
         self.player = player
         self._analyzed_enemies = []
-        self._threats_cache = []
+        self.danger_matrix = [[0] * 34 for _ in range(0, 3)]
 
         self.possible_forms_analyzer = PossibleFormsAnalyzer(player)
+        # possible forms are updated incrementally for each enemy seat
+        self.possible_forms_trackers = {seat: PossibleFormsTracker(player) for seat in range(1, 4)}
 
     def calculate_tiles_danger(
         self, discard_candidates: List[DiscardOption], enemy_analyzer: EnemyAnalyzer
     ) -> List[DiscardOption]:
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        """
+        Danger of each discard candidate is calculated once against the enemy,
+        it is stored in the danger matrix row of the enemy seat and attached to the discard option.
+        """
+        closed_hand_34 = self.player.hand_state.closed_hand_34
+        enemy_seat = enemy_analyzer.enemy.seat
 
-        safe_against_threat_34 = []
-
-        # First, add all genbutsu to the list
-        safe_against_threat_34.extend(list(set([x for x in enemy_analyzer.enemy.all_safe_tiles])))
+        # First, add all genbutsu to the mask
+        safe_against_threat_mask = enemy_analyzer.enemy.all_safe_tiles_mask
 
         # Then add tiles not suitable for yaku in enemy open hand
         if enemy_analyzer.threat_reason.get("active_yaku"):
-            safe_against_yaku = set.intersection(
-                *[set(x.get_safe_tiles_34()) for x in enemy_analyzer.threat_reason.get("active_yaku")]
-            )
-            if safe_against_yaku:
-                safe_against_threat_34.extend(list(safe_against_yaku))
+            safe_against_yaku = ALL_TILES_MASK
+            for yaku_analyzer in enemy_analyzer.threat_reason.get("active_yaku"):
+                safe_against_yaku &= tiles_34_to_mask(yaku_analyzer.get_safe_tiles_34())
+            safe_against_threat_mask |= safe_against_yaku
 
-        possible_forms = self.possible_forms_analyzer.calculate_possible_forms(enemy_analyzer.enemy.all_safe_tiles)
+        possible_forms = self.possible_forms_trackers[enemy_seat].calculate_possible_forms(
+            enemy_analyzer.enemy.all_safe_tiles
+        )
         kabe_tiles = self.player.ai.kabe.find_all_kabe(closed_hand_34)
-        suji_tiles = self.player.ai.suji.find_suji([x.value for x in enemy_analyzer.enemy.discards])
+        suji_tiles = self.player.ai.suji.find_suji_for_mask(self.player.table.discards_masks[enemy_seat])
+        # it is the same for all tiles
+        unverified_suji_coeff = enemy_analyzer.unverified_suji_coeff
+
+        danger_row = [0] * 34
         for discard_option in discard_candidates:
             tile_34 = discard_option.tile_to_discard_34
-            tile_136 = discard_option.tile_to_discard_136
-            number_of_revealed_tiles = self.player.number_of_revealed_tiles(tile_34, closed_hand_34)
-
-            # like 1-9 against tanyao etc.
-            if tile_34 in safe_against_threat_34:
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    TileDanger.SAFE_AGAINST_THREATENING_HAND,
-                )
-                continue
+            dangers = self._calculate_tile_dangers(
+                enemy_analyzer,
+                discard_option.tile_to_discard_136,
+                closed_hand_34,
+                safe_against_threat_mask,
+                possible_forms,
+                kabe_tiles,
+                suji_tiles,
+                unverified_suji_coeff,
+            )
+            for danger, can_be_used_for_ryanmen in dangers:
+                self._update_discard_candidate(discard_option, enemy_seat, danger, can_be_used_for_ryanmen)
+            danger_row[tile_34] = discard_option.danger.get_total_danger_for_player(enemy_seat)
 
-            # safe tiles that can be safe based on the table situation
-            if self.total_possible_forms_for_tile(possible_forms, tile_34) == 0:
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    TileDanger.IMPOSSIBLE_WAIT,
-                )
-                continue
+        self.danger_matrix[enemy_seat - 1] = danger_row
+        return discard_candidates
 
-            # honors
-            if is_honor(tile_34):
-                danger = self._process_danger_for_honor(enemy_analyzer, tile_34, number_of_revealed_tiles)
-            # terminals
-            elif is_terminal(tile_34):
-                danger = self._process_danger_for_terminal_tiles_and_kabe_suji(
-                    enemy_analyzer, tile_34, number_of_revealed_tiles, kabe_tiles, suji_tiles
-                )
-            # 2-8 tiles
-            else:
-                danger = self._process_danger_for_2_8_tiles_suji_and_kabe(
-                    enemy_analyzer, tile_34, number_of_revealed_tiles, suji_tiles, kabe_tiles
-                )
+    def _calculate_tile_dangers(
+        self,
+        enemy_analyzer,
+        tile_136,
+        closed_hand_34,
+        safe_against_threat_mask,
+        possible_forms,
+        kabe_tiles,
+        suji_tiles,
+        unverified_suji_coeff,
+    ):
+        """
+        :return: list of (danger, can_be_used_for_ryanmen) pairs
+        """
+        tile_34 = tile_136 // 4
+        number_of_revealed_tiles = self.player.number_of_revealed_tiles(tile_34, closed_hand_34)
+
+        # like 1-9 against tanyao etc.
+        if safe_against_threat_mask >> tile_34 & 1:
+            return [(TileDanger.SAFE_AGAINST_THREATENING_HAND, False)]
+
+        # safe tiles that can be safe based on the table situation
+        if self.total_possible_forms_for_tile(possible_forms, tile_34) == 0:
+            return [(TileDanger.IMPOSSIBLE_WAIT, False)]
+
+        dangers = []
+
+        # honors
+        if is_honor(tile_34):
+            danger = self._process_danger_for_honor(enemy_analyzer, tile_34, number_of_revealed_tiles)
+        # terminals
+        elif is_terminal(tile_34):
+            danger = self._process_danger_for_terminal_tiles_and_kabe_suji(
+                enemy_analyzer, tile_34, number_of_revealed_tiles, kabe_tiles, suji_tiles
+            )
+        # 2-8 tiles
+        else:
+            danger = self._process_danger_for_2_8_tiles_suji_and_kabe(
+                enemy_analyzer, tile_34, number_of_revealed_tiles, suji_tiles, kabe_tiles
+            )
 
-            if danger:
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    danger,
-                )
+        if danger:
+            dangers.append((danger, False))
 
-            forms_count = possible_forms[tile_34]
-            self._update_discard_candidate(
-                tile_34,
-                discard_candidates,
-                enemy_analyzer.enemy.seat,
+        forms_count = possible_forms[tile_34]
+        dangers.append(
+            (
                 {
                     "value": self.possible_forms_analyzer.calculate_possible_forms_danger(forms_count),
                     "description": TileDanger.FORM_BONUS_DESCRIPTION,
                     "forms_count": forms_count,
                 },
+                False,
             )
+        )
 
-            # for ryanmen waits we also account for number of dangerous suji tiles
-            forms_ryanmen_count = forms_count[PossibleFormsAnalyzer.POSSIBLE_RYANMEN_SIDES]
-            if forms_ryanmen_count == 1:
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    TileDanger.RYANMEN_BASE_SINGLE,
-                )
-            elif forms_ryanmen_count == 2:
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    TileDanger.RYANMEN_BASE_DOUBLE,
-                )
+        # for ryanmen waits we also account for number of dangerous suji tiles
+        forms_ryanmen_count = forms_count[PossibleFormsAnalyzer.POSSIBLE_RYANMEN_SIDES]
+        if forms_ryanmen_count == 1:
+            dangers.append((TileDanger.RYANMEN_BASE_SINGLE, False))
+        elif forms_ryanmen_count == 2:
+            dangers.append((TileDanger.RYANMEN_BASE_DOUBLE, False))
 
-            if forms_ryanmen_count == 1 or forms_ryanmen_count == 2:
-                has_matagi = self._is_matagi_suji(enemy_analyzer, tile_34)
-                if has_matagi:
-                    self._update_discard_candidate(
-                        tile_34,
-                        discard_candidates,
-                        enemy_analyzer.enemy.seat,
-                        TileDanger.BONUS_MATAGI_SUJI,
-                        can_be_used_for_ryanmen=True,
-                    )
+        if forms_ryanmen_count == 1 or forms_ryanmen_count == 2:
+            has_matagi = self._is_matagi_suji(enemy_analyzer, tile_34)
+            if has_matagi:
+                dangers.append((TileDanger.BONUS_MATAGI_SUJI, True))
 
-                has_aidayonken = self.is_aidayonken_pattern(enemy_analyzer, tile_34)
-                if has_aidayonken:
-                    self._update_discard_candidate(
-                        tile_34,
-                        discard_candidates,
-                        enemy_analyzer.enemy.seat,
-                        TileDanger.BONUS_AIDAYONKEN,
-                        can_be_used_for_ryanmen=True,
-                    )
+            has_aidayonken = self.is_aidayonken_pattern(enemy_analyzer, tile_34)
+            if has_aidayonken:
+                dangers.append((TileDanger.BONUS_AIDAYONKEN, True))
 
-                early_danger_bonus = self._get_early_danger_bonus(enemy_analyzer, tile_34, has_matagi or has_aidayonken)
-                if early_danger_bonus is not None:
-                    self._update_discard_candidate(
-                        tile_34,
-                        discard_candidates,
-                        enemy_analyzer.enemy.seat,
-                        early_danger_bonus,
-                        can_be_used_for_ryanmen=True,
-                    )
+            early_danger_bonus = self._get_early_danger_bonus(enemy_analyzer, tile_34, has_matagi or has_aidayonken)
+            if early_danger_bonus is not None:
+                dangers.append((early_danger_bonus, True))
 
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    TileDanger.make_unverified_suji_coeff(enemy_analyzer.unverified_suji_coeff),
-                    can_be_used_for_ryanmen=True,
-                )
+            dangers.append((TileDanger.make_unverified_suji_coeff(unverified_suji_coeff), True))
 
-                if is_dora_connector(tile_136, self.player.table.dora_indicators):
-                    self._update_discard_candidate(
-                        tile_34,
-                        discard_candidates,
-                        enemy_analyzer.enemy.seat,
-                        TileDanger.DORA_CONNECTOR_BONUS,
-                        can_be_used_for_ryanmen=True,
-                    )
+            if is_dora_connector(tile_136, self.player.table.dora_indicators):
+                dangers.append((TileDanger.DORA_CONNECTOR_BONUS, True))
 
-            dora_count = plus_dora(
-                tile_136, self.player.table.dora_indicators, add_aka_dora=self.player.table.has_aka_dora
-            )
+        dora_count = self.player.table.is_dora(tile_136)
 
-            if dora_count > 0:
-                danger = copy(TileDanger.DORA_BONUS)
-                danger["value"] = dora_count * danger["value"]
-                danger["dora_count"] = dora_count
-                self._update_discard_candidate(
-                    tile_34,
-                    discard_candidates,
-                    enemy_analyzer.enemy.seat,
-                    danger,
-                )
+        if dora_count > 0:
+            danger = copy(TileDanger.DORA_BONUS)
+            danger["value"] = dora_count * danger["value"]
+            danger["dora_count"] = dora_count
+            dangers.append((danger, False))
 
-            if enemy_analyzer.threat_reason.get("active_yaku"):
-                for yaku_analyzer in enemy_analyzer.threat_reason.get("active_yaku"):
-                    bonus_danger = yaku_analyzer.get_bonus_danger(tile_136, number_of_revealed_tiles)
-                    for danger in bonus_danger:
-                        self._update_discard_candidate(
-                            tile_34,
-                            discard_candidates,
-                            enemy_analyzer.enemy.seat,
-                            danger,
-                        )
+        if enemy_analyzer.threat_reason.get("active_yaku"):
+            for yaku_analyzer in enemy_analyzer.threat_reason.get("active_yaku"):
+                bonus_danger = yaku_analyzer.get_bonus_danger(tile_136, number_of_revealed_tiles)
+                for danger in bonus_danger:
+                    dangers.append((danger, False))
 
-        return discard_candidates
+        return dangers
 
     def calculate_danger_borders(self, discard_options, threatening_player, all_threatening_players):
         min_shanten = min([x.shanten for x in discard_options])
@@ -207,7 +181,7 @@ class TileDangerHandler:
             shanten = discard_option.shanten
             tile_136 = discard_option.tile_to_discard_136
 
-            if discard_option.danger.get_total_danger_for_player(threatening_player.enemy.seat) == 0:
+            if self.danger_matrix[threatening_player.enemy.seat - 1][discard_option.tile_to_discard_34] == 0:
                 threatening_player_hand_cost = 0
             else:
                 threatening_player_hand_cost = threatening_player.get_assumed_hand_cost(
@@ -423,12 +397,7 @@ class TileDangerHandler:
                     # TODO: try to estimate yaku chances for closed hand
                     han = 1
 
-                dora_count = sum(
-                    [
-                        plus_dora(x, self.player.table.dora_indicators, add_aka_dora=self.player.table.has_aka_dora)
-                        for x in self.player.tiles
-                    ]
-                )
+                dora_count = sum([self.player.table.is_dora(x) for x in self.player.tiles])
 
                 han += dora_count
 
@@ -487,8 +456,12 @@ class TileDangerHandler:
         return discard_options
 
     def get_threatening_players(self, from_cache: bool = True) -> List[EnemyAnalyzer]:
-        if from_cache and self._threats_cache is not None:
-            return self._threats_cache
+        """
+        Each enemy analyzer repeats threat analysis only after its enemy state was changed,
+        with from_cache=False analysis is repeated for all enemies
+        """
+        if not from_cache:
+            self.erase_threats_cache()
 
         result = []
         for player in self.analyzed_enemies:
@@ -498,10 +471,12 @@ class TileDangerHandler:
         return result
 
     def erase_threats_cache(self):
-        self._threats_cache = None
+        for enemy_analyzer in self.analyzed_enemies:
+            enemy_analyzer.erase_threat_cache()
 
     def mark_tiles_danger_for_threats(self, discard_options):
         threatening_players = self.get_threatening_players()
+        self.danger_matrix = [[0] * 34 for _ in range(0, 3)]
         for threatening_player in threatening_players:
             discard_options = self.calculate_tiles_danger(discard_options, threatening_player)
             discard_options = self.calculate_danger_borders(discard_options, threatening_player, threatening_players)
@@ -657,25 +632,17 @@ class TileDangerHandler:
 
         return danger
 
-    def _update_discard_candidate(
-        self, tile_34, discard_candidates, player_seat, danger, can_be_used_for_ryanmen=False
-    ):
-        for discard_candidate in discard_candidates:
-            if discard_candidate.tile_to_discard_34 == tile_34:
-                if can_be_used_for_ryanmen:
-                    discard_candidate.danger.can_be_used_for_ryanmen = can_be_used_for_ryanmen
-
-                # we found safe tile, in that case we can ignore all other metrics
-                if TileDanger.is_safe(danger):
-                    discard_candidate.danger.clear_danger(player_seat)
-
-                # let's put danger metrics to the tile only if we are not yet sure that tile is already safe
-                is_known_to_be_safe = (
-                    len([x for x in discard_candidate.danger.get_danger_reasons(player_seat) if TileDanger.is_safe(x)])
-                    > 0
-                )
-                if not is_known_to_be_safe:
-                    discard_candidate.danger.set_danger(player_seat, danger)
+    def _update_discard_candidate(self, discard_candidate, player_seat, danger, can_be_used_for_ryanmen=False):
+        if can_be_used_for_ryanmen:
+            discard_candidate.danger.can_be_used_for_ryanmen = can_be_used_for_ryanmen
+
+        # we found safe tile, in that case we can ignore all other metrics
+        if TileDanger.is_safe(danger):
+            discard_candidate.danger.clear_danger(player_seat)
+
+        # let's put danger metrics to the tile only if we are not yet sure that tile is already safe
+        if not discard_candidate.danger.is_known_to_be_safe(player_seat):
+            discard_candidate.danger.set_danger(player_seat, danger)
 
     def is_aidayonken_pattern(self, enemy_analyzer, tile_analyze_34):
         discards = enemy_analyzer.enemy_discards_until_all_tsumogiri
@@ -1,3 +1,5 @@
+import random
+
 from game.ai.defence.yaku_analyzer.chinitsu import ChinitsuAnalyzer
 from game.ai.defence.yaku_analyzer.honitsu import HonitsuAnalyzer
 from game.ai.helpers.defence import EnemyDanger
@@ -475,3 +477,93 @@ def test_is_threatening_and_atodzuke():
             assert bonus_danger
         else:
             assert not bonus_danger
+
+
+def test_threat_analysis_is_repeated_only_for_changed_enemy():
+    table = Table()
+    defence = table.player.ai.defence
+
+    analyzed_enemies = {}
+    for enemy_analyzer in defence.analyzed_enemies:
+        analyzed_enemies[enemy_analyzer.enemy.seat] = []
+        enemy_analyzer._analyze_threat = _count_calls(
+            enemy_analyzer._analyze_threat, analyzed_enemies[enemy_analyzer.enemy.seat]
+        )
+
+    assert defence.get_threatening_players() == []
+    assert defence.get_threatening_players() == []
+    assert [len(x) for x in analyzed_enemies.values()] == [1, 1, 1]
+
+    enemy_seat = 2
+    table.add_called_meld(enemy_seat, make_meld(MeldPrint.PON, honors="555"))
+    for tile in string_to_136_array(sou="1189"):
+        table.add_discarded_tile(enemy_seat, tile, False)
+    yakuhai_analyzer = defence.analyzed_enemies[enemy_seat - 1].yakuhai_analyzer
+
+    table.add_called_meld(enemy_seat, make_meld(MeldPrint.PON, honors="666"))
+    table.add_called_meld(enemy_seat, make_meld(MeldPrint.PON, honors="777"))
+    table.add_discarded_tile(enemy_seat, string_to_136_tile(man="1"), False)
+
+    threatening_players = defence.get_threatening_players()
+    assert len(threatening_players) == 1
+    assert threatening_players[0].enemy.seat == enemy_seat
+    assert threatening_players[0].threat_reason["active_yaku"][0] is yakuhai_analyzer
+    assert yakuhai_analyzer.melds_han() == 3
+    assert [len(x) for x in analyzed_enemies.values()] == [1, 2, 1]
+
+    # the same table state is asked again for melds and win decisions
+    defence.get_threatening_players()
+    defence.get_threatening_players()
+    assert [len(x) for x in analyzed_enemies.values()] == [1, 2, 1]
+
+    # riichi of another enemy doesn't change open hand analysis
+    enemy_called_riichi_helper(table, 3)
+    assert len(defence.get_threatening_players()) == 2
+    assert [len(x) for x in analyzed_enemies.values()] == [1, 2, 2]
+
+    defence.get_threatening_players(from_cache=False)
+    assert [len(x) for x in analyzed_enemies.values()] == [2, 3, 3]
+
+
+def _count_calls(method, calls):
+    def wrapper():
+        calls.append(1)
+        return method()
+
+    return wrapper
+
+
+def test_assumed_hand_cost_table_and_per_call_calculation_parity():
+    rand = random.Random(42)
+
+    for _ in range(10):
+        table = Table()
+        # tile 0 is not used, riichi helper would replace it by the default riichi tile
+        meld_tiles = string_to_136_array(honors="555", pin="222")
+        tiles = [x for x in range(1, 136) if x not in meld_tiles]
+        rand.shuffle(tiles)
+        table.add_dora_indicator(tiles.pop())
+        table.player.tiles = sorted([tiles.pop() for _ in range(0, 13)])
+
+        # open hand threat with yakuhai meld
+        table.add_called_meld(1, make_meld(MeldPrint.PON, honors="555"))
+        table.add_called_meld(1, make_meld(MeldPrint.PON, pin="222"))
+
+        for step in range(0, 14):
+            for seat in [1, 2, 3]:
+                table.add_discarded_tile(seat, tiles.pop(), rand.random() < 0.5)
+
+            if step == 5:
+                enemy_called_riichi_helper(table, 2, tiles.pop())
+            if step == 9:
+                # kan dora and dealer change the costs
+                table.add_dora_indicator(tiles.pop())
+                table.get_player(3).dealer_seat = 3
+                enemy_called_riichi_helper(table, 3, tiles.pop())
+
+            for threat in table.player.ai.defence.get_threatening_players():
+                for tile_136 in range(0, 136):
+                    for can_be_used_for_ryanmen in [False, True]:
+                        assert threat.get_assumed_hand_cost(
+                            tile_136, can_be_used_for_ryanmen
+                        ) == threat.calculate_assumed_hand_cost(tile_136, can_be_used_for_ryanmen)
@@ -5,6 +5,7 @@ from game.ai.helpers.defence import TileDanger
 from game.table import Table
 from mahjong.constants import FIVE_RED_SOU
 from utils.decisions_logger import MeldPrint
+from utils.settings_handler import settings
 from utils.test_helpers import (
     enemy_called_riichi_helper,
     find_discard_option,
@@ -704,6 +705,69 @@ def test_tile_danger_early_discard_early_riichi():
     _assert_discard_not_equal(player, enemy_seat, TileDanger.BONUS_EARLY_5, sou="9")
 
 
+def test_tiles_danger_matrix():
+    enemy_seat = 2
+    table = _create_table(enemy_seat, discards=[], riichi_tile=string_to_136_tile(honors="7"))
+    table.add_discarded_tile(enemy_seat, string_to_136_tile(sou="6"), False)
+    player = table.player
+
+    player.init_hand(string_to_136_array(man="11134", pin="1156", honors="2555"))
+    player.draw_tile(string_to_136_tile(sou="6"))
+
+    discard_options, _ = player.ai.hand_builder.find_discard_options()
+    discard_options, _ = player.ai.defence.mark_tiles_danger_for_threats(discard_options)
+
+    danger_matrix = player.ai.defence.danger_matrix
+    for discard_option in discard_options:
+        tile_34 = discard_option.tile_to_discard_34
+        assert danger_matrix[enemy_seat - 1][tile_34] == discard_option.danger.get_total_danger_for_player(enemy_seat)
+        # there are no other threats
+        assert danger_matrix[0][tile_34] == 0
+        assert danger_matrix[2][tile_34] == 0
+
+    # genbutsu
+    assert danger_matrix[enemy_seat - 1][string_to_136_tile(sou="6") // 4] == 0
+    assert danger_matrix[enemy_seat - 1][string_to_136_tile(pin="5") // 4] > 0
+
+
+def test_tiles_danger_without_danger_reasons():
+    tiles = string_to_136_array(man="11134", pin="1156", honors="2555")
+
+    dangers = []
+    for print_logs in [True, False]:
+        settings.PRINT_LOGS = print_logs
+        try:
+            enemy_seat = 2
+            table = _create_table(enemy_seat, discards=[], riichi_tile=string_to_136_tile(honors="7"))
+            table.add_discarded_tile(enemy_seat, string_to_136_tile(sou="6"), False)
+            player = table.player
+            player.init_hand(tiles)
+            player.draw_tile(string_to_136_tile(sou="6"))
+
+            discard_options, _ = player.ai.hand_builder.find_discard_options()
+            discard_options, _ = player.ai.defence.mark_tiles_danger_for_threats(discard_options)
+        finally:
+            settings.PRINT_LOGS = True
+
+        dangers.append(
+            [
+                (
+                    x.danger.get_total_danger_for_player(enemy_seat),
+                    x.danger.is_known_to_be_safe(enemy_seat),
+                    x.danger.get_danger_border(enemy_seat),
+                    x.danger.get_weighted_danger(),
+                    x.danger.is_danger_acceptable(),
+                )
+                for x in discard_options
+            ]
+        )
+        assert all([bool(x.danger.get_danger_reasons(enemy_seat)) == print_logs for x in discard_options])
+
+    assert dangers[0] == dangers[1]
+    genbutsu = [x for x in discard_options if x.tile_to_discard_34 == string_to_136_tile(sou="6") // 4][0]
+    assert genbutsu.danger.is_known_to_be_safe(enemy_seat)
+
+
 def _create_table(enemy_seat, discards, riichi_tile):
     table = Table()
     table.has_aka_dora = True
@@ -13,6 +13,9 @@ class ChinitsuAnalyzer(HonitsuAnalyzerBase):
     LESS_SUIT_PERCENTAGE_BORDER = 30
 
     def is_yaku_active(self):
+        # analyzer is reused between enemy turns, suit could be chosen during the previous analysis
+        self.chosen_suit = None
+
         # TODO: in some distant future we may want to analyze menchin as well
         if not self.enemy.melds:
             return False
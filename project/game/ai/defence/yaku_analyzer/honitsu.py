@@ -15,6 +15,9 @@ class HonitsuAnalyzer(HonitsuAnalyzerBase):
     HONORS_PERCENTAGE_BORDER = 30
 
     def is_yaku_active(self):
+        # analyzer is reused between enemy turns, suit could be chosen during the previous analysis
+        self.chosen_suit = None
+
         # TODO: in some distant future we may want to analyze menhon as well
         if not self.enemy.melds:
             return False
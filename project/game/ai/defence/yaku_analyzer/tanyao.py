@@ -7,6 +7,8 @@ class TanyaoAnalyzer(YakuAnalyzer):
 
     def __init__(self, enemy):
         self.enemy = enemy
+        self._suitable_melds = []
+        self._suitable_melds_key = None
 
     def serialize(self):
         return {"id": self.id}
@@ -18,6 +20,13 @@ class TanyaoAnalyzer(YakuAnalyzer):
         return len(self._get_suitable_melds()) > 0 and 1 or 0
 
     def _get_suitable_melds(self):
+        key = self._get_melds_key()
+        if self._suitable_melds_key != key:
+            self._suitable_melds = self._find_suitable_melds()
+            self._suitable_melds_key = key
+        return self._suitable_melds
+
+    def _find_suitable_melds(self):
         suitable_melds = []
         for meld in self.enemy.melds:
             tiles_34 = [x // 4 for x in meld.tiles]
@@ -11,6 +11,11 @@ class YakuAnalyzer:
     def is_absorbed(self, possible_yaku, tile_34=None):
         return False
 
+    def _get_melds_key(self):
+        # analyzer lives between enemy turns, shouminkan replaces a meld without changing melds number,
+        # so enemy state version is checked as well
+        return self.enemy.state_version, len(self.enemy.melds)
+
     def _is_absorbed_by(self, possible_yaku, id, tile_34):
         absorbing_yaku_possible = [x for x in possible_yaku if x.id == id]
         if absorbing_yaku_possible:
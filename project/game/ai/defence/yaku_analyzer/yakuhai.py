@@ -6,6 +6,8 @@ class YakuhaiAnalyzer(YakuAnalyzer):
 
     def __init__(self, enemy):
         self.enemy = enemy
+        self._suitable_melds = []
+        self._suitable_melds_key = None
 
     def serialize(self):
         return {"id": self.id}
@@ -23,6 +25,14 @@ class YakuhaiAnalyzer(YakuAnalyzer):
         return han
 
     def _get_suitable_melds(self):
+        # winds are changed between rounds
+        key = (self._get_melds_key(), tuple(self.enemy.valued_honors))
+        if self._suitable_melds_key != key:
+            self._suitable_melds = self._find_suitable_melds()
+            self._suitable_melds_key = key
+        return self._suitable_melds
+
+    def _find_suitable_melds(self):
         suitable_melds = []
         for x in self.enemy.melds:
             tile_34 = x.tiles[0] // 4
@@ -3,7 +3,7 @@ from typing import List
 from game.ai.helpers.defence import TileDangerHandler
 from game.ai.strategies.main import BaseStrategy
 from mahjong.tile import TilesConverter
-from mahjong.utils import is_honor, is_man, is_pin, is_sou, plus_dora, simplify
+from mahjong.utils import is_honor, is_man, is_pin, is_sou, simplify
 
 
 class DiscardOption:
@@ -20,35 +20,38 @@ class DiscardOption:
     MIN_UKEIRE_SHANTEN_1_BORDER = 4
     MIN_UKEIRE_SHANTEN_2_BORDER = 8
 
-    player = None
-
-    # in 136 tile format
-    tile_to_discard_136 = None
-    # are we calling riichi on this tile or not
-    with_riichi = None
-    # array of tiles that will improve our hand
-    waiting: List[int] = None
-    # how much tiles will improve our hand
-    ukeire = None
-    ukeire_second = None
-    # number of shanten for that tile
-    shanten = None
-    # sometimes we had to force tile to be discarded
-    had_to_be_discarded = False
-    # calculated tile value, for sorting
-    valuation = None
-    # how danger this tile is
-    danger = None
-    # wait to ukeire map
-    wait_to_ukeire = None
-    # second level cost approximation for 1-shanten hands
-    second_level_cost = None
-    # second level average number of waits approximation for 1-shanten hands
-    average_second_level_waits = None
-    # second level average cost approximation for 1-shanten hands
-    average_second_level_cost = None
-    # special descriptor for tempai with additional info
-    tempai_descriptor = None
+    __slots__ = (
+        "player",
+        # in 136 tile format
+        "tile_to_discard_136",
+        # are we calling riichi on this tile or not
+        "with_riichi",
+        # array of tiles that will improve our hand
+        "waiting",
+        # how much tiles will improve our hand
+        "ukeire",
+        "ukeire_second",
+        # number of shanten for that tile
+        "shanten",
+        # wait to ukeire map
+        "wait_to_ukeire",
+        # second level cost approximation for 1-shanten hands
+        "second_level_cost",
+        # second level average number of waits approximation for 1-shanten hands
+        "average_second_level_waits",
+        # second level average cost approximation for 1-shanten hands
+        "average_second_level_cost",
+        # special descriptor for tempai with additional info
+        "tempai_descriptor",
+        # most of the options are thrown away without looking at their danger or valuation,
+        # so we build them only on the first access
+        "_danger",
+        "_valuation",
+        "_count_of_dora",
+        "_had_to_be_discarded",
+    )
+
+    waiting: List[int]
 
     def __init__(self, player, tile_to_discard_136, shanten, waiting, ukeire, wait_to_ukeire=None):
         self.player = player
@@ -58,16 +61,57 @@ class DiscardOption:
         self.waiting = waiting
         self.ukeire = ukeire
         self.ukeire_second = 0
-        self.count_of_dora = 0
-        self.danger = TileDangerHandler()
-        self.had_to_be_discarded = False
         self.wait_to_ukeire = wait_to_ukeire
         self.second_level_cost = 0
         self.average_second_level_waits = 0
         self.average_second_level_cost = 0
         self.tempai_descriptor = None
 
-        self.calculate_valuation()
+        self._danger = None
+        self._valuation = None
+        self._count_of_dora = 0
+        self._had_to_be_discarded = False
+
+    @property
+    def danger(self) -> TileDangerHandler:
+        """
+        How danger this tile is
+        """
+        if self._danger is None:
+            self._danger = TileDangerHandler()
+        return self._danger
+
+    def is_danger_acceptable(self) -> bool:
+        # danger handler is built only for tiles that were marked by defence
+        return self._danger is None or self._danger.is_danger_acceptable()
+
+    @property
+    def valuation(self) -> int:
+        """
+        Calculated tile value, for sorting
+        """
+        if self._valuation is None:
+            self.calculate_valuation()
+        return self._valuation
+
+    @property
+    def count_of_dora(self) -> int:
+        if self._valuation is None:
+            self.calculate_valuation()
+        return self._count_of_dora
+
+    @property
+    def had_to_be_discarded(self) -> bool:
+        """
+        Sometimes we had to force tile to be discarded
+        """
+        if self._valuation is None:
+            self.calculate_valuation()
+        return self._had_to_be_discarded
+
+    @had_to_be_discarded.setter
+    def had_to_be_discarded(self, value: bool):
+        self._had_to_be_discarded = value
 
     @property
     def tile_to_discard_34(self):
@@ -159,11 +203,9 @@ class DiscardOption:
                 if simplified_tile + 2 == simplified_dora or simplified_tile - 2 == simplified_dora:
                     value += DiscardOption.DORA_SECOND_NEIGHBOUR
 
-        count_of_dora = plus_dora(
-            self.tile_to_discard_136, self.player.table.dora_indicators, add_aka_dora=self.player.table.has_aka_dora
-        )
+        count_of_dora = self.player.table.is_dora(self.tile_to_discard_136)
 
-        self.count_of_dora = count_of_dora
+        self._count_of_dora = count_of_dora
         value += count_of_dora * DiscardOption.DORA_VALUE
 
         if is_honor(self.tile_to_discard_34):
@@ -177,6 +219,6 @@ class DiscardOption:
             # three honor tiles were discarded,
             # so we don't need this tile anymore
             if value == 0:
-                self.had_to_be_discarded = True
+                self._had_to_be_discarded = True
 
-        self.valuation = int(value)
+        self._valuation = int(value)
@@ -1,11 +1,13 @@
-from typing import List
+import time
+from typing import List, Optional
 
 import utils.decisions_constants as log
 from game.ai.discard import DiscardOption
+from game.ai.helpers.hand_state import HandState
 from game.ai.helpers.kabe import Kabe
 from mahjong.shanten import Shanten
 from mahjong.tile import Tile, TilesConverter
-from mahjong.utils import is_honor, is_pair, is_terminal, is_tile_strictly_isolated, plus_dora, simplify
+from mahjong.utils import is_honor, is_pair, is_terminal, is_tile_strictly_isolated, simplify
 from utils.decisions_logger import MeldPrint
 
 
@@ -13,11 +15,23 @@ class HandBuilder:
     player = None
     ai = None
 
+    # second level ukeire results by the hand after discard
+    second_level_cache = None
+    second_level_cache_table_state = None
+
+    # time.monotonic() value when current discard decision should be done, None if there is no time budget
+    discard_deadline = None
+    discard_budget_stats = None
+    _discard_budget_hit = False
+
     def __init__(self, player, ai):
         self.player = player
         self.ai = ai
+        self.second_level_cache = {}
+        self.discard_budget_stats = {"decisions": 0, "budget_hits": 0, "skipped_options": 0}
 
     def discard_tile(self):
+        self.start_discard_decision()
         selected_tile = self.choose_tile_to_discard()
         return self.process_discard_option(selected_tile)
 
@@ -61,15 +75,16 @@ class HandBuilder:
         if not after_meld:
             self.mark_tiles_riichi_decision(discard_options)
 
-        one_shanten_ukeire2_calculated_beforehand = False
+        one_shanten_ukeire2_calculated_options = None
         if self.player.config.FEATURE_DEFENCE_ENABLED:
             # FIXME: this is hacky and takes too much time! refactor
             # we need to calculate ukeire2 beforehand for correct danger calculation
             if self.player.ai.defence.get_threatening_players() and min_shanten != 0:
-                for discard_option in discard_options:
-                    if discard_option.shanten == 1:
-                        self.calculate_second_level_ukeire(discard_option, after_meld)
-                        one_shanten_ukeire2_calculated_beforehand = True
+                one_shanten_options = [x for x in discard_options if x.shanten == 1]
+                if one_shanten_options:
+                    one_shanten_ukeire2_calculated_options = self._calculate_second_level_ukeire_until_deadline(
+                        sorted(one_shanten_options, key=lambda x: -x.ukeire), after_meld
+                    )
 
             discard_options, threatening_players = self.player.ai.defence.mark_tiles_danger_for_threats(discard_options)
 
@@ -78,7 +93,7 @@ class HandBuilder:
 
         self.player.logger.debug(log.DISCARD_OPTIONS, "All discard candidates", discard_options)
 
-        tiles_we_can_discard = [x for x in discard_options if x.danger.is_danger_acceptable()]
+        tiles_we_can_discard = [x for x in discard_options if x.is_danger_acceptable()]
         if not tiles_we_can_discard:
             # no tiles with acceptable danger - we go betaori
             return self._choose_safest_tile_or_skip_meld(discard_options, after_meld)
@@ -120,7 +135,7 @@ class HandBuilder:
 
         if first_option.shanten == 1:
             return self._choose_best_discard_with_1_shanten(
-                results_with_same_shanten, after_meld, one_shanten_ukeire2_calculated_beforehand
+                results_with_same_shanten, after_meld, one_shanten_ukeire2_calculated_options
             )
 
         if first_option.shanten == 2 or first_option.shanten == 3:
@@ -161,14 +176,8 @@ class HandBuilder:
 
             closed_hand_34[tile_index] += 1
 
-            skip_isolated_tile = True
-            if closed_hand_34[tile_index] == 4:
-                skip_isolated_tile = False
-            if use_chiitoitsu and closed_hand_34[tile_index] == 3:
-                skip_isolated_tile = False
-
             # there is no need to check single isolated tile
-            if skip_isolated_tile and is_tile_strictly_isolated(closed_hand_34, tile_index):
+            if self._is_useless_draw(closed_hand_34, tile_index, use_chiitoitsu):
                 closed_hand_34[tile_index] -= 1
                 continue
 
@@ -181,6 +190,79 @@ class HandBuilder:
 
         return waiting, previous_shanten
 
+    def calculate_waits_for_discards(
+        self, closed_hand_34: List[int], all_tiles_34: List[int], discards_34: List[int], use_chiitoitsu: bool = False
+    ):
+        """
+        Return waits and shanten for each discard candidate.
+        Shanten calculator returns the whole discard x draw shanten matrix at once,
+        table based calculator does it faster than calculating hands one by one.
+        """
+        use_chiitoitsu = use_chiitoitsu and not self.player.is_open_hand
+
+        # draw that is useless for the whole hand stays useless after any discard
+        draws_34 = []
+        for tile_index in range(0, 34):
+            if all_tiles_34[tile_index] == 4:
+                continue
+
+            closed_hand_34[tile_index] += 1
+            if not self._is_useless_draw(closed_hand_34, tile_index, use_chiitoitsu):
+                draws_34.append(tile_index)
+            closed_hand_34[tile_index] -= 1
+
+        matrix = self.ai.shanten_calculator.calculate_shanten_matrix(
+            closed_hand_34,
+            discards_34,
+            draws_34,
+            use_chiitoitsu=use_chiitoitsu,
+            calculate_shanten=self.ai.calculate_shanten_or_get_from_cache,
+        )
+
+        results = {}
+        for discard_34 in discards_34:
+            previous_shanten, draws_shanten = matrix[discard_34]
+            closed_hand_34[discard_34] -= 1
+
+            # some hands can't be calculated with tables, so we calculate them in a usual way
+            if previous_shanten is None:
+                previous_shanten = self.ai.calculate_shanten_or_get_from_cache(
+                    closed_hand_34, use_chiitoitsu=use_chiitoitsu
+                )
+
+            waiting = []
+            for tile_index in draws_34:
+                closed_hand_34[tile_index] += 1
+
+                if not self._is_useless_draw(closed_hand_34, tile_index, use_chiitoitsu):
+                    new_shanten = draws_shanten[tile_index]
+                    if new_shanten is None:
+                        new_shanten = self.ai.calculate_shanten_or_get_from_cache(
+                            closed_hand_34, use_chiitoitsu=use_chiitoitsu
+                        )
+
+                    if new_shanten == previous_shanten - 1:
+                        waiting.append(tile_index)
+
+                closed_hand_34[tile_index] -= 1
+
+            closed_hand_34[discard_34] += 1
+            results[discard_34] = (waiting, previous_shanten)
+
+        return results
+
+    @staticmethod
+    def _is_useless_draw(closed_hand_34, tile_index, use_chiitoitsu):
+        """
+        Single isolated tile can't improve the hand, the only exception is 4th copy of the tile
+        and 3rd copy of the tile for chiitoitsu
+        """
+        if closed_hand_34[tile_index] == 4:
+            return False
+        if use_chiitoitsu and closed_hand_34[tile_index] == 3:
+            return False
+        return is_tile_strictly_isolated(closed_hand_34, tile_index)
+
     def find_discard_options(self):
         """
         :param tiles: array of tiles in 136 format
@@ -188,33 +270,46 @@ class HandBuilder:
         :return:
         """
         self._assert_hand_correctness()
+        return self.find_discard_options_for_hand(self.player.hand_state)
 
-        tiles = self.player.tiles
-        closed_hand = self.player.closed_hand
-
-        tiles_34 = TilesConverter.to_34_array(tiles)
-        closed_tiles_34 = TilesConverter.to_34_array(closed_hand)
-        is_agari = self.ai.agari.is_agari(tiles_34, self.player.meld_34_tiles)
+    def find_discard_options_for_hand(self, hand_state: HandState):
+        """
+        The same as find_discard_options, but for the hand that can be different from the player hand.
+        Player melds are used here, player state is not changed.
+        :param hand_state: hand to find discard options for
+        :return:
+        """
+        tiles_34 = list(hand_state.tiles_34)
+        closed_tiles_34 = list(hand_state.closed_hand_34)
+        closed_hand = hand_state.closed_hand_136
+        is_agari = self.ai.is_agari_or_get_from_cache(tiles_34, self.player.meld_34_tiles)
 
         # we decide beforehand if we need to consider chiitoitsu for all of our possible discards
         min_shanten, use_chiitoitsu = self.calculate_shanten_and_decide_hand_structure(closed_tiles_34)
 
-        results = []
+        discards_136 = []
         tile_34_prev = None
         # we iterate in reverse order to naturally handle aka-doras, i.e. discard regular 5 if we have it
-        for tile_136 in reversed(self.player.closed_hand):
+        for tile_136 in reversed(closed_hand):
             tile_34 = tile_136 // 4
             # already added
             if tile_34 == tile_34_prev:
                 continue
             else:
                 tile_34_prev = tile_34
+            discards_136.append(tile_136)
 
-            closed_tiles_34[tile_34] -= 1
-            waiting, shanten = self.calculate_waits(closed_tiles_34, tiles_34, use_chiitoitsu=use_chiitoitsu)
+        waits = self.calculate_waits_for_discards(
+            closed_tiles_34, tiles_34, [x // 4 for x in discards_136], use_chiitoitsu=use_chiitoitsu
+        )
+
+        results = []
+        for tile_136 in discards_136:
+            tile_34 = tile_136 // 4
+            waiting, shanten = waits[tile_34]
             assert shanten >= min_shanten
-            closed_tiles_34[tile_34] += 1
 
+            closed_tiles_34[tile_34] -= 1
             if waiting:
                 wait_to_ukeire = dict(zip(waiting, [self.count_tiles([x], closed_tiles_34) for x in waiting]))
                 results.append(
@@ -227,6 +322,7 @@ class HandBuilder:
                         wait_to_ukeire=wait_to_ukeire,
                     )
                 )
+            closed_tiles_34[tile_34] += 1
 
         if is_agari:
             shanten = Shanten.AGARI_STATE
@@ -285,6 +381,10 @@ class HandBuilder:
         return have_suji, have_kabe
 
     def calculate_second_level_ukeire(self, discard_option, after_meld=False):
+        """
+        Player state is not changed here, we work with copies of player hand after the discard.
+        Results are cached by the hand after discard until something changes on the table.
+        """
         self._assert_hand_correctness()
 
         not_suitable_tiles = (
@@ -294,61 +394,172 @@ class HandBuilder:
         )
         call_riichi = discard_option.with_riichi
 
-        # we are going to do manipulations that require player hand and discards to be updated
-        # so we save original tiles and discards here and restore it at the end of the function
-        player_tiles_original, player_discards_original = self.emulate_discard(discard_option)
+        hand_state = self.player.hand_state.minus(discard_option.tile_to_discard_136)
+
+        # costs are calculated with the turn hand values, furiten depends on our discards
+        table_state = (self.ai.hand_values.table_state, len(self.player.discards))
+        if table_state != self.second_level_cache_table_state:
+            self.second_level_cache = {}
+            self.second_level_cache_table_state = table_state
+
+        cache_key = (
+            hand_state,
+            discard_option.tile_to_discard_34,
+            call_riichi,
+            tuple(not_suitable_tiles),
+        )
+        result = self.second_level_cache.get(cache_key)
+        if result is None:
+            discarded_tiles_34 = [x.value // 4 for x in self.player.discards] + [discard_option.tile_to_discard_34]
+            result = self.calculate_second_level_ukeire_for_hand(
+                hand_state,
+                discarded_tiles_34,
+                discard_option.shanten,
+                discard_option.waiting,
+                call_riichi,
+                not_suitable_tiles,
+            )
+            self.second_level_cache[cache_key] = result
+
+        sum_tiles, sum_cost, average_costs = result
+        discard_option.ukeire_second = sum_tiles
+        if discard_option.shanten == 1:
+            if discard_option.ukeire != 0:
+                discard_option.average_second_level_waits = round(sum_tiles / discard_option.ukeire, 2)
+
+            discard_option.second_level_cost = sum_cost
+            if not average_costs:
+                discard_option.average_second_level_cost = 0
+            else:
+                discard_option.average_second_level_cost = int(sum(average_costs) / len(average_costs))
+
+    def start_discard_decision(self):
+        """
+        Start time budget for the decision. Call to meld evaluates discards for each meld candidate,
+        all of them share the same budget, so it should be started once before the evaluation.
+        """
+        time_budget = self.player.config.DISCARD_TIME_BUDGET
+        self.discard_deadline = time_budget is not None and time.monotonic() + time_budget or None
+        self._discard_budget_hit = False
+        self.discard_budget_stats["decisions"] += 1
+
+    def _calculate_second_level_ukeire_until_deadline(self, discard_options, after_meld):
+        """
+        Discard options should be sorted from the most promising one.
+        When time budget for the decision is over we stop to refine options,
+        but the first option is always refined, so we can choose from refined options only.
+        :return: discard options with calculated second level ukeire
+        """
+        refined_options = []
+        for discard_option in discard_options:
+            if refined_options and self.discard_deadline is not None and time.monotonic() > self.discard_deadline:
+                skipped_options = discard_options[len(refined_options) :]
+                if not self._discard_budget_hit:
+                    self._discard_budget_hit = True
+                    self.discard_budget_stats["budget_hits"] += 1
+                self.discard_budget_stats["skipped_options"] += len(skipped_options)
+                self.player.logger.debug(
+                    log.DISCARD_TIME_BUDGET,
+                    f"Time budget is over, {len(skipped_options)} options were not refined",
+                    context=skipped_options,
+                )
+                break
+
+            self.calculate_second_level_ukeire(discard_option, after_meld)
+            refined_options.append(discard_option)
+        return refined_options
+
+    def calculate_second_level_ukeire_for_hand(
+        self, hand_state, discarded_tiles_34, shanten, waiting, call_riichi, not_suitable_tiles
+    ):
+        """
+        Second level ukeire for the hand after discard, player state is not used for the hand and discards.
+        :param hand_state: hand after discard
+        :param discarded_tiles_34: player discards in 34 format including the discarded tile
+        :return: sum of tiles, sum of costs and average costs
+        """
+        closed_hand_34 = hand_state.closed_hand_34
+        is_open_hand = self.player.is_open_hand
+
+        def estimate_cost_x_ukeire(option):
+            return self._estimate_cost_x_ukeire(
+                option,
+                call_riichi=call_riichi,
+                tiles=list(next_hand_state.minus(option.tile_to_discard_136).tiles_136),
+                discarded_tiles_34=discarded_tiles_34 + [option.tile_to_discard_34],
+                approximate=self.player.config.FEATURE_APPROXIMATE_SECOND_LEVEL_COST,
+            )[0]
 
         sum_tiles = 0
         sum_cost = 0
         average_costs = []
-        for wait_34 in discard_option.waiting:
-            if self.player.is_open_hand and wait_34 in not_suitable_tiles:
+        for wait_34 in waiting:
+            if is_open_hand and wait_34 in not_suitable_tiles:
                 continue
 
-            closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
             live_tiles = 4 - self.player.number_of_revealed_tiles(wait_34, closed_hand_34)
 
             if live_tiles == 0:
                 continue
 
-            wait_136 = self._find_live_tile(wait_34)
+            wait_136 = self._find_live_tile(wait_34, hand_state)
             assert wait_136 is not None
-            self.player.tiles.append(wait_136)
+            next_hand_state = hand_state.plus(wait_136)
 
-            results, shanten = self.find_discard_options()
-            results = [x for x in results if x.shanten == discard_option.shanten - 1]
+            results, next_shanten = self.find_discard_options_for_hand(next_hand_state)
+            results = [x for x in results if x.shanten == shanten - 1]
 
             # let's take best ukeire here
             if results:
                 result_has_atodzuke = False
-                if self.player.is_open_hand:
-                    best_one = results[0]
+                best_cost_x_ukeire = None
+                if is_open_hand:
+                    best_one = None
                     best_ukeire = 0
                     for result in results:
                         has_atodzuke = False
                         ukeire = 0
-                        for wait_34 in result.waiting:
-                            if wait_34 in not_suitable_tiles:
+                        for result_wait_34 in result.waiting:
+                            if result_wait_34 in not_suitable_tiles:
                                 has_atodzuke = True
                             else:
-                                ukeire += result.wait_to_ukeire[wait_34]
+                                ukeire += result.wait_to_ukeire[result_wait_34]
 
                         # let's consider atodzuke waits to be worse than non-atodzuke ones
                         if has_atodzuke:
                             ukeire /= 2
 
-                        # FIXME consider sorting by cost_x_ukeire as well
-                        if (ukeire > best_ukeire) or (ukeire >= best_ukeire and not has_atodzuke):
+                        cost_x_ukeire = None
+                        if (
+                            next_shanten == 0
+                            and best_one is not None
+                            and ukeire == best_ukeire
+                            and not has_atodzuke
+                            and not result_has_atodzuke
+                        ):
+                            # tempai options with the same ukeire are compared by cost,
+                            # it is estimated only for such ties and kept for the best option
+                            if best_cost_x_ukeire is None:
+                                best_cost_x_ukeire = estimate_cost_x_ukeire(best_one)
+                            cost_x_ukeire = estimate_cost_x_ukeire(result)
+                            is_better = cost_x_ukeire >= best_cost_x_ukeire
+                        else:
+                            is_better = (ukeire > best_ukeire) or (ukeire == best_ukeire and not has_atodzuke)
+
+                        if is_better:
                             best_ukeire = ukeire
                             best_one = result
+                            best_cost_x_ukeire = cost_x_ukeire
                             result_has_atodzuke = has_atodzuke
+
+                    if best_one is None:
+                        best_one = results[0]
                 else:
-                    if shanten == 0:
-                        # FIXME save cost_x_ukeire to not calculate it twice
-                        best_one = sorted(
-                            results,
-                            key=lambda x: (-x.ukeire, -self._estimate_cost_x_ukeire(x, call_riichi=call_riichi)[0]),
-                        )[0]
+                    if next_shanten == 0:
+                        costs = [estimate_cost_x_ukeire(x) for x in results]
+                        best_one, best_cost_x_ukeire = sorted(zip(results, costs), key=lambda x: (-x[0].ukeire, -x[1]))[
+                            0
+                        ]
                     else:
                         best_one = sorted(results, key=lambda x: -x.ukeire)[0]
                     best_ukeire = best_one.ukeire
@@ -356,14 +567,10 @@ class HandBuilder:
                 sum_tiles += best_ukeire * live_tiles
 
                 # if we are going to have a tempai (on our second level) - let's also count its cost
-                if shanten == 0:
-                    # temporary update players hand and discards for calculations
-                    next_tile_in_hand = best_one.tile_to_discard_136
-                    tile_for_discard = Tile(next_tile_in_hand, False)
-                    self.player.tiles.remove(next_tile_in_hand)
-                    self.player.discards.append(tile_for_discard)
-
-                    cost_x_ukeire, _ = self._estimate_cost_x_ukeire(best_one, call_riichi=call_riichi)
+                if next_shanten == 0:
+                    cost_x_ukeire = best_cost_x_ukeire
+                    if cost_x_ukeire is None:
+                        cost_x_ukeire = estimate_cost_x_ukeire(best_one)
                     if best_ukeire != 0:
                         average_costs.append(cost_x_ukeire / best_ukeire)
                     # we reduce tile valuation for atodzuke
@@ -371,25 +578,7 @@ class HandBuilder:
                         cost_x_ukeire /= 2
                     sum_cost += cost_x_ukeire
 
-                    # restore original players hand and discard state
-                    self.player.tiles.append(next_tile_in_hand)
-                    self.player.discards.remove(tile_for_discard)
-
-            self.player.tiles.remove(wait_136)
-
-        discard_option.ukeire_second = sum_tiles
-        if discard_option.shanten == 1:
-            if discard_option.ukeire != 0:
-                discard_option.average_second_level_waits = round(sum_tiles / discard_option.ukeire, 2)
-
-            discard_option.second_level_cost = sum_cost
-            if not average_costs:
-                discard_option.average_second_level_cost = 0
-            else:
-                discard_option.average_second_level_cost = int(sum(average_costs) / len(average_costs))
-
-        # restore original state of player hand and discards
-        self.restore_after_emulate_discard(player_tiles_original, player_discards_original)
+        return sum_tiles, sum_cost, average_costs
 
     def _decide_if_use_chiitoitsu(self, shanten_with_chiitoitsu, shanten_without_chiitoitsu):
         # if it's late get 1-shanten for chiitoitsu instead of 2-shanten for another hand
@@ -559,22 +748,23 @@ class HandBuilder:
         # if everything is the same we just choose the first one
         return best_discard_desc[0]["discard_option"]
 
-    def _is_waiting_furiten(self, tile_34):
-        discarded_tiles = [x.value // 4 for x in self.player.discards]
-        return tile_34 in discarded_tiles
+    def _is_waiting_furiten(self, tile_34, discarded_tiles_34=None):
+        if discarded_tiles_34 is None:
+            discarded_tiles_34 = [x.value // 4 for x in self.player.discards]
+        return tile_34 in discarded_tiles_34
 
-    def _is_discard_option_furiten(self, discard_option):
+    def _is_discard_option_furiten(self, discard_option, discarded_tiles_34=None):
         is_furiten = False
 
         for waiting in discard_option.waiting:
-            is_furiten = is_furiten or self._is_waiting_furiten(waiting)
+            is_furiten = is_furiten or self._is_waiting_furiten(waiting, discarded_tiles_34)
 
         return is_furiten
 
     def _choose_best_discard_in_tempai(self, discard_options, after_meld):
         discard_desc = []
 
-        closed_tiles_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_tiles_34 = self.player.hand_state.closed_hand_34
 
         for discard_option in discard_options:
             call_riichi = discard_option.with_riichi
@@ -693,9 +883,7 @@ class HandBuilder:
     def _simplified_danger_valuation(self, discard_option):
         tile_34 = discard_option.tile_to_discard_34
         tile_136 = discard_option.tile_to_discard_136
-        number_of_revealed_tiles = self.player.number_of_revealed_tiles(
-            tile_34, TilesConverter.to_34_array(self.player.closed_hand)
-        )
+        number_of_revealed_tiles = self.player.number_of_revealed_tiles(tile_34, self.player.hand_state.closed_hand_34)
         if is_honor(tile_34):
             if not self.player.table.is_common_yakuhai(tile_34):
                 if number_of_revealed_tiles == 4:
@@ -725,9 +913,7 @@ class HandBuilder:
             simple_danger = 300
 
         if simple_danger != 0:
-            simple_danger += plus_dora(
-                tile_136, self.player.table.dora_indicators, add_aka_dora=self.player.table.has_aka_dora
-            )
+            simple_danger += self.player.table.is_dora(tile_136)
 
         return simple_danger
 
@@ -763,9 +949,7 @@ class HandBuilder:
             ),
         )
 
-    def _choose_best_discard_with_1_shanten(
-        self, discard_options, after_meld, one_shanten_ukeire2_calculated_beforehand
-    ):
+    def _choose_best_discard_with_1_shanten(self, discard_options, after_meld, ukeire2_calculated_options=None):
         discard_options = sorted(discard_options, key=lambda x: (x.shanten, -x.ukeire))
         first_option = discard_options[0]
 
@@ -776,9 +960,13 @@ class HandBuilder:
         possible_options = self._filter_list_by_ukeire_borders(discard_options, first_option.ukeire, ukeire_borders)
 
         # FIXME: hack, sometimes we have already calculated it
-        if not one_shanten_ukeire2_calculated_beforehand:
-            for x in possible_options:
-                self.calculate_second_level_ukeire(x, after_meld)
+        if ukeire2_calculated_options is None:
+            possible_options = self._calculate_second_level_ukeire_until_deadline(possible_options, after_meld)
+        else:
+            calculated_options = [x for x in possible_options if x in ukeire2_calculated_options]
+            possible_options = calculated_options or self._calculate_second_level_ukeire_until_deadline(
+                possible_options, after_meld
+            )
 
         # then we filter by ukeire2
         possible_options = sorted(possible_options, key=self._sorting_rule_for_1_2_3_shanten_simple)
@@ -799,16 +987,14 @@ class HandBuilder:
     def _choose_best_discard_with_2_3_shanten(self, discard_options, after_meld):
         discard_options = sorted(discard_options, key=lambda x: (x.shanten, -x.ukeire))
         first_option = discard_options[0]
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_hand_34 = self.player.hand_state.closed_hand_34
 
         # first we filter by ukeire
         ukeire_borders = self._choose_ukeire_borders(
             first_option, DiscardOption.UKEIRE_FIRST_FILTER_PERCENTAGE, "ukeire"
         )
         possible_options = self._filter_list_by_ukeire_borders(discard_options, first_option.ukeire, ukeire_borders)
-
-        for x in possible_options:
-            self.calculate_second_level_ukeire(x, after_meld)
+        possible_options = self._calculate_second_level_ukeire_until_deadline(possible_options, after_meld)
 
         # then we filter by ukeire 2
         possible_options = sorted(
@@ -847,7 +1033,7 @@ class HandBuilder:
         )
         assert possible_options
 
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_hand_34 = self.player.hand_state.closed_hand_34
         isolated_tiles = [
             x for x in possible_options if is_tile_strictly_isolated(closed_hand_34, x.tile_to_discard_34)
         ]
@@ -922,28 +1108,32 @@ class HandBuilder:
 
         return ukeire_borders
 
-    def _estimate_cost_x_ukeire(self, discard_option, call_riichi):
+    def _estimate_cost_x_ukeire(
+        self, discard_option, call_riichi, tiles=None, discarded_tiles_34=None, approximate=False
+    ):
+        """
+        :param tiles: hand after discard in 136 format, player tiles are used by default
+        :param discarded_tiles_34: discards to check furiten, player discards are used by default
+        :param approximate: use fast hand value estimator, it is good enough to compare options,
+        exact hand calculator is used only when estimation is ambiguous
+        """
         cost_x_ukeire_tsumo = 0
         cost_x_ukeire_ron = 0
         hand_cost_tsumo = 0
         hand_cost_ron = 0
 
-        is_furiten = self._is_discard_option_furiten(discard_option)
+        is_furiten = self._is_discard_option_furiten(discard_option, discarded_tiles_34)
 
         for waiting in discard_option.waiting:
-            hand_value = self.player.ai.estimate_hand_value_or_get_from_cache(
-                waiting, call_riichi=call_riichi, is_tsumo=True
-            )
-            if hand_value.error is None:
-                hand_cost_tsumo = hand_value.cost["main"] + 2 * hand_value.cost["additional"]
+            hand_cost = self._estimate_hand_cost(waiting, tiles, call_riichi, True, approximate)
+            if hand_cost is not None:
+                hand_cost_tsumo = hand_cost
                 cost_x_ukeire_tsumo += hand_cost_tsumo * discard_option.wait_to_ukeire[waiting]
 
             if not is_furiten:
-                hand_value = self.player.ai.estimate_hand_value_or_get_from_cache(
-                    waiting, call_riichi=call_riichi, is_tsumo=False
-                )
-                if hand_value.error is None:
-                    hand_cost_ron = hand_value.cost["main"]
+                hand_cost = self._estimate_hand_cost(waiting, tiles, call_riichi, False, approximate)
+                if hand_cost is not None:
+                    hand_cost_ron = hand_cost
                     cost_x_ukeire_ron += hand_cost_ron * discard_option.wait_to_ukeire[waiting]
 
         # these are abstract numbers used to compare different waits
@@ -958,10 +1148,32 @@ class HandBuilder:
 
         return cost_x_ukeire, hand_cost
 
-    def _find_live_tile(self, tile_34):
+    def _estimate_hand_cost(self, waiting, tiles, call_riichi, is_tsumo, approximate):
+        """
+        Return hand cost (for tsumo we count payments from all players) or None if there is no yaku
+        """
+        if approximate:
+            hand_cost = self.ai.hand_value_estimator.estimate_cost(
+                waiting, tiles or self.player.tiles, is_tsumo, call_riichi
+            )
+            if hand_cost is not None:
+                return hand_cost
+
+        hand_value = self.ai.hand_values.estimate(waiting, tiles=tiles, call_riichi=call_riichi, is_tsumo=is_tsumo)
+        if hand_value.error is not None:
+            return None
+
+        if is_tsumo:
+            return hand_value.cost["main"] + 2 * hand_value.cost["additional"]
+        return hand_value.cost["main"]
+
+    def _find_live_tile(self, tile_34, hand_state: Optional[HandState] = None):
+        if hand_state is None:
+            hand_state = self.player.hand_state
+
         for i in range(0, 4):
             tile = tile_34 * 4 + i
-            if not (tile in self.player.closed_hand) and not (tile in self.player.meld_tiles):
+            if not (tile in hand_state.closed_hand_136) and not (tile in hand_state.meld_tiles_136):
                 return tile
 
         return None
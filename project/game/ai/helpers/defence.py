@@ -1,5 +1,7 @@
 from typing import Optional
 
+from utils.settings_handler import settings
+
 
 class TileDanger:
     IMPOSSIBLE_WAIT = {
@@ -445,12 +447,25 @@ class EnemyDanger:
 
 class TileDangerHandler:
     """
-    Place to keep information of tile danger level for each player
+    Place to keep information of tile danger level for each player.
+    Danger totals, borders and hand costs are stored in lists indexed by opponent seat - 1,
+    danger reasons are kept only when decisions are logged.
     """
 
-    values: dict
+    __slots__ = (
+        "values",
+        "weighted_cost",
+        "can_be_used_for_ryanmen",
+        "_dangers",
+        "_safe",
+        "_borders",
+        "_our_hand_costs",
+        "_enemy_hand_costs",
+        "_weighted_danger",
+    )
+
+    values: Optional[dict]
     weighted_cost: Optional[int]
-    danger_border: dict
     can_be_used_for_ryanmen: bool
 
     # if we estimate that one's threat cost is less than COST_PERCENT_THRESHOLD of other's
@@ -461,29 +476,58 @@ class TileDangerHandler:
         """
         1, 2, 3 is our opponents seats
         """
-        self.values = {1: [], 2: [], 3: []}
+        self.values = settings.PRINT_LOGS and {1: [], 2: [], 3: []} or None
         self.weighted_cost = 0
-        self.danger_border = {1: {}, 2: {}, 3: {}}
-        self.can_be_used_for_ryanmen: bool = False
+        self.can_be_used_for_ryanmen = False
+        self._dangers = [0, 0, 0]
+        # safe tile against the opponent, all other dangers are ignored then
+        self._safe = [False, False, False]
+        # None if border wasn't set for the opponent
+        self._borders = [None, None, None]
+        self._our_hand_costs = [None, None, None]
+        self._enemy_hand_costs = [None, None, None]
+        # sorting key for betaori, calculated on the first request
+        self._weighted_danger = None
 
     def set_danger(self, player_seat, danger):
-        self.values[player_seat].append(danger)
+        self._dangers[player_seat - 1] += danger["value"]
+        if TileDanger.is_safe(danger):
+            self._safe[player_seat - 1] = True
+        if self.values is not None:
+            self.values[player_seat].append(danger)
+        self._weighted_danger = None
 
     def set_danger_border(self, player_seat, danger_border: int, our_hand_cost: int, enemy_hand_cost: int):
-        self.danger_border[player_seat] = {
-            "border": danger_border,
-            "our_hand_cost": our_hand_cost,
-            "enemy_hand_cost": enemy_hand_cost,
-        }
+        self._borders[player_seat - 1] = danger_border
+        self._our_hand_costs[player_seat - 1] = our_hand_cost
+        self._enemy_hand_costs[player_seat - 1] = enemy_hand_cost
+        self._weighted_danger = None
+
+    def is_known_to_be_safe(self, player_seat) -> bool:
+        return self._safe[player_seat - 1]
 
     def get_danger_reasons(self, player_seat):
+        if self.values is None:
+            return []
         return self.values[player_seat]
 
     def get_danger_border(self, player_seat):
-        return self.danger_border[player_seat]
+        index = player_seat - 1
+        if self._borders[index] is None:
+            return {}
+
+        return {
+            "border": self._borders[index],
+            "our_hand_cost": self._our_hand_costs[index],
+            "enemy_hand_cost": self._enemy_hand_costs[index],
+        }
+
+    @property
+    def danger_border(self):
+        return {x: self.get_danger_border(x) for x in range(1, 4)}
 
     def get_total_danger_for_player(self, player_seat):
-        total = sum([x["value"] for x in self.values[player_seat]])
+        total = self._dangers[player_seat - 1]
         assert total >= 0
         return total
 
@@ -494,11 +538,33 @@ class TileDangerHandler:
         return sum(self._danger_array)
 
     def get_weighted_danger(self):
-        costs = [
-            self.get_danger_border(1).get("enemy_hand_cost") or 0,
-            self.get_danger_border(2).get("enemy_hand_cost") or 0,
-            self.get_danger_border(3).get("enemy_hand_cost") or 0,
-        ]
+        if self._weighted_danger is None:
+            self._weighted_danger = self._calculate_weighted_danger()
+        return self._weighted_danger
+
+    def get_min_danger_border(self):
+        return min(self._borders_array)
+
+    def clear_danger(self, player_seat):
+        index = player_seat - 1
+        self._dangers[index] = 0
+        self._safe[index] = False
+        self._borders[index] = None
+        self._our_hand_costs[index] = None
+        self._enemy_hand_costs[index] = None
+        if self.values is not None:
+            self.values[player_seat] = []
+        self._weighted_danger = None
+
+    def is_danger_acceptable(self):
+        for border, danger in zip(self._borders_array, self._danger_array):
+            if border < danger:
+                return False
+
+        return True
+
+    def _calculate_weighted_danger(self):
+        costs = [x or 0 for x in self._enemy_hand_costs]
         max_cost = max(costs)
         if max_cost == 0:
             return 0
@@ -527,32 +593,11 @@ class TileDangerHandler:
 
         return weighted
 
-    def get_min_danger_border(self):
-        return min(self._borders_array)
-
-    def clear_danger(self, player_seat):
-        self.values[player_seat] = []
-        self.danger_border[player_seat] = {}
-
-    def is_danger_acceptable(self):
-        for border, danger in zip(self._borders_array, self._danger_array):
-            if border < danger:
-                return False
-
-        return True
-
     @property
     def _danger_array(self):
-        return [
-            self.get_total_danger_for_player(1),
-            self.get_total_danger_for_player(2),
-            self.get_total_danger_for_player(3),
-        ]
+        assert min(self._dangers) >= 0
+        return self._dangers
 
     @property
     def _borders_array(self):
-        return [
-            self.get_danger_border(1).get("border") or 0,
-            self.get_danger_border(2).get("border") or 0,
-            self.get_danger_border(3).get("border") or 0,
-        ]
+        return [x or 0 for x in self._borders]
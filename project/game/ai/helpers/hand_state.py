@@ -0,0 +1,142 @@
+from typing import List, Tuple
+
+from mahjong.constants import AKA_DORA_LIST
+
+
+class HandState:
+    """
+    Immutable snapshot of the player hand.
+    34 format arrays are tuples, copy them to the list before changes.
+    Hand states with the same closed hand, melds and aka dora are equal,
+    so they can be used as cache keys directly.
+    """
+
+    __slots__ = (
+        "tiles_136",
+        "closed_hand_136",
+        "meld_tiles_136",
+        "tiles_34",
+        "closed_hand_34",
+        "meld_34",
+        "aka_flags",
+        "_key",
+    )
+
+    def __init__(
+        self,
+        tiles_136: Tuple[int, ...],
+        closed_hand_136: Tuple[int, ...],
+        meld_tiles_136: Tuple[int, ...],
+        tiles_34: Tuple[int, ...],
+        closed_hand_34: Tuple[int, ...],
+        meld_34: Tuple[int, ...],
+        aka_flags: int,
+    ):
+        self.tiles_136 = tiles_136
+        self.closed_hand_136 = closed_hand_136
+        self.meld_tiles_136 = meld_tiles_136
+        self.tiles_34 = tiles_34
+        self.closed_hand_34 = closed_hand_34
+        self.meld_34 = meld_34
+        self.aka_flags = aka_flags
+        self._key = None
+
+    @staticmethod
+    def from_tiles(tiles_136: List[int], meld_tiles_136: List[int]) -> "HandState":
+        """
+        :param tiles_136: all player tiles (including tiles from melds)
+        :param meld_tiles_136: tiles from player melds
+        """
+        closed_hand_136 = tuple([x for x in tiles_136 if x not in meld_tiles_136])
+
+        tiles_34 = [0] * 34
+        for tile in tiles_136:
+            tiles_34[tile // 4] += 1
+        closed_hand_34 = [0] * 34
+        for tile in closed_hand_136:
+            closed_hand_34[tile // 4] += 1
+        meld_34 = [0] * 34
+        for tile in meld_tiles_136:
+            meld_34[tile // 4] += 1
+
+        return HandState(
+            tuple(tiles_136),
+            closed_hand_136,
+            tuple(meld_tiles_136),
+            tuple(tiles_34),
+            tuple(closed_hand_34),
+            tuple(meld_34),
+            _build_aka_flags(closed_hand_136, meld_tiles_136),
+        )
+
+    def minus(self, tile_136: int) -> "HandState":
+        """
+        Hand state after tile was removed from the closed hand
+        """
+        tiles_136 = list(self.tiles_136)
+        tiles_136.remove(tile_136)
+        closed_hand_136 = list(self.closed_hand_136)
+        closed_hand_136.remove(tile_136)
+
+        tile_34 = tile_136 // 4
+        return HandState(
+            tuple(tiles_136),
+            tuple(closed_hand_136),
+            self.meld_tiles_136,
+            _change_count(self.tiles_34, tile_34, -1),
+            _change_count(self.closed_hand_34, tile_34, -1),
+            self.meld_34,
+            _build_aka_flags(closed_hand_136, self.meld_tiles_136) if tile_136 in AKA_DORA_LIST else self.aka_flags,
+        )
+
+    def plus(self, tile_136: int) -> "HandState":
+        """
+        Hand state after tile was added to the closed hand
+        """
+        tile_34 = tile_136 // 4
+        closed_hand_136 = self.closed_hand_136 + (tile_136,)
+        return HandState(
+            self.tiles_136 + (tile_136,),
+            closed_hand_136,
+            self.meld_tiles_136,
+            _change_count(self.tiles_34, tile_34, 1),
+            _change_count(self.closed_hand_34, tile_34, 1),
+            self.meld_34,
+            _build_aka_flags(closed_hand_136, self.meld_tiles_136) if tile_136 in AKA_DORA_LIST else self.aka_flags,
+        )
+
+    @property
+    def key(self):
+        if self._key is None:
+            self._key = (
+                int.from_bytes(bytes(self.closed_hand_34), "little"),
+                int.from_bytes(bytes(self.meld_34), "little"),
+                self.aka_flags,
+            )
+        return self._key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, HandState) and self.key == other.key
+
+    def __repr__(self):
+        return f"HandState({list(self.closed_hand_136)}, melds={list(self.meld_tiles_136)})"
+
+
+def _change_count(tiles_34: Tuple[int, ...], tile_34: int, delta: int) -> Tuple[int, ...]:
+    return tiles_34[:tile_34] + (tiles_34[tile_34] + delta,) + tiles_34[tile_34 + 1 :]
+
+
+def _build_aka_flags(closed_hand_136, meld_tiles_136) -> int:
+    """
+    One bit for each aka dora in the closed hand and one bit for each aka dora in melds
+    """
+    flags = 0
+    for i, aka_dora in enumerate(AKA_DORA_LIST):
+        if aka_dora in closed_hand_136:
+            flags |= 1 << i
+        if aka_dora in meld_tiles_136:
+            flags |= 1 << (i + len(AKA_DORA_LIST))
+    return flags
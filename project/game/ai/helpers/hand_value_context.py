@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional
+
+from mahjong.hand_calculating.hand_response import HandResponse
+
+
+class HandValueContext:
+    """
+    Hand values calculated between two table events.
+    Discard, riichi and win decisions ask for the same hand values during one turn,
+    with context we build hand config and hand value cache key only once for each of them.
+    Context is recreated by the AI after the next table event.
+    """
+
+    def __init__(self, ai, table_state):
+        self.ai = ai
+        self.player = ai.player
+        self.table_state = table_state
+        self._values = {}
+
+    def estimate(
+        self, win_tile_34: int, tiles: Optional[List[int]] = None, call_riichi: bool = False, is_tsumo: bool = False
+    ) -> HandResponse:
+        """
+        :param tiles: hand tiles without the win tile, current player tiles are used by default
+        """
+        if not tiles:
+            tiles = self.player.tiles
+
+        key = (self._hand_key(tiles), win_tile_34, call_riichi, is_tsumo)
+        result = self._values.get(key)
+        if result is None:
+            result = self.ai.estimate_hand_value_or_get_from_cache(
+                win_tile_34, tiles=tiles, call_riichi=call_riichi, is_tsumo=is_tsumo
+            )
+            self._values[key] = result
+        return result
+
+    def estimate_waits(
+        self, waiting: List[int], tiles: Optional[List[int]] = None, call_riichi: bool = False, is_tsumo: bool = False
+    ) -> Dict[int, HandResponse]:
+        """
+        Hand values for all waits of the tempai hand
+        """
+        return {x: self.estimate(x, tiles, call_riichi, is_tsumo) for x in waiting}
+
+    def calculate_exact(
+        self,
+        win_tile_136: int,
+        tiles: Optional[List[int]] = None,
+        call_riichi: bool = False,
+        is_tsumo: bool = False,
+        is_chankan: bool = False,
+        is_haitei: bool = False,
+        is_ippatsu: bool = False,
+    ) -> HandResponse:
+        if not tiles:
+            tiles = self.player.tiles
+
+        key = (self._hand_key(tiles), win_tile_136, call_riichi, is_tsumo, is_chankan, is_haitei, is_ippatsu, True)
+        result = self._values.get(key)
+        if result is None:
+            result = self.ai.calculate_exact_hand_value_or_get_from_cache(
+                win_tile_136,
+                tiles=tiles,
+                call_riichi=call_riichi,
+                is_tsumo=is_tsumo,
+                is_chankan=is_chankan,
+                is_haitei=is_haitei,
+                is_ippatsu=is_ippatsu,
+            )
+            self._values[key] = result
+        return result
+
+    def __len__(self):
+        return len(self._values)
+
+    def _hand_key(self, tiles: List[int]):
+        # melds can't be changed without table event, but it is cheap to be sure
+        return tuple(sorted(tiles)), len(self.player.melds)
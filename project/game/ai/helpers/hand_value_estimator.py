@@ -0,0 +1,100 @@
+from typing import List, Optional
+
+from mahjong.constants import EAST, HONOR_INDICES, TERMINAL_INDICES
+from mahjong.hand_calculating.hand_config import HandConfig
+from mahjong.hand_calculating.scores import ScoresCalculator
+
+NOT_SIMPLE_INDICES = set(TERMINAL_INDICES + HONOR_INDICES)
+
+
+class HandValueEstimator:
+    """
+    Fast approximation of the winning hand cost, to be used only to compare discard options.
+
+    We don't divide the hand, only yaku that can be found by tiles counts are checked:
+    riichi, menzen tsumo, tanyao, yakuhai, honitsu, chinitsu and chiitoitsu.
+    Fu is not calculated, we use 30 fu (40 fu for closed ron and 25 fu for chiitoitsu).
+    So usually estimated cost is a lower bound of the real cost (see benchmarks.hand_value_estimator).
+
+    When none of these yaku was found the hand can still have other yaku (e.g. pinfu),
+    the estimation is ambiguous then and the exact hand calculator should be used.
+    """
+
+    REGULAR_HAND_FU = 30
+    CLOSED_RON_FU = 40
+    CHIITOITSU_FU = 25
+
+    # cost by han, fu, is_dealer and is_tsumo
+    _costs = {}
+
+    def __init__(self, player):
+        self.player = player
+
+    def estimate_cost(self, win_tile_34: int, tiles_136: List[int], is_tsumo: bool, call_riichi: bool) -> Optional[int]:
+        """
+        :param win_tile_34: win tile in 34 format, we don't consider it as aka dora
+        :param tiles_136: hand tiles in 136 format (including tiles from melds) without the win tile
+        :return: tsumo cost (main + 2 additional) or ron cost, the same as we use for cost_x_ukeire.
+        None if estimation is ambiguous.
+        """
+        tiles_34 = [0] * 34
+        for tile in tiles_136:
+            tiles_34[tile // 4] += 1
+        tiles_34[win_tile_34] += 1
+
+        is_open_hand = self.player.is_open_hand
+
+        fu = self.REGULAR_HAND_FU
+        if not is_tsumo and not is_open_hand:
+            fu = self.CLOSED_RON_FU
+        han = 0
+        if call_riichi:
+            han += 1
+        if is_tsumo and not is_open_hand:
+            han += 1
+
+        used_tiles = [x for x in range(0, 34) if tiles_34[x]]
+
+        if not is_open_hand and len(used_tiles) == 7 and all(tiles_34[x] == 2 for x in used_tiles):
+            han += 2
+            fu = self.CHIITOITSU_FU
+
+        if (not is_open_hand or self.player.table.has_open_tanyao) and not NOT_SIMPLE_INDICES.intersection(used_tiles):
+            han += 1
+
+        # honor tiles can't be used in sequences, so three of them are always a pon
+        for valued_honor in self.player.valued_honors:
+            if tiles_34[valued_honor] >= 3:
+                han += 1
+
+        suits = set([x // 9 for x in used_tiles if x < 27])
+        if len(suits) == 1:
+            if used_tiles[-1] >= 27:
+                han += is_open_hand and 2 or 3
+            else:
+                han += is_open_hand and 5 or 6
+
+        if han == 0:
+            return None
+
+        table = self.player.table
+        for tile in tiles_136:
+            han += table.is_dora(tile)
+        # win tile is not considered as aka dora
+        han += table.is_dora(win_tile_34 * 4 + 1)
+
+        return self._get_cost(han, fu, self.player.is_dealer, is_tsumo)
+
+    @classmethod
+    def _get_cost(cls, han: int, fu: int, is_dealer: bool, is_tsumo: bool) -> int:
+        key = (min(han, 13), fu, is_dealer, is_tsumo)
+        cost = cls._costs.get(key)
+        if cost is None:
+            # only dealer status and tsumo flag affect hand cost here
+            config = HandConfig(is_tsumo=is_tsumo, player_wind=is_dealer and EAST or None)
+            scores = ScoresCalculator().calculate_scores(key[0], fu, config)
+            cost = scores["main"]
+            if is_tsumo:
+                cost += 2 * scores["additional"]
+            cls._costs[key] = cost
+        return cost
@@ -1,84 +1,84 @@
-from utils.general import revealed_suits_tiles
-
-
 class Kabe:
     STRONG_KABE = 0
     WEAK_KABE = 1
     PARTIAL_KABE = 2
 
+    # all indices shifted to -1
+    KABE_MATRIX = [
+        {"indices": [1], "blocked_tiles": [0], "type": STRONG_KABE},
+        {"indices": [2], "blocked_tiles": [0, 1], "type": STRONG_KABE},
+        {"indices": [6], "blocked_tiles": [7, 8], "type": STRONG_KABE},
+        {"indices": [7], "blocked_tiles": [8], "type": STRONG_KABE},
+        {"indices": [0, 3], "blocked_tiles": [2, 3], "type": STRONG_KABE},
+        {"indices": [1, 3], "blocked_tiles": [2], "type": STRONG_KABE},
+        {"indices": [1, 4], "blocked_tiles": [2, 3], "type": STRONG_KABE},
+        {"indices": [2, 4], "blocked_tiles": [3], "type": STRONG_KABE},
+        {"indices": [2, 5], "blocked_tiles": [3, 4], "type": STRONG_KABE},
+        {"indices": [3, 5], "blocked_tiles": [4], "type": STRONG_KABE},
+        {"indices": [3, 6], "blocked_tiles": [4, 5], "type": STRONG_KABE},
+        {"indices": [4, 6], "blocked_tiles": [5], "type": STRONG_KABE},
+        {"indices": [4, 7], "blocked_tiles": [5, 6], "type": STRONG_KABE},
+        {"indices": [5, 7], "blocked_tiles": [6], "type": STRONG_KABE},
+        {"indices": [5, 8], "blocked_tiles": [6, 7], "type": STRONG_KABE},
+        {"indices": [3], "blocked_tiles": [1, 2], "type": WEAK_KABE},
+        {"indices": [4], "blocked_tiles": [2, 6], "type": WEAK_KABE},
+        {"indices": [5], "blocked_tiles": [6, 7], "type": WEAK_KABE},
+        {"indices": [1, 5], "blocked_tiles": [3], "type": WEAK_KABE},
+        {"indices": [2, 6], "blocked_tiles": [4], "type": WEAK_KABE},
+        {"indices": [3, 7], "blocked_tiles": [5], "type": WEAK_KABE},
+    ]
+
+    # kabe types (0-8 presentation) for each pair of 9 bits masks: suit tiles with 4 and with 3 visible copies
+    _suit_kabe_cache = {}
+
     def __init__(self, player):
         self.player = player
 
     def find_all_kabe(self, tiles_34):
-        # all indices shifted to -1
-        kabe_matrix = [
-            {"indices": [1], "blocked_tiles": [0], "type": Kabe.STRONG_KABE},
-            {"indices": [2], "blocked_tiles": [0, 1], "type": Kabe.STRONG_KABE},
-            {"indices": [6], "blocked_tiles": [7, 8], "type": Kabe.STRONG_KABE},
-            {"indices": [7], "blocked_tiles": [8], "type": Kabe.STRONG_KABE},
-            {"indices": [0, 3], "blocked_tiles": [2, 3], "type": Kabe.STRONG_KABE},
-            {"indices": [1, 3], "blocked_tiles": [2], "type": Kabe.STRONG_KABE},
-            {"indices": [1, 4], "blocked_tiles": [2, 3], "type": Kabe.STRONG_KABE},
-            {"indices": [2, 4], "blocked_tiles": [3], "type": Kabe.STRONG_KABE},
-            {"indices": [2, 5], "blocked_tiles": [3, 4], "type": Kabe.STRONG_KABE},
-            {"indices": [3, 5], "blocked_tiles": [4], "type": Kabe.STRONG_KABE},
-            {"indices": [3, 6], "blocked_tiles": [4, 5], "type": Kabe.STRONG_KABE},
-            {"indices": [4, 6], "blocked_tiles": [5], "type": Kabe.STRONG_KABE},
-            {"indices": [4, 7], "blocked_tiles": [5, 6], "type": Kabe.STRONG_KABE},
-            {"indices": [5, 7], "blocked_tiles": [6], "type": Kabe.STRONG_KABE},
-            {"indices": [5, 8], "blocked_tiles": [6, 7], "type": Kabe.STRONG_KABE},
-            {"indices": [3], "blocked_tiles": [1, 2], "type": Kabe.WEAK_KABE},
-            {"indices": [4], "blocked_tiles": [2, 6], "type": Kabe.WEAK_KABE},
-            {"indices": [5], "blocked_tiles": [6, 7], "type": Kabe.WEAK_KABE},
-            {"indices": [1, 5], "blocked_tiles": [3], "type": Kabe.WEAK_KABE},
-            {"indices": [2, 6], "blocked_tiles": [4], "type": Kabe.WEAK_KABE},
-            {"indices": [3, 7], "blocked_tiles": [5], "type": Kabe.WEAK_KABE},
-        ]
-
-        kabe_tiles_strong = []
-        kabe_tiles_weak = []
-        kabe_tiles_partial = []
+        """
+        :param tiles_34: our hand, all other visible tiles are taken from the table
+        """
+        revealed_tiles = self.player.table.revealed_tiles
 
-        suits = revealed_suits_tiles(self.player, tiles_34)
+        kabe_tiles = []
         for x in range(0, 3):
-            suit = suits[x]
+            base = x * 9
 
             # "kabe" - 4 revealed tiles
-            kabe_tiles = []
-            partial_kabe_tiles = []
+            kabe_mask = 0
+            partial_kabe_mask = 0
             for y in range(0, 9):
-                suit_tile = suit[y]
-                if suit_tile == 4:
-                    kabe_tiles.append(y)
-                elif suit_tile == 3:
-                    partial_kabe_tiles.append(y)
+                visible_tiles = tiles_34[base + y] + revealed_tiles[base + y]
+                if visible_tiles == 4:
+                    kabe_mask |= 1 << y
+                elif visible_tiles == 3:
+                    partial_kabe_mask |= 1 << y
 
-            for matrix_item in kabe_matrix:
-                if len(list(set(matrix_item["indices"]) - set(kabe_tiles))) == 0:
-                    for tile in matrix_item["blocked_tiles"]:
-                        if matrix_item["type"] == Kabe.STRONG_KABE:
-                            kabe_tiles_strong.append(tile + x * 9)
-                        else:
-                            kabe_tiles_weak.append(tile + x * 9)
+            if not kabe_mask and not partial_kabe_mask:
+                continue
 
-                if len(list(set(matrix_item["indices"]) - set(partial_kabe_tiles))) == 0:
-                    for tile in matrix_item["blocked_tiles"]:
-                        kabe_tiles_partial.append(tile + x * 9)
+            key = (kabe_mask, partial_kabe_mask)
+            suit_kabe = self._suit_kabe_cache.get(key)
+            if suit_kabe is None:
+                suit_kabe = self._find_suit_kabe(kabe_mask, partial_kabe_mask)
+                self._suit_kabe_cache[key] = suit_kabe
 
-        kabe_tiles_unique = []
-        kabe_tiles_strong = list(set(kabe_tiles_strong))
-        kabe_tiles_weak = list(set(kabe_tiles_weak))
-        kabe_tiles_partial = list(set(kabe_tiles_partial))
+            kabe_tiles += [(kabe_type, base + tile) for tile, kabe_type in suit_kabe]
 
-        for tile in kabe_tiles_strong:
-            kabe_tiles_unique.append({"tile": tile, "type": Kabe.STRONG_KABE})
+        # strong kabe first, then weak and partial
+        return [{"tile": tile, "type": kabe_type} for kabe_type, tile in sorted(kabe_tiles)]
 
-        for tile in kabe_tiles_weak:
-            if tile not in kabe_tiles_strong:
-                kabe_tiles_unique.append({"tile": tile, "type": Kabe.WEAK_KABE})
+    @classmethod
+    def _find_suit_kabe(cls, kabe_mask, partial_kabe_mask):
+        kabe_types = {}
+        for matrix_item in cls.KABE_MATRIX:
+            item_mask = sum([1 << x for x in matrix_item["indices"]])
+            if item_mask & kabe_mask == item_mask:
+                for tile in matrix_item["blocked_tiles"]:
+                    kabe_types[tile] = min(kabe_types.get(tile, cls.PARTIAL_KABE), matrix_item["type"])
 
-        for tile in kabe_tiles_partial:
-            if tile not in kabe_tiles_strong and tile not in kabe_tiles_weak:
-                kabe_tiles_unique.append({"tile": tile, "type": Kabe.PARTIAL_KABE})
+            if item_mask & partial_kabe_mask == item_mask:
+                for tile in matrix_item["blocked_tiles"]:
+                    kabe_types[tile] = min(kabe_types.get(tile, cls.PARTIAL_KABE), cls.PARTIAL_KABE)
 
-        return kabe_tiles_unique
+        return tuple(kabe_types.items())
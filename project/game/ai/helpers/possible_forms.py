@@ -1,6 +1,5 @@
 from game.ai.helpers.defence import TileDanger
 from mahjong.constants import EAST
-from mahjong.tile import TilesConverter
 from utils.general import revealed_suits_tiles
 
 
@@ -18,7 +17,7 @@ class PossibleFormsAnalyzer:
     def calculate_possible_forms(self, safe_tiles):
         possible_forms_34 = [None] * 34
 
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_hand_34 = self.player.hand_state.closed_hand_34
 
         # first of all let's find suji for suits tiles
         suits = revealed_suits_tiles(self.player, closed_hand_34)
@@ -32,76 +31,14 @@ class PossibleFormsAnalyzer:
                 if closed_hand_34[tile_34_index] == 0:
                     continue
 
-                forms_count = self._init_zero_forms_count()
-                possible_forms_34[tile_34_index] = forms_count
-
-                # that means there are no possible forms for him to wait (we don't consider furiten here,
-                # because we are defending from enemy taking ron)
-                if tile_34_index in safe_tiles:
-                    continue
-
-                # tanki
-                forms_count[self.POSSIBLE_TANKI] = 4 - suit[y]
-
-                # syanpon
-                if suit[y] == 1:
-                    forms_count[self.POSSIBLE_SYANPON] = 3
-                if suit[y] == 2:
-                    forms_count[self.POSSIBLE_SYANPON] = 1
-                else:
-                    forms_count[self.POSSIBLE_SYANPON] = 0
-
-                # penchan
-                if y == 2:
-                    forms_count[self.POSSIBLE_PENCHAN] = (4 - suit[0]) * (4 - suit[1])
-                elif y == 6:
-                    forms_count[self.POSSIBLE_PENCHAN] = (4 - suit[8]) * (4 - suit[7])
-
-                # kanchan
-                if 1 <= y <= 7:
-                    tiles_cnt_left = 4 - suit[y - 1]
-                    tiles_cnt_right = 4 - suit[y + 1]
-                    forms_count[self.POSSIBLE_KANCHAN] = tiles_cnt_left * tiles_cnt_right
-
-                # ryanmen
-                if 0 <= y <= 2:
-                    if not (tile_34_index + 3) in safe_tiles:
-                        forms_right = (4 - suit[y + 1]) * (4 - suit[y + 2])
-                        if forms_right != 0:
-                            forms_count[self.POSSIBLE_RYANMEN_SIDES] = 1
-                            forms_count[self.POSSIBLE_RYANMEN] = (4 - suit[y + 1]) * (4 - suit[y + 2])
-                elif 3 <= y <= 5:
-                    if not (tile_34_index - 3) in safe_tiles:
-                        forms_left = (4 - suit[y - 1]) * (4 - suit[y - 2])
-                        if forms_left != 0:
-                            forms_count[self.POSSIBLE_RYANMEN_SIDES] += 1
-                            forms_count[self.POSSIBLE_RYANMEN] += forms_left
-                    if not (tile_34_index + 3) in safe_tiles:
-                        forms_right = (4 - suit[y + 1]) * (4 - suit[y + 2])
-                        if forms_right != 0:
-                            forms_count[self.POSSIBLE_RYANMEN_SIDES] += 1
-                            forms_count[self.POSSIBLE_RYANMEN] += forms_right
-                else:
-                    if not (tile_34_index - 3) in safe_tiles:
-                        forms_left = (4 - suit[y - 1]) * (4 - suit[y - 2])
-                        if forms_left != 0:
-                            forms_count[self.POSSIBLE_RYANMEN] = (4 - suit[y - 1]) * (4 - suit[y - 2])
-                            forms_count[self.POSSIBLE_RYANMEN_SIDES] = 1
+                possible_forms_34[tile_34_index] = self._calculate_suit_tile_forms(suit, y, tile_34_index, safe_tiles)
 
         for tile_34_index in range(EAST, 34):
             if closed_hand_34[tile_34_index] == 0:
                 continue
 
-            forms_count = self._init_zero_forms_count()
-            possible_forms_34[tile_34_index] = forms_count
-
             total_tiles = self.player.number_of_revealed_tiles(tile_34_index, closed_hand_34)
-
-            # tanki
-            forms_count[self.POSSIBLE_TANKI] = 4 - total_tiles
-
-            # syanpon
-            forms_count[self.POSSIBLE_SYANPON] = 3 - total_tiles if total_tiles < 3 else 0
+            possible_forms_34[tile_34_index] = self._calculate_honor_tile_forms(total_tiles)
 
         return possible_forms_34
 
@@ -125,6 +62,75 @@ class PossibleFormsAnalyzer:
         danger += forms_count[PossibleFormsAnalyzer.POSSIBLE_RYANMEN] * TileDanger.FORM_BONUS_RYANMEN
         return danger
 
+    def _calculate_suit_tile_forms(self, suit, y, tile_34_index, safe_tiles):
+        forms_count = self._init_zero_forms_count()
+
+        # that means there are no possible forms for him to wait (we don't consider furiten here,
+        # because we are defending from enemy taking ron)
+        if tile_34_index in safe_tiles:
+            return forms_count
+
+        # tanki
+        forms_count[self.POSSIBLE_TANKI] = 4 - suit[y]
+
+        # syanpon
+        if suit[y] == 1:
+            forms_count[self.POSSIBLE_SYANPON] = 3
+        if suit[y] == 2:
+            forms_count[self.POSSIBLE_SYANPON] = 1
+        else:
+            forms_count[self.POSSIBLE_SYANPON] = 0
+
+        # penchan
+        if y == 2:
+            forms_count[self.POSSIBLE_PENCHAN] = (4 - suit[0]) * (4 - suit[1])
+        elif y == 6:
+            forms_count[self.POSSIBLE_PENCHAN] = (4 - suit[8]) * (4 - suit[7])
+
+        # kanchan
+        if 1 <= y <= 7:
+            tiles_cnt_left = 4 - suit[y - 1]
+            tiles_cnt_right = 4 - suit[y + 1]
+            forms_count[self.POSSIBLE_KANCHAN] = tiles_cnt_left * tiles_cnt_right
+
+        # ryanmen
+        if 0 <= y <= 2:
+            if not (tile_34_index + 3) in safe_tiles:
+                forms_right = (4 - suit[y + 1]) * (4 - suit[y + 2])
+                if forms_right != 0:
+                    forms_count[self.POSSIBLE_RYANMEN_SIDES] = 1
+                    forms_count[self.POSSIBLE_RYANMEN] = (4 - suit[y + 1]) * (4 - suit[y + 2])
+        elif 3 <= y <= 5:
+            if not (tile_34_index - 3) in safe_tiles:
+                forms_left = (4 - suit[y - 1]) * (4 - suit[y - 2])
+                if forms_left != 0:
+                    forms_count[self.POSSIBLE_RYANMEN_SIDES] += 1
+                    forms_count[self.POSSIBLE_RYANMEN] += forms_left
+            if not (tile_34_index + 3) in safe_tiles:
+                forms_right = (4 - suit[y + 1]) * (4 - suit[y + 2])
+                if forms_right != 0:
+                    forms_count[self.POSSIBLE_RYANMEN_SIDES] += 1
+                    forms_count[self.POSSIBLE_RYANMEN] += forms_right
+        else:
+            if not (tile_34_index - 3) in safe_tiles:
+                forms_left = (4 - suit[y - 1]) * (4 - suit[y - 2])
+                if forms_left != 0:
+                    forms_count[self.POSSIBLE_RYANMEN] = (4 - suit[y - 1]) * (4 - suit[y - 2])
+                    forms_count[self.POSSIBLE_RYANMEN_SIDES] = 1
+
+        return forms_count
+
+    def _calculate_honor_tile_forms(self, total_tiles):
+        forms_count = self._init_zero_forms_count()
+
+        # tanki
+        forms_count[self.POSSIBLE_TANKI] = 4 - total_tiles
+
+        # syanpon
+        forms_count[self.POSSIBLE_SYANPON] = 3 - total_tiles if total_tiles < 3 else 0
+
+        return forms_count
+
     def _init_zero_forms_count(self):
         forms_count = dict()
         forms_count[self.POSSIBLE_TANKI] = 0
@@ -134,3 +140,60 @@ class PossibleFormsAnalyzer:
         forms_count[self.POSSIBLE_RYANMEN] = 0
         forms_count[self.POSSIBLE_RYANMEN_SIDES] = 0
         return forms_count
+
+
+class PossibleFormsTracker(PossibleFormsAnalyzer):
+    """
+    Possible forms against one enemy that are updated incrementally.
+    Forms of the tile depend only on visible tiles (revealed + our closed hand) at distance 2 in the suit
+    and on safe tiles at distance 3, so after changes on the table or in our hand we recalculate only
+    forms around changed tiles. Results are the same as PossibleFormsAnalyzer gives.
+    """
+
+    def __init__(self, player):
+        super().__init__(player)
+        # visible tiles and safe tiles from the previous calculation
+        self._visible_tiles_34 = [None] * 34
+        self._safe_tiles = set()
+        # forms for each tile, calculated forms are never changed, so they can be shared
+        self._forms_34 = [None] * 34
+
+    def calculate_possible_forms(self, safe_tiles):
+        closed_hand_34 = self.player.hand_state.closed_hand_34
+        revealed_tiles = self.player.table.revealed_tiles
+        safe_tiles = set(safe_tiles)
+
+        tiles_to_update = set()
+        for tile_34 in range(0, 34):
+            visible_tiles = closed_hand_34[tile_34] + revealed_tiles[tile_34]
+            if visible_tiles == self._visible_tiles_34[tile_34]:
+                continue
+
+            assert visible_tiles <= 4, "we have only 4 tiles in the game"
+            self._visible_tiles_34[tile_34] = visible_tiles
+            if tile_34 >= EAST:
+                tiles_to_update.add(tile_34)
+            else:
+                suit_start = tile_34 - tile_34 % 9
+                tiles_to_update.update(range(max(suit_start, tile_34 - 2), min(suit_start + 9, tile_34 + 3)))
+
+        for tile_34 in safe_tiles.symmetric_difference(self._safe_tiles):
+            # safe honors don't change possible forms
+            if tile_34 >= EAST:
+                continue
+
+            suit_start = tile_34 - tile_34 % 9
+            tiles_to_update.update([x for x in [tile_34 - 3, tile_34, tile_34 + 3] if suit_start <= x < suit_start + 9])
+        self._safe_tiles = safe_tiles
+
+        for tile_34 in tiles_to_update:
+            if tile_34 >= EAST:
+                self._forms_34[tile_34] = self._calculate_honor_tile_forms(self._visible_tiles_34[tile_34])
+            else:
+                suit_start = tile_34 - tile_34 % 9
+                self._forms_34[tile_34] = self._calculate_suit_tile_forms(
+                    self._visible_tiles_34[suit_start : suit_start + 9], tile_34 - suit_start, tile_34, safe_tiles
+                )
+
+        # we are only interested in tiles that we can discard
+        return [closed_hand_34[x] and self._forms_34[x] or None for x in range(0, 34)]
@@ -0,0 +1,458 @@
+import os
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mahjong.shanten import Shanten
+
+TABLES_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+SUITS_TABLE_PATH = os.path.join(TABLES_FOLDER, "suits_shanten.bin")
+
+# max number of mentsu + tatsu that we are considering for the regular hand
+MAX_BLOCKS = 4
+# for each suit we store best values for 0..4 blocks without and with pair (head)
+SUIT_VALUES_SIZE = (MAX_BLOCKS + 1) * 2
+# all possible counts vectors for 9 tiles of the suit (0..4 copies for each tile)
+SUIT_TABLE_SIZE = 5**9
+# base 5 index weight for each tile of the suit
+SUIT_INDEX_POWERS = [5 ** (8 - i) for i in range(0, 9)]
+
+_suits_table = None
+_combined_values_cache = {}
+_best_values_cache = {}
+
+
+class ShantenCalculator(Shanten):
+    """
+    Shanten calculator interface that is used by AI (see SHANTEN_CALCULATOR_CLASS in bot config).
+    """
+
+    def calculate_shanten_matrix(
+        self,
+        tiles_34: List[int],
+        discards_34: List[int],
+        draws_34: List[int],
+        use_chiitoitsu: bool = False,
+        calculate_shanten: Optional[Callable[[List[int], bool], int]] = None,
+    ) -> Dict[int, Tuple[Optional[int], List[Optional[int]]]]:
+        """
+        Calculate shanten for the hand after each discard and after each discard + draw.
+
+        Default implementation calculates each hand of the matrix separately,
+        calculate_shanten(tiles_34, use_chiitoitsu) can be passed to use cached values.
+
+        Return dict: discard -> (shanten after discard, list of 34 shanten values after draws).
+        None is returned for not requested draws.
+        """
+        if calculate_shanten is None:
+            calculate_shanten = self._calculate_hand_shanten
+
+        results = {}
+        for discard_34 in discards_34:
+            tiles_34[discard_34] -= 1
+            shanten = calculate_shanten(tiles_34, use_chiitoitsu)
+
+            draws_shanten = [None] * 34
+            for draw_34 in draws_34:
+                tiles_34[draw_34] += 1
+                draws_shanten[draw_34] = calculate_shanten(tiles_34, use_chiitoitsu)
+                tiles_34[draw_34] -= 1
+
+            tiles_34[discard_34] += 1
+            results[discard_34] = (shanten, draws_shanten)
+
+        return results
+
+    def _calculate_hand_shanten(self, tiles_34: List[int], use_chiitoitsu: bool) -> int:
+        if use_chiitoitsu:
+            return self.calculate_shanten_for_chiitoitsu_hand(tiles_34)
+        return self.calculate_shanten_for_regular_hand(tiles_34)
+
+
+class TableShanten(ShantenCalculator):
+    """
+    Regular hand shanten based on precomputed tables for each suit.
+
+    For each suit counts vector (base 5 index) the table stores the best value of 2 * mentsu + tatsu
+    for 0..4 blocks without and with pair. With these values we only need to combine three suits and honors.
+
+    Chiitoitsu and kokushi calculations are the same as in the base class.
+
+    Hands with 4 copies of any tile are calculated by the base class,
+    because base algorithm has special handling for them that is not possible to store in the tables,
+    and we want to have exactly the same results.
+    """
+
+    def __init__(self):
+        self.suits_table = load_suits_table()
+
+    def calculate_shanten_for_regular_hand(self, tiles_34: List[int]) -> int:
+        if 4 in tiles_34:
+            return super().calculate_shanten_for_regular_hand(tiles_34)
+
+        count_of_tiles = sum(tiles_34)
+        assert count_of_tiles <= 14, f"Too many tiles = {count_of_tiles}"
+
+        suits = [self.suit_values(tiles_34, 0), self.suit_values(tiles_34, 9), self.suit_values(tiles_34, 18)]
+        return self.combine_values(suits, honors_values(tiles_34), count_of_tiles)
+
+    def suit_values(self, tiles_34: List[int], offset: int) -> bytes:
+        return self._values_by_index(suit_table_index(tiles_34, offset))
+
+    @staticmethod
+    def combine_values(suits, honors, count_of_tiles):
+        init_mentsu = (14 - count_of_tiles) // 3
+        values = combine_suit_values(combine_suit_values(suits[0], suits[1]), suits[2])
+        return 8 - init_mentsu * 2 - best_hand_value(values, honors, MAX_BLOCKS - init_mentsu)
+
+    def calculate_shanten_matrix(
+        self,
+        tiles_34: List[int],
+        discards_34: List[int],
+        draws_34: List[int],
+        use_chiitoitsu: bool = False,
+        calculate_shanten: Optional[Callable[[List[int], bool], int]] = None,
+    ) -> Dict[int, Tuple[Optional[int], List[Optional[int]]]]:
+        """
+        Calculate shanten for the hand after each discard and after each discard + draw at once.
+        Table lookups are cheaper than cache lookups, so calculate_shanten is not used here.
+
+        Suit values of the hand are looked up once, for each discard only the suit of discarded tile is changed
+        and for each draw only the suit of the drawn tile, so we don't need to look at the whole hand again.
+
+        Return dict: discard -> (shanten after discard, list of 34 shanten values after draws).
+        None is returned for hands that can't be calculated with tables (hands with 4 copies of tile)
+        and for not requested draws.
+        """
+        if use_chiitoitsu:
+            return self._calculate_chiitoitsu_shanten_matrix(tiles_34, discards_34, draws_34)
+
+        count_of_tiles = sum(tiles_34)
+        assert count_of_tiles <= 15, f"Too many tiles = {count_of_tiles}"
+
+        # shanten after discard
+        init_mentsu = (14 - (count_of_tiles - 1)) // 3
+        max_blocks = MAX_BLOCKS - init_mentsu
+        base_shanten = 8 - init_mentsu * 2
+        # shanten after discard and draw
+        draw_init_mentsu = (14 - count_of_tiles) // 3
+        draw_max_blocks = MAX_BLOCKS - draw_init_mentsu
+        draw_base_shanten = 8 - draw_init_mentsu * 2
+
+        four_copies = [x for x in range(0, 34) if tiles_34[x] == 4]
+        indices = [suit_table_index(tiles_34, 0), suit_table_index(tiles_34, 9), suit_table_index(tiles_34, 18)]
+
+        honor_pons = 0
+        honor_pairs = 0
+        for i in range(27, 34):
+            if tiles_34[i] == 3:
+                honor_pons += 1
+            elif tiles_34[i] == 2:
+                honor_pairs += 1
+
+        results = {}
+        for discard_34 in discards_34:
+            draws_shanten = [None] * 34
+            # there are still 4 copies of some tile after the discard
+            if four_copies and four_copies != [discard_34]:
+                results[discard_34] = (None, draws_shanten)
+                continue
+
+            tiles_34[discard_34] -= 1
+
+            row_indices = indices[:]
+            row_pons = honor_pons
+            row_pairs = honor_pairs
+            if discard_34 < 27:
+                row_indices[discard_34 // 9] -= SUIT_INDEX_POWERS[discard_34 % 9]
+            else:
+                row_pons, row_pairs = _honors_after_change(row_pons, row_pairs, tiles_34[discard_34] + 1, -1)
+
+            row_suits = [self._values_by_index(x) for x in row_indices]
+            row_honors = _honors_values_table[row_pons][row_pairs]
+            # for each suit of the drawn tile we need combined values of other two suits
+            other_suits = [
+                combine_suit_values(row_suits[1], row_suits[2]),
+                combine_suit_values(row_suits[0], row_suits[2]),
+                combine_suit_values(row_suits[0], row_suits[1]),
+            ]
+            all_suits = combine_suit_values(other_suits[2], row_suits[2])
+            row_shanten = base_shanten - best_hand_value(all_suits, row_honors, max_blocks)
+
+            for draw_34 in draws_34:
+                count = tiles_34[draw_34]
+                # we will have 4 copies of the tile after the draw
+                if count == 3:
+                    continue
+
+                if draw_34 < 27:
+                    suit = draw_34 // 9
+                    values = self._values_by_index(row_indices[suit] + SUIT_INDEX_POWERS[draw_34 % 9])
+                    values = combine_suit_values(other_suits[suit], values)
+                    honors = row_honors
+                else:
+                    values = all_suits
+                    draw_pons, draw_pairs = _honors_after_change(row_pons, row_pairs, count, 1)
+                    honors = _honors_values_table[draw_pons][draw_pairs]
+
+                draws_shanten[draw_34] = draw_base_shanten - best_hand_value(values, honors, draw_max_blocks)
+
+            tiles_34[discard_34] += 1
+            results[discard_34] = (row_shanten, draws_shanten)
+
+        return results
+
+    def _calculate_chiitoitsu_shanten_matrix(self, tiles_34, discards_34, draws_34):
+        pairs = len([x for x in tiles_34 if x >= 2])
+
+        results = {}
+        for discard_34 in discards_34:
+            row_pairs = pairs - (tiles_34[discard_34] == 2)
+            tiles_34[discard_34] -= 1
+
+            draws_shanten = [None] * 34
+            for draw_34 in draws_34:
+                draw_pairs = row_pairs + (tiles_34[draw_34] == 1)
+                draws_shanten[draw_34] = draw_pairs == 7 and Shanten.AGARI_STATE or 6 - draw_pairs
+
+            tiles_34[discard_34] += 1
+            results[discard_34] = (row_pairs == 7 and Shanten.AGARI_STATE or 6 - row_pairs, draws_shanten)
+
+        return results
+
+    def _values_by_index(self, index: int) -> bytes:
+        return self.suits_table[index * SUIT_VALUES_SIZE : index * SUIT_VALUES_SIZE + SUIT_VALUES_SIZE]
+
+
+def suit_table_index(tiles_34: List[int], offset: int) -> int:
+    t = tiles_34
+    o = offset
+    return (
+        t[o] * 390625
+        + t[o + 1] * 78125
+        + t[o + 2] * 15625
+        + t[o + 3] * 3125
+        + t[o + 4] * 625
+        + t[o + 5] * 125
+        + t[o + 6] * 25
+        + t[o + 7] * 5
+        + t[o + 8]
+    )
+
+
+def combine_suit_values(first: bytes, second: bytes) -> bytes:
+    """
+    Best values for two suits together, for each number of blocks, without and with pair.
+    Zero value with pair means that there is no pair.
+
+    There are only a few dozens of different suit values in the table,
+    so results are cached for the process lifetime.
+    """
+    key = (first, second)
+    result = _combined_values_cache.get(key)
+    if result is not None:
+        return result
+
+    values = [0] * SUIT_VALUES_SIZE
+    head = MAX_BLOCKS + 1
+    for first_blocks in range(0, MAX_BLOCKS + 1):
+        first_value = first[first_blocks]
+        first_head_value = first[head + first_blocks]
+        for second_blocks in range(0, MAX_BLOCKS + 1 - first_blocks):
+            blocks = first_blocks + second_blocks
+
+            value = first_value + second[second_blocks]
+            if value > values[blocks]:
+                values[blocks] = value
+
+            if first_head_value:
+                value = first_head_value + second[second_blocks]
+                if value > values[head + blocks]:
+                    values[head + blocks] = value
+
+            second_head_value = second[head + second_blocks]
+            if second_head_value:
+                value = first_value + second_head_value
+                if value > values[head + blocks]:
+                    values[head + blocks] = value
+
+    result = bytes(values)
+    _combined_values_cache[key] = result
+    return result
+
+
+def best_hand_value(suits: bytes, honors: bytes, max_blocks: int) -> int:
+    """
+    Best value of 2 * mentsu + tatsu + pair for the whole hand
+    """
+    key = (suits, honors, max_blocks)
+    result = _best_values_cache.get(key)
+    if result is not None:
+        return result
+
+    head = MAX_BLOCKS + 1
+    result = 0
+    for blocks in range(0, max_blocks + 1):
+        rest = max_blocks - blocks
+        result = max(result, suits[blocks] + honors[rest])
+        # only one pair can be used as a head
+        if suits[head + blocks]:
+            result = max(result, suits[head + blocks] + honors[rest])
+        if honors[head + rest]:
+            result = max(result, suits[blocks] + honors[head + rest])
+
+    _best_values_cache[key] = result
+    return result
+
+
+def honors_values(tiles_34: List[int]):
+    """
+    Honors can be used only as pon or pair, so we need to know only number of them
+    """
+    pons = 0
+    pairs = 0
+    for i in range(27, 34):
+        if tiles_34[i] == 3:
+            pons += 1
+        elif tiles_34[i] == 2:
+            pairs += 1
+    return _honors_values_table[pons][pairs]
+
+
+def _honors_after_change(pons, pairs, count, delta):
+    """
+    Update number of honor pons and pairs after adding (delta=1) or removing (delta=-1) one copy of the tile
+    """
+    if count == 3:
+        pons -= 1
+    elif count == 2:
+        pairs -= 1
+
+    count += delta
+    if count == 3:
+        pons += 1
+    elif count == 2:
+        pairs += 1
+
+    return pons, pairs
+
+
+def _build_honors_values(pons, pairs):
+    values = [0] * SUIT_VALUES_SIZE
+    for blocks in range(0, MAX_BLOCKS + 1):
+        used_pons = min(pons, blocks)
+        values[blocks] = used_pons * 2 + min(pairs, blocks - used_pons)
+        if pairs:
+            values[MAX_BLOCKS + 1 + blocks] = 1 + used_pons * 2 + min(pairs - 1, blocks - used_pons)
+    return bytes(values)
+
+
+_honors_values_table = [[_build_honors_values(pons, pairs) for pairs in range(0, 8)] for pons in range(0, 8)]
+
+
+def load_suits_table() -> bytes:
+    """
+    Load suits table from the file, the table is loaded once for the process.
+    If there is no file, we will generate the table and save it.
+    """
+    global _suits_table
+
+    if _suits_table is not None:
+        return _suits_table
+
+    if os.path.exists(SUITS_TABLE_PATH):
+        with open(SUITS_TABLE_PATH, "rb") as f:
+            _suits_table = zlib.decompress(f.read())
+    else:
+        _suits_table = generate_suits_table()
+        save_suits_table(_suits_table)
+
+    assert len(_suits_table) == SUIT_TABLE_SIZE * SUIT_VALUES_SIZE
+    return _suits_table
+
+
+def save_suits_table(table: bytes):
+    if not os.path.exists(TABLES_FOLDER):
+        os.mkdir(TABLES_FOLDER)
+
+    with open(SUITS_TABLE_PATH, "wb") as f:
+        f.write(zlib.compress(table, 9))
+
+
+def generate_suits_table() -> bytes:
+    """
+    Go through all suit counts vectors in the order of base 5 index.
+    Every decomposition step removes tiles starting from the first tile of the vector,
+    so the rest of the vector always has a smaller index and it is already calculated.
+    """
+    head = MAX_BLOCKS + 1
+    powers = SUIT_INDEX_POWERS
+    table = bytearray(SUIT_TABLE_SIZE * SUIT_VALUES_SIZE)
+    counts = [0] * 9
+
+    def _apply(best, rest_index, added_value, is_block, is_head):
+        rest = table[rest_index * SUIT_VALUES_SIZE : rest_index * SUIT_VALUES_SIZE + SUIT_VALUES_SIZE]
+        for with_head in [0, head]:
+            for blocks in range(0, MAX_BLOCKS + 1):
+                if is_head:
+                    if with_head == 0:
+                        continue
+                    previous = rest[blocks]
+                else:
+                    if is_block and blocks == 0:
+                        continue
+                    previous = rest[with_head + blocks - is_block]
+                    # there is no pair in the rest of the suit
+                    if with_head and not previous:
+                        continue
+
+                value = previous + added_value
+                if value > best[with_head + blocks]:
+                    best[with_head + blocks] = value
+
+    for index in range(1, SUIT_TABLE_SIZE):
+        rest = index
+        for i in range(8, -1, -1):
+            counts[i] = rest % 5
+            rest //= 5
+
+        # there are no more than 14 tiles in the hand
+        if sum(counts) > 14:
+            continue
+
+        i = 0
+        while not counts[i]:
+            i += 1
+
+        best = [0] * SUIT_VALUES_SIZE
+        # isolated tile
+        _apply(best, index - powers[i], 0, False, False)
+        if counts[i] >= 3:
+            # pon
+            _apply(best, index - 3 * powers[i], 2, True, False)
+        if counts[i] >= 2:
+            # pair as a tatsu or as a head
+            _apply(best, index - 2 * powers[i], 1, True, False)
+            _apply(best, index - 2 * powers[i], 1, False, True)
+        if i < 7 and counts[i + 1] and counts[i + 2]:
+            # chi
+            _apply(best, index - powers[i] - powers[i + 1] - powers[i + 2], 2, True, False)
+        if i < 8 and counts[i + 1]:
+            # ryanmen or penchan
+            _apply(best, index - powers[i] - powers[i + 1], 1, True, False)
+        if i < 7 and counts[i + 2]:
+            # kanchan
+            _apply(best, index - powers[i] - powers[i + 2], 1, True, False)
+
+        # values are for "up to N blocks", so they can't decrease with more blocks
+        for with_head in [0, head]:
+            for blocks in range(1, MAX_BLOCKS + 1):
+                if best[with_head + blocks] < best[with_head + blocks - 1]:
+                    best[with_head + blocks] = best[with_head + blocks - 1]
+
+        table[index * SUIT_VALUES_SIZE : index * SUIT_VALUES_SIZE + SUIT_VALUES_SIZE] = bytes(best)
+
+    return bytes(table)
+
+
+if __name__ == "__main__":
+    save_suits_table(generate_suits_table())
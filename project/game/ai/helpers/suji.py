@@ -1,4 +1,4 @@
-from mahjong.utils import is_man, is_pin, is_sou, simplify
+from typing import List
 
 
 class Suji:
@@ -9,67 +9,55 @@ class Suji:
     # 3-6-9
     THIRD_SUJI = 3
 
+    # suji tiles (0-8 presentation) for each 9 bits mask of discarded tiles in the suit
+    _suit_suji_cache = {}
+
     def __init__(self, player):
         self.player = player
 
-    def find_suji(self, tiles_136):
-        tiles_34 = list(set([x // 4 for x in tiles_136]))
-
-        suji = []
-        suits = [[], [], []]
-
-        # let's cast each tile to 0-8 presentation
-        for tile in tiles_34:
-            if is_man(tile):
-                suits[0].append(simplify(tile))
-
-            if is_pin(tile):
-                suits[1].append(simplify(tile))
-
-            if is_sou(tile):
-                suits[2].append(simplify(tile))
+    def find_suji(self, tiles_136: List[int]) -> List[int]:
+        mask = 0
+        for tile in tiles_136:
+            mask |= 1 << (tile // 4)
+        return self.find_suji_for_mask(mask)
 
+    def find_suji_for_mask(self, discards_mask: int) -> List[int]:
+        """
+        :param discards_mask: one bit for each discarded tile in 34 format, see Table.discards_masks
+        """
+        result = []
         for x in range(0, 3):
-            simplified_tiles = suits[x]
             base = x * 9
+            suit_mask = (discards_mask >> base) & 0b111111111
+            if not suit_mask:
+                continue
 
-            # 1-4-7
-            if 3 in simplified_tiles:
-                suji.append(self.FIRST_SUJI + base)
+            suit_suji = self._suit_suji_cache.get(suit_mask)
+            if suit_suji is None:
+                suit_suji = self._find_suit_suji(suit_mask)
+                self._suit_suji_cache[suit_mask] = suit_suji
 
-            # double 1-4-7
-            if 0 in simplified_tiles and 6 in simplified_tiles:
-                suji.append(self.FIRST_SUJI + base)
+            result += [base + tile for tile in suit_suji]
+        return result
 
-            # 2-5-8
-            if 4 in simplified_tiles:
-                suji.append(self.SECOND_SUJI + base)
+    @classmethod
+    def _find_suit_suji(cls, suit_mask):
+        simplified_tiles = [x for x in range(0, 9) if suit_mask & (1 << x)]
 
-            # double 2-5-8
-            if 1 in simplified_tiles and 7 in simplified_tiles:
-                suji.append(self.SECOND_SUJI + base)
+        suji = []
+        # 1-4-7
+        if 3 in simplified_tiles or (0 in simplified_tiles and 6 in simplified_tiles):
+            suji.append(cls.FIRST_SUJI)
 
-            # 3-6-9
-            if 5 in simplified_tiles:
-                suji.append(self.THIRD_SUJI + base)
+        # 2-5-8
+        if 4 in simplified_tiles or (1 in simplified_tiles and 7 in simplified_tiles):
+            suji.append(cls.SECOND_SUJI)
 
-            # double 3-6-9
-            if 2 in simplified_tiles and 8 in simplified_tiles:
-                suji.append(self.THIRD_SUJI + base)
+        # 3-6-9
+        if 5 in simplified_tiles or (2 in simplified_tiles and 8 in simplified_tiles):
+            suji.append(cls.THIRD_SUJI)
 
-        all_suji = list(set(suji))
         result = []
-        for suji in all_suji:
-            suji_temp = suji % 9
-            base = suji - suji_temp - 1
-
-            if suji_temp == self.FIRST_SUJI:
-                result += [base + 1, base + 4, base + 7]
-
-            if suji_temp == self.SECOND_SUJI:
-                result += [base + 2, base + 5, base + 8]
-
-            if suji_temp == self.THIRD_SUJI:
-                result += [base + 3, base + 6, base + 9]
-
-        return result
+        for suji_type in suji:
+            result += [suji_type - 1, suji_type + 2, suji_type + 5]
+        return tuple(result)
@@ -1,7 +1,6 @@
 from typing import Optional
 
 import utils.decisions_constants as log
-from mahjong.tile import TilesConverter
 from mahjong.utils import is_pon
 from utils.decisions_logger import MeldPrint
 
@@ -45,7 +44,7 @@ class Kan:
                 return None
 
         tile_34 = tile_136 // 4
-        tiles_34 = TilesConverter.to_34_array(self.player.tiles)
+        tiles_34 = list(self.player.hand_state.tiles_34)
 
         # save original hand state
         original_tiles = self.player.tiles[:]
@@ -63,7 +62,7 @@ class Kan:
             if tile_34 in meld:
                 has_shouminkan_candidate = True
 
-                closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+                closed_hand_34 = list(self.player.hand_state.closed_hand_34)
                 previous_shanten, previous_waits_count = self._calculate_shanten_for_kan()
                 self.player.tiles = original_tiles[:]
 
@@ -74,15 +73,16 @@ class Kan:
                 )
                 new_waits_count = self.player.ai.hand_builder.count_tiles(new_waiting, closed_hand_34)
 
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_hand_34 = self.player.hand_state.closed_hand_34
         if not open_kan and not has_shouminkan_candidate and closed_hand_34[tile_34] != 4:
             return None
 
         if open_kan and closed_hand_34[tile_34] != 3:
             return None
 
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
-        tiles_34 = TilesConverter.to_34_array(self.player.tiles)
+        hand_state = self.player.hand_state
+        closed_hand_34 = list(hand_state.closed_hand_34)
+        tiles_34 = list(hand_state.tiles_34)
 
         if not has_shouminkan_candidate:
             if open_kan:
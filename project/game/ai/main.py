@@ -3,6 +3,8 @@ from typing import List
 import utils.decisions_constants as log
 from game.ai.defence.main import TileDangerHandler
 from game.ai.hand_builder import HandBuilder
+from game.ai.helpers.hand_value_context import HandValueContext
+from game.ai.helpers.hand_value_estimator import HandValueEstimator
 from game.ai.helpers.kabe import Kabe
 from game.ai.helpers.suji import Suji
 from game.ai.kan import Kan
@@ -11,9 +13,16 @@ from mahjong.constants import AKA_DORA_LIST, DISPLAY_WINDS
 from mahjong.hand_calculating.divider import HandDivider
 from mahjong.hand_calculating.hand import HandCalculator
 from mahjong.hand_calculating.hand_config import HandConfig, OptionalRules
-from mahjong.shanten import Shanten
 from mahjong.tile import TilesConverter
-from utils.cache import build_estimate_hand_value_cache_key, build_shanten_cache_key
+from utils.cache import (
+    SHARED_AGARI_CACHE,
+    SHARED_SHANTEN_CACHE,
+    LRUCache,
+    build_agari_cache_key,
+    build_estimate_hand_value_cache_key,
+    build_shanten_cache_key,
+    get_shared_cache,
+)
 
 
 class MahjongAI:
@@ -31,8 +40,12 @@ class MahjongAI:
     ukeire_second = 0
     waiting = None
 
-    hand_cache_shanten = {}
-    hand_cache_estimation = {}
+    # these caches are not erased between rounds, their size is limited by bot config
+    hand_cache_shanten = None
+    hand_cache_agari = None
+    hand_cache_estimation = None
+
+    _hand_value_context = None
 
     def __init__(self, player):
         self.player = player
@@ -40,11 +53,12 @@ class MahjongAI:
 
         self.kan = Kan(player)
         self.agari = Agari()
-        self.shanten_calculator = Shanten()
+        self.shanten_calculator = player.config.SHANTEN_CALCULATOR_CLASS()
         self.defence = TileDangerHandler(player)
         self.hand_divider = HandDivider()
         self.finished_hand = HandCalculator()
         self.hand_builder = HandBuilder(player, self)
+        self.hand_value_estimator = HandValueEstimator(player)
         self.riichi = player.config.RIICHI_HANDLER_CLASS(player)
         self.placement = player.config.PLACEMENT_HANDLER_CLASS(player)
         self.open_hand_handler = player.config.OPEN_HAND_HANDLER_CLASS(player)
@@ -52,6 +66,10 @@ class MahjongAI:
         self.suji = Suji(player)
         self.kabe = Kabe(player)
 
+        self.hand_cache_shanten = self._create_cache(SHARED_SHANTEN_CACHE, player.config.SHANTEN_CACHE_SIZE)
+        self.hand_cache_agari = self._create_cache(SHARED_AGARI_CACHE, player.config.AGARI_CACHE_SIZE)
+        self.hand_cache_estimation = LRUCache(player.config.HAND_VALUE_CACHE_SIZE)
+
         self.erase_state()
 
     def erase_state(self):
@@ -63,11 +81,9 @@ class MahjongAI:
         self.open_hand_handler.current_strategy = None
         self.open_hand_handler.last_discard_option = None
 
-        self.hand_cache_shanten = {}
-        self.hand_cache_estimation = {}
-
-        # to erase hand cache
+        # to erase hand divider cache
         self.finished_hand = HandCalculator()
+        self._hand_value_context = None
 
     def init_hand(self):
         self.player.logger.debug(
@@ -197,9 +213,14 @@ class MahjongAI:
             additional_han,
             is_rinshan,
             is_chankan,
+            self.player.player_wind,
+            self.player.table.round_wind_tile,
+            self.player.table.has_aka_dora,
+            self.player.table.has_open_tanyao,
         )
-        if self.hand_cache_estimation.get(cache_key):
-            return self.hand_cache_estimation.get(cache_key)
+        result = self.hand_cache_estimation.get(cache_key)
+        if result is not None:
+            return result
 
         result = self.finished_hand.estimate_hand_value(
             tiles,
@@ -210,7 +231,7 @@ class MahjongAI:
             use_hand_divider_cache=True,
         )
 
-        self.hand_cache_estimation[cache_key] = result
+        self.hand_cache_estimation.set(cache_key, result)
         return result
 
     def estimate_weighted_mean_hand_value(self, discard_option):
@@ -220,7 +241,7 @@ class MahjongAI:
             tiles = self.player.tiles[:]
             tiles.remove(discard_option.tile_to_discard_136)
 
-            hand_cost = self.estimate_hand_value_or_get_from_cache(
+            hand_cost = self.hand_values.estimate(
                 waiting, tiles=tiles, call_riichi=discard_option.with_riichi, is_tsumo=True
             )
 
@@ -244,6 +265,27 @@ class MahjongAI:
 
         return cost
 
+    @property
+    def hand_values(self) -> HandValueContext:
+        """
+        Hand values context for the current turn, it is recreated after each table event
+        """
+        table = self.player.table
+        # tests and clients can change some of these without table event
+        table_state = (
+            table.version,
+            tuple(table.dora_indicators),
+            table.count_of_riichi_sticks,
+            table.count_of_honba_sticks,
+            table.round_wind_number,
+            self.player.dealer_seat,
+            table.has_aka_dora,
+            table.has_open_tanyao,
+        )
+        if self._hand_value_context is None or self._hand_value_context.table_state != table_state:
+            self._hand_value_context = HandValueContext(self, table_state)
+        return self._hand_value_context
+
     def should_call_kyuushu_kyuuhai(self) -> bool:
         """
         Kyuushu kyuuhai 「九種九牌」
@@ -269,7 +311,7 @@ class MahjongAI:
         # 1 and not 0 because we call check for win this before updating remaining tiles
         is_hotei = self.player.table.count_of_remaining_tiles == 1
 
-        hand_response = self.calculate_exact_hand_value_or_get_from_cache(
+        hand_response = self.hand_values.calculate_exact(
             tile,
             tiles=self.player.tiles,
             call_riichi=self.player.in_riichi,
@@ -295,16 +337,44 @@ class MahjongAI:
         Sometimes we are calculating shanten for the same hand multiple times
         to save some resources let's cache previous calculations
         """
+        # shanten depends only on the hand, so cached values are valid across rounds
+        use_chiitoitsu = use_chiitoitsu and not self.player.is_open_hand
         key = build_shanten_cache_key(closed_hand_34, use_chiitoitsu)
-        if key in self.hand_cache_shanten:
-            return self.hand_cache_shanten[key]
-        if use_chiitoitsu and not self.player.is_open_hand:
+        result = self.hand_cache_shanten.get(key)
+        if result is not None:
+            return result
+        if use_chiitoitsu:
             result = self.shanten_calculator.calculate_shanten_for_chiitoitsu_hand(closed_hand_34)
         else:
             result = self.shanten_calculator.calculate_shanten_for_regular_hand(closed_hand_34)
-        self.hand_cache_shanten[key] = result
+        self.hand_cache_shanten.set(key, result)
+        return result
+
+    def is_agari_or_get_from_cache(self, tiles_34, melds_34):
+        key = build_agari_cache_key(tiles_34, melds_34)
+        result = self.hand_cache_agari.get(key)
+        if result is not None:
+            return result
+        result = self.agari.is_agari(tiles_34, melds_34)
+        self.hand_cache_agari.set(key, result)
         return result
 
+    def cache_stats(self):
+        return {
+            "shanten": self.hand_cache_shanten.stats(),
+            "agari": self.hand_cache_agari.stats(),
+            "hand_value": self.hand_cache_estimation.stats(),
+        }
+
+    def _create_cache(self, shared_cache_name, max_size):
+        """
+        Use process-wide cache if it was enabled, otherwise bot will have its own cache
+        """
+        shared_cache = get_shared_cache(shared_cache_name)
+        if shared_cache is not None:
+            return shared_cache.view(id(self))
+        return LRUCache(max_size)
+
     @property
     def enemy_players(self):
         """
@@ -3,7 +3,6 @@ from typing import List
 from game.ai.defence.enemy_analyzer import EnemyAnalyzer
 from game.ai.discard import DiscardOption
 from game.ai.placement import Placement
-from mahjong.tile import TilesConverter
 from mahjong.utils import is_chi, is_honor, is_pair, is_terminal, plus_dora, simplify
 
 
@@ -26,7 +25,7 @@ class Riichi:
         # we will restore it after we have finished our routines
         tiles_original, discards_original = hand_builder.emulate_discard(discard_option)
 
-        count_tiles = hand_builder.count_tiles(waiting_34, TilesConverter.to_34_array(self.player.closed_hand))
+        count_tiles = hand_builder.count_tiles(waiting_34, self.player.hand_state.closed_hand_34)
         if count_tiles == 0:
             # don't call karaten riichi
             hand_builder.restore_after_emulate_discard(tiles_original, discards_original)
@@ -49,12 +48,10 @@ class Riichi:
         return should_riichi
 
     def _should_call_riichi_one_sided(self, waiting_34: List[int], threats: List[EnemyAnalyzer]):
-        count_tiles = self.player.ai.hand_builder.count_tiles(
-            waiting_34, TilesConverter.to_34_array(self.player.closed_hand)
-        )
+        count_tiles = self.player.ai.hand_builder.count_tiles(waiting_34, self.player.hand_state.closed_hand_34)
         waiting_34 = waiting_34[0]
-        hand_value = self.player.ai.estimate_hand_value_or_get_from_cache(waiting_34, call_riichi=False)
-        hand_value_with_riichi = self.player.ai.estimate_hand_value_or_get_from_cache(waiting_34, call_riichi=True)
+        hand_value = self.player.ai.hand_values.estimate(waiting_34, call_riichi=False)
+        hand_value_with_riichi = self.player.ai.hand_values.estimate(waiting_34, call_riichi=True)
 
         must_riichi = self.player.ai.placement.must_riichi(
             has_yaku=(hand_value.yaku is not None and hand_value.cost is not None),
@@ -75,7 +72,7 @@ class Riichi:
         results, tiles_34 = self.player.ai.hand_builder.divide_hand(tiles, waiting_34)
         result = results[0]
 
-        closed_tiles_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_tiles_34 = self.player.hand_state.closed_hand_34
 
         have_suji, have_kabe = self.player.ai.hand_builder.check_suji_and_kabe(closed_tiles_34, waiting_34)
 
@@ -288,20 +285,20 @@ class Riichi:
         return True
 
     def _should_call_riichi_many_sided(self, waiting_34: List[int], threats: List[EnemyAnalyzer]):
-        count_tiles = self.player.ai.hand_builder.count_tiles(
-            waiting_34, TilesConverter.to_34_array(self.player.closed_hand)
-        )
+        count_tiles = self.player.ai.hand_builder.count_tiles(waiting_34, self.player.hand_state.closed_hand_34)
         hand_costs = []
         hand_costs_with_riichi = []
         waits_with_yaku = 0
+        hand_values = self.player.ai.hand_values.estimate_waits(waiting_34, call_riichi=False)
+        hand_values_with_riichi = self.player.ai.hand_values.estimate_waits(waiting_34, call_riichi=True)
         for wait in waiting_34:
-            hand_value = self.player.ai.estimate_hand_value_or_get_from_cache(wait, call_riichi=False)
+            hand_value = hand_values[wait]
             if hand_value.error is None:
                 hand_costs.append(hand_value.cost["main"])
                 if hand_value.yaku is not None and hand_value.cost is not None:
                     waits_with_yaku += 1
 
-            hand_value_with_riichi = self.player.ai.estimate_hand_value_or_get_from_cache(wait, call_riichi=True)
+            hand_value_with_riichi = hand_values_with_riichi[wait]
             if hand_value_with_riichi.error is None:
                 hand_costs_with_riichi.append(hand_value_with_riichi.cost["main"])
 
@@ -1,12 +1,20 @@
-from mahjong.utils import is_honor, plus_dora, simplify
+from mahjong.utils import is_honor, simplify
 from utils.decisions_logger import MeldPrint
 
 
 class StatisticsCollector:
     @staticmethod
     def collect_stat_for_enemy_riichi_hand_cost(tile_136, enemy, main_player):
-        tile_34 = tile_136 // 4
+        riichi_stat = StatisticsCollector.collect_stat_for_enemy_riichi_hand(enemy, main_player)
+        riichi_stat["tile_plus_dora"] = enemy.table.is_dora(tile_136)
+        riichi_stat["tile_category"] = StatisticsCollector.get_tile_category(tile_136 // 4, enemy)
+        return riichi_stat
 
+    @staticmethod
+    def collect_stat_for_enemy_riichi_hand(enemy, main_player):
+        """
+        Part of the riichi hand cost statistics that doesn't depend on the discarded tile
+        """
         riichi_discard = [x for x in enemy.discards if x.riichi_discard]
         if riichi_discard:
             assert len(riichi_discard) == 1
@@ -19,9 +27,8 @@ class StatisticsCollector:
         riichi_called_on_step = enemy.discards.index(riichi_discard) + 1
 
         total_dora_in_game = len(enemy.table.dora_indicators) * 4 + (3 * int(enemy.table.has_aka_dora))
-        visible_tiles = enemy.table.revealed_tiles_136 + main_player.closed_hand
-        visible_dora_tiles = sum(
-            [plus_dora(x, enemy.table.dora_indicators, add_aka_dora=enemy.table.has_aka_dora) for x in visible_tiles]
+        visible_dora_tiles = enemy.table.count_of_revealed_dora + sum(
+            [enemy.table.is_dora(x) for x in main_player.closed_hand]
         )
         live_dora_tiles = total_dora_in_game - visible_dora_tiles
         assert live_dora_tiles >= 0, "Live dora tiles can't be less than 0"
@@ -36,9 +43,7 @@ class StatisticsCollector:
             number_of_kan_in_enemy_hand += 1
 
             for tile in meld.tiles:
-                number_of_dora_in_enemy_kan_sets += plus_dora(
-                    tile, enemy.table.dora_indicators, add_aka_dora=enemy.table.has_aka_dora
-                )
+                number_of_dora_in_enemy_kan_sets += enemy.table.is_dora(tile)
 
             tile_meld_34 = meld.tiles[0] // 4
             if tile_meld_34 in enemy.valued_honors:
@@ -53,25 +58,6 @@ class StatisticsCollector:
                 if meld.type == MeldPrint.KAN or meld.type == MeldPrint.SHOUMINKAN:
                     number_of_other_player_kan_sets += 1
 
-        tile_category = ""
-        # additional danger for tiles that could be used for tanyao
-        if not is_honor(tile_34):
-            # +1 here to make it more readable
-            simplified_tile = simplify(tile_34) + 1
-
-            if simplified_tile in [4, 5, 6]:
-                tile_category = "middle"
-
-            if simplified_tile in [2, 3, 7, 8]:
-                tile_category = "edge"
-
-            if simplified_tile in [1, 9]:
-                tile_category = "terminal"
-        else:
-            tile_category = "honor"
-            if tile_34 in enemy.valued_honors:
-                tile_category = "valuable_honor"
-
         return {
             "is_dealer": enemy.is_dealer and 1 or 0,
             "riichi_called_on_step": riichi_called_on_step,
@@ -89,7 +75,28 @@ class StatisticsCollector:
             "number_of_yakuhai_enemy_kan_sets": number_of_yakuhai_enemy_kan_sets,
             "number_of_other_player_kan_sets": number_of_other_player_kan_sets,
             "live_dora_tiles": live_dora_tiles,
-            "tile_plus_dora": plus_dora(tile_136, enemy.table.dora_indicators, add_aka_dora=enemy.table.has_aka_dora),
-            "tile_category": tile_category,
             "discards_before_riichi_34": ";".join([str(x.value // 4) for x in enemy.discards[:riichi_called_on_step]]),
         }
+
+    @staticmethod
+    def get_tile_category(tile_34, enemy):
+        tile_category = ""
+        # additional danger for tiles that could be used for tanyao
+        if not is_honor(tile_34):
+            # +1 here to make it more readable
+            simplified_tile = simplify(tile_34) + 1
+
+            if simplified_tile in [4, 5, 6]:
+                tile_category = "middle"
+
+            if simplified_tile in [2, 3, 7, 8]:
+                tile_category = "edge"
+
+            if simplified_tile in [1, 9]:
+                tile_category = "terminal"
+        else:
+            tile_category = "honor"
+            if tile_34 in enemy.valued_honors:
+                tile_category = "valuable_honor"
+
+        return tile_category
@@ -26,7 +26,7 @@ class ChinitsuStrategy(BaseStrategy):
 
         # when making decisions about chinitsu, we should consider
         # the state of our own hand,
-        tiles_34 = TilesConverter.to_34_array(self.player.tiles)
+        tiles_34 = self.player.hand_state.tiles_34
         suits = count_tiles_by_suits(tiles_34)
 
         suits = [x for x in suits if x["name"] != "honor"]
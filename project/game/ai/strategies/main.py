@@ -107,7 +107,8 @@ class BaseStrategy:
         if self.player.in_riichi:
             return None, None
 
-        closed_hand = self.player.closed_hand[:]
+        hand_state = self.player.hand_state
+        closed_hand = list(hand_state.closed_hand_136)
 
         # we can't open hand anymore
         if len(closed_hand) == 1:
@@ -118,7 +119,7 @@ class BaseStrategy:
             return None, None
 
         discarded_tile = tile // 4
-        closed_hand_34 = TilesConverter.to_34_array(closed_hand + [tile])
+        closed_hand_34 = list(hand_state.plus(tile).closed_hand_34)
 
         combinations = []
         first_index = 0
@@ -181,6 +182,7 @@ class BaseStrategy:
         if not possible_melds:
             return None, None
 
+        self.player.ai.hand_builder.start_discard_decision()
         chosen_meld_dict = self._find_best_meld_to_open(tile, possible_melds, new_tiles, closed_hand, tile)
         # we didn't find a good discard candidate after open meld
         if not chosen_meld_dict:
@@ -1,7 +1,6 @@
 import utils.decisions_constants as log
 from game.ai.strategies.main import BaseStrategy
 from mahjong.constants import HONOR_INDICES, TERMINAL_INDICES
-from mahjong.tile import TilesConverter
 from mahjong.utils import is_honor, is_tile_strictly_isolated
 from utils.test_helpers import tiles_to_string
 
@@ -24,9 +23,10 @@ class TanyaoStrategy(BaseStrategy):
         if not result:
             return False
 
-        tiles = TilesConverter.to_34_array(self.player.tiles)
+        hand_state = self.player.hand_state
+        tiles = hand_state.tiles_34
 
-        closed_hand_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_hand_34 = hand_state.closed_hand_34
         isolated_tiles = [
             x // 4 for x in self.player.tiles if is_tile_strictly_isolated(closed_hand_34, x // 4) or is_honor(x // 4)
         ]
@@ -175,7 +175,7 @@ class TanyaoStrategy(BaseStrategy):
             return False
 
         # otherwise let's not open hand if that does not improve our ukeire
-        closed_tiles_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        closed_tiles_34 = list(self.player.hand_state.closed_hand_34)
         waiting, shanten = self.player.ai.hand_builder.calculate_waits(
             closed_tiles_34, closed_tiles_34, use_chiitoitsu=False
         )
@@ -31,8 +31,8 @@ class YakuhaiStrategy(BaseStrategy):
             return False
 
         tiles_34 = TilesConverter.to_34_array(tiles_136)
-        player_hand_tiles_34 = TilesConverter.to_34_array(self.player.tiles)
-        player_closed_hand_tiles_34 = TilesConverter.to_34_array(self.player.closed_hand)
+        player_hand_tiles_34 = self.player.hand_state.tiles_34
+        player_closed_hand_tiles_34 = self.player.hand_state.closed_hand_34
         self.valued_pairs = [x for x in self.player.valued_honors if player_hand_tiles_34[x] == 2]
 
         is_double_east_wind = len([x for x in self.valued_pairs if x == EAST]) == 2
@@ -207,7 +207,7 @@ class YakuhaiStrategy(BaseStrategy):
 
     def meld_had_to_be_called(self, tile):
         tile //= 4
-        tiles_34 = TilesConverter.to_34_array(self.player.tiles)
+        tiles_34 = self.player.hand_state.tiles_34
         valued_pairs = [x for x in self.player.valued_honors if tiles_34[x] == 2]
 
         # for big shanten number we don't need to check already opened pon set,
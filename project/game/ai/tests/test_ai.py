@@ -1,6 +1,14 @@
 from game.ai.strategies.main import BaseStrategy
 from game.table import Table
+from mahjong.constants import EAST, SOUTH
 from mahjong.tile import TilesConverter
+from utils.cache import (
+    LRUCache,
+    build_estimate_hand_value_cache_key,
+    build_shanten_cache_key,
+    disable_shared_caches,
+    enable_shared_caches,
+)
 from utils.decisions_logger import MeldPrint
 from utils.general import is_dora_connector
 from utils.test_helpers import make_meld, string_to_34_tile, string_to_136_array, string_to_136_tile, tiles_to_string
@@ -489,6 +497,22 @@ def test_shanten_and_hand_structure():
     assert shanten == 1
 
 
+def test_shanten_cache_key():
+    first_hand_34 = TilesConverter.string_to_34_array(man="33344455", pin="34567")
+    second_hand_34 = TilesConverter.string_to_34_array(man="33344456", pin="34567")
+
+    assert build_shanten_cache_key(first_hand_34, False) == build_shanten_cache_key(first_hand_34[:], False)
+    assert build_shanten_cache_key(first_hand_34, False) != build_shanten_cache_key(first_hand_34, True)
+    assert build_shanten_cache_key(first_hand_34, False) != build_shanten_cache_key(second_hand_34, False)
+
+    # tiles at the beginning and at the end of the array should not affect each other
+    first_hand_34 = [0] * 34
+    first_hand_34[0] = 4
+    second_hand_34 = [0] * 34
+    second_hand_34[33] = 4
+    assert build_shanten_cache_key(first_hand_34, True) != build_shanten_cache_key(second_hand_34, True)
+
+
 def test_is_dora_connector():
     cases = [
         {
@@ -529,3 +553,85 @@ def test_is_dora_connector():
                 assert is_dora_connector(tile_34 * 4, case["dora_indicators"]) is True
             else:
                 assert is_dora_connector(tile_34 * 4, case["dora_indicators"]) is False
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+
+    # 2 is the least recently used key now
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_ai_caches_survive_new_round():
+    table = Table()
+    player = table.player
+    tiles = string_to_136_array(sou="111345677", pin="15", man="567")
+    player.ai.calculate_shanten_or_get_from_cache(TilesConverter.to_34_array(tiles), True)
+    assert len(player.ai.hand_cache_shanten) == 1
+
+    table.init_round(0, 0, 0, string_to_136_tile(sou="1"), 0, [250, 250, 250, 250])
+    assert len(player.ai.hand_cache_shanten) == 1
+
+
+def test_hand_value_cache_key_depends_on_round_context():
+    tiles = string_to_136_array(sou="123567", pin="12345", honors="11")
+    args = [tiles, False, True, [], [0], 0, 0, 0, False, False]
+    key = build_estimate_hand_value_cache_key(*args, EAST, EAST, True, True)
+    assert key == build_estimate_hand_value_cache_key(*args, EAST, EAST, True, True)
+    assert key != build_estimate_hand_value_cache_key(*args, SOUTH, EAST, True, True)
+    assert key != build_estimate_hand_value_cache_key(*args, EAST, SOUTH, True, True)
+    assert key != build_estimate_hand_value_cache_key(*args, EAST, EAST, False, True)
+    assert key != build_estimate_hand_value_cache_key(*args, EAST, EAST, True, False)
+
+
+def test_shared_caches():
+    enable_shared_caches()
+    try:
+        first_player = Table().player
+        second_player = Table().player
+    finally:
+        disable_shared_caches()
+
+    tiles_34 = TilesConverter.to_34_array(string_to_136_array(sou="111345677", pin="15", man="567"))
+    first_player.ai.calculate_shanten_or_get_from_cache(tiles_34, True)
+    second_player.ai.calculate_shanten_or_get_from_cache(tiles_34, True)
+    first_player.ai.calculate_shanten_or_get_from_cache(tiles_34, True)
+
+    stats = first_player.ai.cache_stats()["shanten"]
+    assert stats == second_player.ai.cache_stats()["shanten"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["shared_hits"] == 1
+
+    # bots created after disabling have their own caches
+    assert "shared_hits" not in Table().player.ai.cache_stats()["shanten"]
+
+
+def test_hand_values_context_is_reset_by_table_event():
+    table = Table()
+    player = table.player
+    table.add_dora_indicator(string_to_136_tile(pin="2"))
+    player.tiles = string_to_136_array(sou="234678", pin="3488", man="234")
+
+    context = player.ai.hand_values
+    hand_value = context.estimate(string_to_34_tile(pin="5"), call_riichi=True)
+    assert hand_value.cost["main"] == 11600
+    # the same tiles in another order are the same hand
+    assert context.estimate(string_to_34_tile(pin="5"), tiles=player.tiles[::-1], call_riichi=True) is hand_value
+    assert player.ai.hand_values is context
+    assert len(context) == 1
+
+    table.add_discarded_tile(1, string_to_136_tile(honors="1"), False)
+    assert player.ai.hand_values is not context
+
+    # dora indicators can be changed by tests without table event
+    context = player.ai.hand_values
+    table.dora_indicators.append(string_to_136_tile(honors="1"))
+    assert player.ai.hand_values is not context
@@ -781,6 +781,52 @@ def test_calculate_second_level_ukeire():
     assert discard_option.ukeire_second == 96
 
 
+def test_second_level_ukeire_does_not_change_player_state():
+    table = Table()
+    player = table.player
+
+    tiles = string_to_136_array(man="34678", pin="2356", sou="4467")
+    player.init_hand(tiles)
+    player.draw_tile(string_to_136_tile(sou="8"))
+    player.discards.append(Tile(string_to_136_tile(honors="1"), False))
+
+    tiles = player.tiles[:]
+    discards = player.discards[:]
+
+    discard_options, _ = player.ai.hand_builder.find_discard_options()
+    discard_option = [x for x in discard_options if x.tile_to_discard_34 == string_to_136_tile(man="4") // 4][0]
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    assert discard_option.ukeire_second == 108
+    assert player.tiles == tiles
+    assert player.discards == discards
+
+    # the second call for the same hand after discard is taken from the cache
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+    discard_option.ukeire_second = 0
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    assert discard_option.ukeire_second == 108
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+
+    # cache is erased after changes on the table
+    table.add_discarded_tile(1, string_to_136_tile(pin="4"), False)
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    assert discard_option.ukeire_second == 86
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+
+    # and after changes of the hand value context without table event
+    table.dora_indicators = [string_to_136_tile(honors="1")]
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    player.ai.hand_builder.second_level_cache["stale"] = None
+    table.dora_indicators = [string_to_136_tile(honors="2")]
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+
+    player.ai.hand_builder.second_level_cache["stale"] = None
+    table.count_of_riichi_sticks += 1
+    player.ai.hand_builder.calculate_second_level_ukeire(discard_option)
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+
+
 def test_choose_1_shanten_with_cost_possibility_draw():
     table = Table()
     player = table.player
@@ -891,3 +937,37 @@ def _choose_furiten_over_karaten_helper(tiles, furiten_tile, karaten_tile, tile_
     player.draw_tile(tile_to_draw)
     discarded_tile, _ = player.discard_tile()
     assert tiles_to_string([discarded_tile]) == tile_to_discard_str
+
+
+def test_discard_time_budget():
+    table = Table()
+    player = table.player
+    player.config.DISCARD_TIME_BUDGET = 0
+
+    tiles = string_to_136_array(man="34678", pin="2356", sou="4467")
+    player.init_hand(tiles)
+    player.draw_tile(string_to_136_tile(sou="8"))
+
+    # budget is over immediately, but we still refine the most promising option
+    discarded_tile, _ = player.discard_tile()
+    assert discarded_tile is not None
+    assert len(player.ai.hand_builder.second_level_cache) == 1
+    assert player.ai.hand_builder.discard_budget_stats["decisions"] == 1
+    assert player.ai.hand_builder.discard_budget_stats["budget_hits"] == 1
+    assert player.ai.hand_builder.discard_budget_stats["skipped_options"] > 0
+
+
+def test_discard_time_budget_for_meld():
+    table = Table()
+    player = table.player
+    player.config.DISCARD_TIME_BUDGET = 0
+
+    tiles = string_to_136_array(man="678", pin="23456", sou="59", honors="666")
+    player.init_hand(tiles)
+
+    # discards are chosen for three chi candidates, but it is one decision with one time budget
+    tile = string_to_136_array(pin="44")[1]
+    player.try_to_call_meld(tile, True)
+    assert player.ai.hand_builder.discard_budget_stats["decisions"] == 1
+    assert player.ai.hand_builder.discard_budget_stats["budget_hits"] == 1
+    assert player.ai.hand_builder.discard_budget_stats["skipped_options"] > 0
@@ -0,0 +1,54 @@
+from game.ai.helpers.hand_state import HandState
+from game.table import Table
+from mahjong.constants import FIVE_RED_MAN
+from mahjong.tile import TilesConverter
+from utils.decisions_logger import MeldPrint
+from utils.test_helpers import make_meld, string_to_136_array, string_to_136_tile
+
+
+def test_hand_state_from_player():
+    table = Table()
+    player = table.player
+    player.tiles = string_to_136_array(sou="123567", pin="12355", man="555")
+    meld = make_meld(MeldPrint.PON, man="555")
+    player.add_called_meld(meld)
+
+    hand_state = player.hand_state
+    assert hand_state.tiles_34 == tuple(TilesConverter.to_34_array(player.tiles))
+    assert hand_state.closed_hand_34 == tuple(TilesConverter.to_34_array(player.closed_hand))
+    assert hand_state.meld_34 == tuple(TilesConverter.to_34_array(meld.tiles))
+    assert list(hand_state.closed_hand_136) == player.closed_hand
+
+    # state is rebuilt only after hand changes
+    assert player.hand_state is hand_state
+    player.tiles.remove(string_to_136_tile(sou="1"))
+    assert player.hand_state is not hand_state
+    assert player.hand_state.closed_hand_34 == tuple(TilesConverter.to_34_array(player.closed_hand))
+
+
+def test_hand_state_derived_states():
+    tiles = string_to_136_array(sou="123567", pin="12355", man="45")
+    hand_state = HandState.from_tiles(tiles, [])
+
+    tile = string_to_136_tile(pin="1")
+    new_state = hand_state.minus(tile)
+    tiles.remove(tile)
+    assert new_state == HandState.from_tiles(tiles, [])
+    assert new_state.closed_hand_34 == tuple(TilesConverter.to_34_array(tiles))
+    assert new_state != hand_state
+
+    tile = string_to_136_tile(man="6")
+    tiles.append(tile)
+    assert new_state.plus(tile).tiles_34 == tuple(TilesConverter.to_34_array(tiles))
+    assert hash(new_state.plus(tile)) == hash(HandState.from_tiles(tiles, []))
+
+
+def test_hand_state_aka_dora():
+    tiles = string_to_136_array(sou="123567", pin="12355", man="46")
+    hand_state = HandState.from_tiles(tiles, [])
+
+    with_aka_dora = hand_state.plus(FIVE_RED_MAN)
+    without_aka_dora = hand_state.plus(FIVE_RED_MAN + 1)
+    assert with_aka_dora.closed_hand_34 == without_aka_dora.closed_hand_34
+    assert with_aka_dora != without_aka_dora
+    assert with_aka_dora.minus(FIVE_RED_MAN) == hand_state
@@ -0,0 +1,57 @@
+from game.table import Table
+from utils.decisions_logger import MeldPrint
+from utils.test_helpers import make_meld, string_to_34_tile, string_to_136_array, string_to_136_tile
+
+
+def _exact_cost(player, win_tile_34, tiles, is_tsumo, call_riichi):
+    return player.ai.hand_builder._estimate_hand_cost(win_tile_34, tiles, call_riichi, is_tsumo, approximate=False)
+
+
+def test_estimate_hand_cost():
+    table = Table()
+    table.has_aka_dora = True
+    table.add_dora_indicator(string_to_136_tile(man="1"))
+    player = table.player
+    estimator = player.ai.hand_value_estimator
+
+    # riichi, tanyao, dora
+    tiles = string_to_136_array(man="234567", pin="23488", sou="46")
+    win_tile = string_to_34_tile(sou="5")
+    for is_tsumo in [True, False]:
+        for call_riichi in [True, False]:
+            cost = estimator.estimate_cost(win_tile, tiles, is_tsumo, call_riichi)
+            assert cost == _exact_cost(player, win_tile, tiles, is_tsumo, call_riichi)
+
+    # dealer haneman: chinitsu and dora
+    tiles = string_to_136_array(man="1112345678999")
+    win_tile = string_to_34_tile(man="5")
+    assert estimator.estimate_cost(win_tile, tiles, False, False) == 18000
+
+
+def test_estimate_hand_cost_is_lower_bound():
+    table = Table()
+    player = table.player
+    estimator = player.ai.hand_value_estimator
+
+    # pinfu and iipeikou are not counted
+    tiles = string_to_136_array(man="112233", pin="567", sou="4599")
+    win_tile = string_to_34_tile(sou="3")
+    cost = estimator.estimate_cost(win_tile, tiles, False, True)
+    assert cost < _exact_cost(player, win_tile, tiles, False, True)
+
+
+def test_estimate_hand_cost_is_ambiguous_without_known_yaku():
+    table = Table()
+    player = table.player
+    estimator = player.ai.hand_value_estimator
+
+    # pinfu only
+    tiles = string_to_136_array(man="123567", pin="567", sou="4599")
+    win_tile = string_to_34_tile(sou="3")
+    assert estimator.estimate_cost(win_tile, tiles, False, False) is None
+
+    # yakuhai in the open hand
+    tiles = string_to_136_array(man="123567", sou="4599", honors="555")
+    player.tiles = tiles
+    player.add_called_meld(make_meld(MeldPrint.PON, honors="555"))
+    assert estimator.estimate_cost(win_tile, tiles, False, False) == _exact_cost(player, win_tile, tiles, False, False)
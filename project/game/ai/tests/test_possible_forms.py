@@ -0,0 +1,40 @@
+import random
+
+from game.ai.helpers.possible_forms import PossibleFormsAnalyzer, PossibleFormsTracker
+from game.table import Table
+
+
+def test_possible_forms_tracker_gives_the_same_forms_as_analyzer():
+    rand = random.Random(42)
+    table = Table()
+    player = table.player
+    analyzer = PossibleFormsAnalyzer(player)
+    # trackers are kept between rounds
+    trackers = {seat: PossibleFormsTracker(player) for seat in range(1, 4)}
+
+    for _ in range(0, 10):
+        wall = list(range(0, 136))
+        rand.shuffle(wall)
+        table.init_round(0, 0, 0, wall.pop(), 0, [250, 250, 250, 250])
+        player.init_hand(sorted([wall.pop() for _ in range(0, 13)]))
+
+        while len(wall) > 14:
+            event = rand.randint(0, 9)
+            if event == 0:
+                player.draw_tile(wall.pop())
+                player.discard_tile(rand.choice(player.closed_hand), force_tsumogiri=True)
+            elif event == 1:
+                table.add_dora_indicator(wall.pop())
+            elif event == 2:
+                enemy = table.get_player(rand.randint(1, 3))
+                enemy.temporary_safe_tiles = rand.sample(range(0, 34), rand.randint(0, 5))
+            else:
+                table.add_discarded_tile(rand.randint(1, 3), wall.pop(), False)
+
+            # sometimes there are several changes between calculations
+            if rand.randint(0, 2) == 0:
+                continue
+
+            for seat, tracker in trackers.items():
+                safe_tiles = table.get_player(seat).all_safe_tiles
+                assert tracker.calculate_possible_forms(safe_tiles) == analyzer.calculate_possible_forms(safe_tiles)
@@ -0,0 +1,138 @@
+import random
+
+from game.ai.configs.default import BotDefaultConfig
+from game.ai.helpers.shanten import ShantenCalculator, TableShanten
+from game.table import Table
+from mahjong.shanten import Shanten
+from mahjong.tile import TilesConverter
+from utils.decisions_logger import MeldPrint
+from utils.test_helpers import make_meld, string_to_136_array
+
+
+def test_table_shanten_regular_hand():
+    table_shanten = TableShanten()
+    cases = [
+        (dict(sou="111234567", pin="11", man="567"), Shanten.AGARI_STATE),
+        (dict(sou="111345677", pin="11", man="567"), 0),
+        (dict(sou="111345677", pin="15", man="567"), 1),
+        (dict(sou="11134567", pin="15", man="1578"), 2),
+        (dict(sou="113456", pin="1358", man="1358"), 3),
+        (dict(sou="1589", pin="13588", man="1358", honors="1"), 4),
+        (dict(sou="159", pin="13588", man="1358", honors="12"), 5),
+        (dict(sou="1589", pin="258", man="1358", honors="123"), 6),
+        (dict(sou="11123456788999"), Shanten.AGARI_STATE),
+        (dict(sou="11122245679999"), 0),
+        (dict(sou="4566677", pin="1367", man="8", honors="12"), 2),
+        (dict(sou="14", pin="222", man="123456", honors="77"), 1),
+        (dict(man="11257", pin="49", sou="33467", honors="1"), 4),
+        (dict(man="11112222333444"), Shanten.AGARI_STATE),
+        (dict(man="11112222", honors="1111"), 1),
+        (dict(sou="567", pin="11", man="111"), Shanten.AGARI_STATE),
+        (dict(sou="567", pin="11", man="1"), 1),
+        (dict(sou="567", pin="1", man="1"), 0),
+        (dict(pin="11"), Shanten.AGARI_STATE),
+        (dict(honors="1112223334"), 0),
+    ]
+
+    for case, expected in cases:
+        tiles_34 = TilesConverter.string_to_34_array(**case)
+        assert table_shanten.calculate_shanten_for_regular_hand(tiles_34) == expected, case
+
+
+def test_table_shanten_random_hands():
+    """
+    Table calculator should return exactly the same results as the default calculator
+    """
+    table_shanten = TableShanten()
+    shanten = Shanten()
+
+    rand = random.Random(42)
+    for _ in range(0, 3000):
+        number_of_tiles = rand.choice([14, 13, 11, 10, 8, 7, 5, 4, 2, 1])
+        # hands from one or two suits have more complex structures
+        wall_suits = rand.choice([[0], [0, 1], [0, 1, 2, 3]])
+        wall = [x // 4 for x in range(0, 136) if x // 36 in wall_suits]
+
+        tiles_34 = [0] * 34
+        for tile_34 in rand.sample(wall, number_of_tiles):
+            tiles_34[tile_34] += 1
+
+        expected_shanten = shanten.calculate_shanten_for_regular_hand(tiles_34)
+        hand_string = TilesConverter.to_one_line_string(TilesConverter.to_136_array(tiles_34))
+        assert table_shanten.calculate_shanten_for_regular_hand(tiles_34) == expected_shanten, hand_string
+        assert table_shanten.calculate_shanten(tiles_34) == shanten.calculate_shanten(tiles_34)
+
+
+def test_shanten_matrix():
+    """
+    Table matrix should be the same as the default matrix calculated hand by hand
+    """
+    calculator = ShantenCalculator()
+    table_shanten = TableShanten()
+
+    for hand, use_chiitoitsu in [
+        (dict(sou="111345677", pin="15", man="567"), False),
+        (dict(sou="1144", pin="2288", man="1155", honors="16"), True),
+    ]:
+        tiles_34 = TilesConverter.string_to_34_array(**hand)
+        discards_34 = [x for x in range(0, 34) if tiles_34[x]]
+        draws_34 = [x for x in range(0, 34) if tiles_34[x] != 4]
+
+        expected = calculator.calculate_shanten_matrix(tiles_34, discards_34, draws_34, use_chiitoitsu=use_chiitoitsu)
+        matrix = table_shanten.calculate_shanten_matrix(tiles_34, discards_34, draws_34, use_chiitoitsu)
+        for discard_34 in discards_34:
+            assert matrix[discard_34][0] == expected[discard_34][0]
+            # hands with 4 copies of tile are not calculated with tables
+            for draw_34 in draws_34:
+                if matrix[discard_34][1][draw_34] is not None:
+                    assert matrix[discard_34][1][draw_34] == expected[discard_34][1][draw_34]
+        assert tiles_34 == TilesConverter.string_to_34_array(**hand)
+
+
+def test_shanten_calculator_from_bot_config():
+    class TableShantenConfig(BotDefaultConfig):
+        SHANTEN_CALCULATOR_CLASS = TableShanten
+
+    table = Table(TableShantenConfig())
+    assert isinstance(table.player.ai.shanten_calculator, TableShanten)
+
+    table = Table()
+    assert isinstance(table.player.ai.shanten_calculator, ShantenCalculator)
+    assert not isinstance(table.player.ai.shanten_calculator, TableShanten)
+
+
+def test_discard_options_with_table_shanten_matrix():
+    """
+    Discard options calculated with the shanten matrix should be the same as calculated one by one
+    """
+
+    class TableShantenConfig(BotDefaultConfig):
+        SHANTEN_CALCULATOR_CLASS = TableShanten
+
+    cases = [
+        (dict(sou="111345677", pin="15", man="567"), []),
+        (dict(sou="1589", pin="13588", man="13558"), []),
+        # chiitoitsu
+        (dict(sou="1144", pin="2288", man="1155", honors="16"), []),
+        # four copies of tiles
+        (dict(sou="11112345", pin="2222", man="19"), []),
+        (dict(sou="1234", pin="567", man="119", honors="1111"), []),
+        # open hand
+        (dict(sou="123", pin="12355", man="222555"), [dict(man="222"), dict(man="555")]),
+        (dict(sou="2345", pin="222", man="1234567"), [dict(pin="222"), dict(man="345")]),
+    ]
+
+    for hand, melds in cases:
+        discard_options = []
+        for table in [Table(), Table(TableShantenConfig())]:
+            player = table.player
+            player.tiles = string_to_136_array(**hand)
+            for meld in melds:
+                player.add_called_meld(make_meld(MeldPrint.PON, **meld))
+
+            options, shanten = player.ai.hand_builder.find_discard_options()
+            discard_options.append(
+                ([(x.tile_to_discard_136, x.shanten, x.waiting, x.wait_to_ukeire) for x in options], shanten)
+            )
+
+        assert discard_options[0] == discard_options[1], hand
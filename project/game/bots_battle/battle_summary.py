@@ -0,0 +1,86 @@
+import math
+from typing import List
+
+
+def build_battle_summary(results: List[dict]) -> List[str]:
+    """
+    Merge games results to the one summary for each bot.
+
+    Games with the same seed are aggregated as one group (in duplicate mode it is the same walls
+    played with rotated seats), so the luck of walls is excluded from the group average.
+    Groups with crashed games are skipped, otherwise bots on the lucky seats would be counted twice.
+    Standard error is calculated from the groups averages.
+    """
+    crashed = [x for x in results if x["crashed"]]
+    lines = [f"Games: {len(results)}, crashed: {len(crashed)}"]
+    for seed_value in [x["seed"] for x in crashed]:
+        lines.append(f"Crashed game seed: {seed_value}")
+
+    groups = {}
+    for result in results:
+        groups.setdefault(result["seed"], []).append(result)
+    groups = [x for x in groups.values() if not any([y["crashed"] for y in x])]
+    if not groups:
+        return lines
+
+    if max([len(x) for x in groups]) > 1:
+        lines.append(f"Seed groups: {len(groups)}")
+
+    bots = {}
+    for group in groups:
+        group_bots = {}
+        for result in group:
+            for player in result["players"]:
+                bot = bots.setdefault(
+                    player["name"],
+                    {
+                        "positions": [0, 0, 0, 0],
+                        "groups_positions": [],
+                        "groups_scores": [],
+                        "rounds": 0,
+                        "wins": 0,
+                        "deal_ins": 0,
+                    },
+                )
+                bot["positions"][player["position"] - 1] += 1
+                bot["rounds"] += result["rounds"]
+                bot["wins"] += player["wins"]
+                bot["deal_ins"] += player["deal_ins"]
+                group_bot = group_bots.setdefault(player["name"], {"positions": [], "scores": []})
+                group_bot["positions"].append(player["position"])
+                group_bot["scores"].append(player["scores"])
+
+        for name, group_bot in group_bots.items():
+            bots[name]["groups_positions"].append(mean(group_bot["positions"]))
+            bots[name]["groups_scores"].append(mean(group_bot["scores"]))
+
+    for name, bot in sorted(bots.items(), key=lambda x: x[0]):
+        games = sum(bot["positions"])
+        positions = " ".join([f"{x / games * 100:.1f}%" for x in bot["positions"]])
+        lines.append(
+            f"{name}: average position {mean(bot['groups_positions']):.2f} "
+            f"(±{standard_error(bot['groups_positions']):.2f}), "
+            f"average scores {mean(bot['groups_scores']):.0f} (±{standard_error(bot['groups_scores']):.0f}), "
+            f"positions {positions}, "
+            f"win rate {bot['wins'] / bot['rounds'] * 100:.1f}%, deal-in rate {bot['deal_ins'] / bot['rounds'] * 100:.1f}%"
+        )
+
+    return lines
+
+
+def mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+
+def variance(values: List[float]) -> float:
+    """
+    Sample variance, 0 for less than two values
+    """
+    if len(values) < 2:
+        return 0.0
+    values_mean = mean(values)
+    return sum([(x - values_mean) ** 2 for x in values]) / (len(values) - 1)
+
+
+def standard_error(values: List[float]) -> float:
+    return math.sqrt(variance(values) / len(values))
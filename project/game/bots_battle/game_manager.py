@@ -1,10 +1,11 @@
 import datetime
 import logging
 from collections import deque
-from random import randint, random, seed
+from random import Random, getrandbits, randint
 
 from game.bots_battle.local_client import LocalClient
 from game.bots_battle.replays.tenhou import TenhouReplay
+from game.bots_battle.wall import Wall
 from mahjong.agari import Agari
 from mahjong.constants import WINDS
 from mahjong.hand_calculating.hand import HandCalculator
@@ -15,18 +16,9 @@ from mahjong.utils import is_honor, is_terminal
 from utils.decisions_logger import MeldPrint
 from utils.settings_handler import settings
 
-# we need to have it
-# to be able repeat our tests with needed random
-seed_value = random()
-
 logger = logging.getLogger("game")
 
 
-# to be able repeat our games
-def shuffle_seed():
-    return seed_value
-
-
 class GameManager:
     """
     Allow to play bots between each other
@@ -34,9 +26,13 @@ class GameManager:
     """
 
     replay_name = ""
+    # to be able repeat our games, walls and players placement depend only on it
+    seed_value = None
+    # shift of seats after the random placement, the same seed with different rotations
+    # gives the same walls for the same seats to different bots (duplicate mahjong)
+    seat_rotation = 0
 
-    tiles = None
-    dead_wall = None
+    wall = None
     clients = None
     dora_indicators = None
     players_with_open_hands = None
@@ -52,9 +48,7 @@ class GameManager:
     _unique_dealers = 0
     _need_to_check_same_winds = None
 
-    def __init__(self, clients, replays_directory, replay_name):
-        self.tiles = []
-        self.dead_wall = []
+    def __init__(self, clients, replays_directory, replay_name, seed_value=None, seat_rotation=0):
         self.dora_indicators = []
         self.discards = []
         self.clients = clients
@@ -64,6 +58,13 @@ class GameManager:
         self.replays_directory = replays_directory
         self.replay_name = replay_name
 
+        if seed_value is None:
+            seed_value = getrandbits(64)
+        self.seed_value = seed_value
+        self.seat_rotation = seat_rotation
+        # each game has its own random generator, so games don't affect each other
+        self.random = Random(seed_value)
+
     @staticmethod
     def generate_replay_name():
         return f"{datetime.datetime.now().strftime('%Y-%m-%d_%H_%M_%S')}_{randint(0, 99999):03}.txt"
@@ -77,8 +78,10 @@ class GameManager:
         logger.info("Replay name: {}".format(self.replay_name))
         self.replay = TenhouReplay(self.replay_name, self.clients, self.replays_directory)
 
-        seed(shuffle_seed())
-        self.clients = self._randomly_shuffle_array(self.clients)
+        self.random.seed(self.seed_value)
+        clients = deque(self._randomly_shuffle_array(self.clients))
+        clients.rotate(self.seat_rotation)
+        self.clients = list(clients)
         for i in range(0, len(self.clients)):
             self.clients[i].seat = i
 
@@ -97,7 +100,7 @@ class GameManager:
 
         is_game_end = False
         self.init_game()
-        self.replay.init_game(shuffle_seed())
+        self.replay.init_game(self.seed_value)
 
         while not is_game_end:
             self.init_round()
@@ -115,6 +118,10 @@ class GameManager:
                     was_retake = True
                     continue
 
+                result["winner"].number_of_wins += 1
+                if result["loser"]:
+                    result["loser"].number_of_deal_ins += 1
+
                 if result["winner"].player.is_dealer:
                     dealer_won = True
 
@@ -144,6 +151,13 @@ class GameManager:
         self.replay.end_game()
 
         logger.info("Final Scores: {0}".format(self.players_sorted_by_scores()))
+        for client in self.clients:
+            logger.info("AI caches: {}, {}".format(client.player.name, client.player.ai.cache_stats()))
+            logger.info(
+                "Discard time budget: {}, {}".format(
+                    client.player.name, client.player.ai.hand_builder.discard_budget_stats
+                )
+            )
 
         total_scores = sum([x.player.scores for x in self.clients])
         assert total_scores == 100000, total_scores
@@ -157,12 +171,11 @@ class GameManager:
         self.players_with_open_hands = []
         self.dora_indicators = []
 
-        self.tiles = self._generate_wall()
+        self.wall = Wall(self._generate_wall())
 
         for client in self.clients:
             client.erase_state()
 
-        self.dead_wall = self._cut_tiles(14)
         self.add_new_dora_indicator()
 
         for x in range(0, len(self.clients)):
@@ -193,14 +206,14 @@ class GameManager:
         # more random
         for _ in range(0, 3):
             for client in self.clients:
-                client.player.tiles += self._cut_tiles(4)
+                client.player.tiles += self.wall.draw_tiles(4)
 
         for client in self.clients:
-            client.player.tiles += self._cut_tiles(1)
+            client.player.tiles += self.wall.draw_tiles(1)
             client.player.tiles = sorted(client.player.tiles)
             client.player.init_hand(client.player.tiles)
 
-        logger.info("Seed: {}".format(shuffle_seed()))
+        logger.info("Seed: {}, seat rotation: {}".format(self.seed_value, self.seat_rotation))
         logger.info("Dealer: {}, {}".format(self.dealer, self.clients[self.dealer].player.name))
         logger.info(
             "Wind: {}. Riichi sticks: {}. Honba sticks: {}".format(
@@ -223,7 +236,12 @@ class GameManager:
 
             in_tempai = current_client.player.in_tempai
 
-            drawn_tile = self._cut_tiles(1)[0]
+            # after kan player draws a tile from the dead wall,
+            # it is replenished from the live wall end
+            if current_client.is_rinshan:
+                drawn_tile = self.wall.draw_rinshan_tile()
+            else:
+                drawn_tile = self.wall.draw_tile()
 
             drawn_tile_34 = drawn_tile // 4
             current_client.table.count_of_remaining_tiles -= 1
@@ -266,7 +284,7 @@ class GameManager:
 
             # checks if we can call closed kan or shouminkan
             current_client_tiles_34 = TilesConverter.to_34_array(current_client.player.tiles)
-            if current_client_tiles_34[drawn_tile_34] == 4 and len(self.tiles) > 1:
+            if current_client_tiles_34[drawn_tile_34] == 4 and len(self.wall) > 1:
                 kan_type = current_client.player.should_call_kan(
                     drawn_tile, open_kan=False, from_riichi=current_client.player.in_riichi
                 )
@@ -393,7 +411,7 @@ class GameManager:
                 other_client_closed_hand_34 = TilesConverter.to_34_array(other_client.player.closed_hand)
                 if (
                     other_client_closed_hand_34[tile_34] == 3
-                    and len(self.tiles) > 1
+                    and len(self.wall) > 1
                     and other_client.player.should_call_kan(tile, open_kan=True)
                 ):
                     tiles = [
@@ -482,7 +500,7 @@ class GameManager:
             self.current_client_seat = self._move_position(self.current_client_seat)
 
             # retake
-            if not len(self.tiles):
+            if not len(self.wall):
                 continue_to_play = False
 
         result = self.process_the_end_of_the_round([], 0, None, None, False)
@@ -629,8 +647,7 @@ class GameManager:
         if winner.player.in_riichi:
             # 9 10 11 12 indices
             for x in range(number_of_dora_indicators):
-                next_indicator_index = 9 + x
-                ura_dora.append(self.dead_wall[next_indicator_index])
+                ura_dora.append(self.wall.ura_dora_indicator(x))
 
         is_tenhou = False
         # tenhou.net doesn't have renhou
@@ -645,7 +662,7 @@ class GameManager:
 
         is_haitei = False
         is_houtei = False
-        if not self.tiles:
+        if not len(self.wall):
             if is_tsumo:
                 is_haitei = True
             else:
@@ -859,17 +876,6 @@ class GameManager:
     def _get_current_client(self) -> LocalClient:
         return self.clients[self.current_client_seat]
 
-    def _cut_tiles(self, count_of_tiles) -> []:
-        """
-        Cut the tiles array
-        :param count_of_tiles: how much tiles to cut
-        :return: the array with specified count of tiles
-        """
-
-        result = self.tiles[0:count_of_tiles]
-        self.tiles = self.tiles[count_of_tiles : len(self.tiles)]
-        return result
-
     def _move_position(self, current_position, shift=1):
         """
         Loop 0 -> 1 -> 2 -> 3 -> 0
@@ -887,36 +893,24 @@ class GameManager:
 
     def _generate_wall(self):
         # round of played numbers here to be sure that each wall will be unique
-        wall_seed = shuffle_seed() + self.round_number
-
-        # init seed for random generator
-        seed(wall_seed)
+        self.random.seed(self.seed_value + self.round_number)
 
         wall = [i for i in range(0, 136)]
-        # let's shuffle wall two times just in case
-        wall = self._randomly_shuffle_array(wall)
-        wall = self._randomly_shuffle_array(wall)
-
-        return wall
+        return self._randomly_shuffle_array(wall)
 
     def _randomly_shuffle_array(self, array):
-        rand_seeds = [randint(0, len(array) - 1) for _ in range(0, len(array))]
-        # for better wall shuffling we had to do it manually
-        # shuffle() didn't make wall to be really random
-        for x in range(0, len(array)):
-            src = x
-            dst = rand_seeds[x]
-
-            swap = array[x]
-            array[src] = array[dst]
-            array[dst] = swap
+        """
+        Fisher-Yates shuffle, each permutation has the same probability
+        """
+        rand = self.random.random
+        for x in range(len(array) - 1, 0, -1):
+            y = int(rand() * (x + 1))
+            array[x], array[y] = array[y], array[x]
         return array
 
     def add_new_dora_indicator(self):
         number_of_dora_indicators = len(self.dora_indicators)
-        # 2 3 4 5 indices
-        next_indicator_index = 2 + number_of_dora_indicators
-        self.dora_indicators.append(self.dead_wall[next_indicator_index])
+        self.dora_indicators.append(self.wall.dora_indicator(number_of_dora_indicators))
 
         if number_of_dora_indicators > 0:
             self.replay.add_new_dora(self.dora_indicators[-1])
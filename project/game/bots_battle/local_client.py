@@ -10,6 +10,10 @@ class LocalClient(Client):
     is_ippatsu = False
     is_rinshan = False
 
+    # game statistics, they are not erased between rounds
+    number_of_wins = 0
+    number_of_deal_ins = 0
+
     def __init__(self, bot_config, print_logs, replay_name, game_count):
         super().__init__(bot_config)
         self.id = make_random_letters_and_digit_string()
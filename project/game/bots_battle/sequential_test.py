@@ -0,0 +1,139 @@
+import math
+from typing import List, Optional
+
+from game.bots_battle.battle_summary import mean, standard_error, variance
+
+# placement points (uma) for 1-4 positions
+POSITION_POINTS = [30, 10, -10, -30]
+
+
+class PlacementSequentialTest:
+    """
+    Sequential probability ratio test (SPRT) for A/B battles of two bots.
+
+    Observation is the placement points difference of two bots in one seed group
+    (one game or four duplicate games with the same seed).
+    H0: first bot is not better (difference is 0), H1: first bot is better by delta points.
+    Differences are considered normally distributed with the variance estimated from observations,
+    so the test can be stopped after each finished seed group without the loss of confidence.
+    """
+
+    # variance estimation is too rough before it
+    MIN_OBSERVATIONS = 10
+
+    ACCEPTED = "accepted"
+    REJECTED = "rejected"
+
+    def __init__(self, first_bot: str, second_bot: str, games_per_seed=1, delta=3.0, confidence=0.95):
+        assert delta > 0
+        assert 0.5 < confidence < 1
+
+        self.first_bot = first_bot
+        self.second_bot = second_bot
+        self.games_per_seed = games_per_seed
+        self.delta = delta
+        self.confidence = confidence
+
+        # the same error rate for both hypotheses
+        error_rate = 1 - confidence
+        self.lower_bound = math.log(error_rate / (1 - error_rate))
+        self.upper_bound = math.log((1 - error_rate) / error_rate)
+
+        self.points_differences = []
+        self.scores_differences = []
+        self._groups = {}
+
+    def add_result(self, result: dict):
+        group = self._groups.setdefault(result["seed"], [])
+        group.append(result)
+        if len(group) < self.games_per_seed:
+            return
+
+        del self._groups[result["seed"]]
+        # we can't compare bots when one of the games is missed
+        if any([x["crashed"] for x in group]):
+            return
+
+        points = {self.first_bot: 0, self.second_bot: 0}
+        scores = {self.first_bot: 0, self.second_bot: 0}
+        for game_result in group:
+            for player in game_result["players"]:
+                if player["name"] in points:
+                    points[player["name"]] += POSITION_POINTS[player["position"] - 1]
+                    scores[player["name"]] += player["scores"]
+
+        self.points_differences.append((points[self.first_bot] - points[self.second_bot]) / len(group))
+        self.scores_differences.append((scores[self.first_bot] - scores[self.second_bot]) / len(group))
+
+    @property
+    def llr(self) -> float:
+        """
+        Log likelihood ratio of H1 to H0
+        """
+        points_variance = variance(self.points_differences)
+        if len(self.points_differences) < self.MIN_OBSERVATIONS or not points_variance:
+            return 0.0
+        return (
+            self.delta
+            / points_variance
+            * (sum(self.points_differences) - len(self.points_differences) * self.delta / 2)
+        )
+
+    @property
+    def status(self) -> Optional[str]:
+        llr = self.llr
+        if llr >= self.upper_bound:
+            return self.ACCEPTED
+        if llr <= self.lower_bound:
+            return self.REJECTED
+        return None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status is not None
+
+    def progress(self) -> str:
+        points_difference = self.points_differences and mean(self.points_differences) or 0
+        return f"groups={len(self.points_differences)}, points diff={points_difference:+.2f}, llr={self.llr:.2f}"
+
+    def build_report(self) -> List[str]:
+        status = self.status
+        if status == self.ACCEPTED:
+            conclusion = f"{self.first_bot} is better than {self.second_bot} by {self.delta} points"
+        elif status == self.REJECTED:
+            conclusion = f"{self.first_bot} is not better than {self.second_bot} by {self.delta} points"
+        else:
+            conclusion = "not decided, more games are needed"
+
+        lines = [
+            f"SPRT {self.first_bot} vs {self.second_bot}: {len(self.points_differences)} seed groups, "
+            f"LLR {self.llr:.2f} ({self.lower_bound:.2f}, {self.upper_bound:.2f}), {conclusion}"
+        ]
+        for title, values, precision in [
+            ("Placement points difference", self.points_differences, 2),
+            ("Scores difference", self.scores_differences, 0),
+        ]:
+            low, high = self.confidence_interval(values)
+            lines.append(f"{title}: {low:+.{precision}f} .. {high:+.{precision}f} ({self.confidence * 100:.0f}%)")
+        return lines
+
+    def confidence_interval(self, values: List[float]):
+        if not values:
+            return 0.0, 0.0
+        values_mean = mean(values)
+        half_width = _normal_quantile(1 - (1 - self.confidence) / 2) * standard_error(values)
+        return values_mean - half_width, values_mean + half_width
+
+
+def _normal_quantile(probability: float) -> float:
+    """
+    Inverse of the standard normal distribution function found by bisection
+    """
+    low, high = -10.0, 10.0
+    for _ in range(0, 100):
+        middle = (low + high) / 2
+        if (1 + math.erf(middle / math.sqrt(2))) / 2 < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
@@ -0,0 +1,46 @@
+from game.bots_battle.battle_summary import build_battle_summary
+
+
+def test_duplicate_games_are_aggregated_by_seed():
+    results = [
+        _make_result(1, ["A", "B", "C", "D"]),
+        _make_result(1, ["B", "C", "D", "A"]),
+        _make_result(1, ["C", "D", "A", "B"]),
+        _make_result(1, ["D", "A", "B", "C"]),
+        _make_result(2, ["A", "B", "C", "D"]),
+        _make_result(2, ["A", "C", "B", "D"]),
+        _make_result(2, ["A", "B", "D", "C"]),
+        _make_result(2, ["A", "D", "C", "B"]),
+        # the group with crashed game is skipped
+        _make_result(3, ["A", "B", "C", "D"]),
+        _make_result(3, [], crashed=True),
+    ]
+
+    lines = build_battle_summary(results)
+    assert lines[0] == "Games: 10, crashed: 1"
+    assert lines[1] == "Crashed game seed: 3"
+    assert lines[2] == "Seed groups: 2"
+    # groups averages are 2.5 and 1.0
+    assert lines[3].startswith("A: average position 1.75 (±0.75), average scores 32500 (±7500), ")
+    assert lines[3].endswith("positions 62.5% 12.5% 12.5% 12.5%, win rate 7.8%, deal-in rate 1.6%")
+
+
+def test_games_without_duplicates():
+    lines = build_battle_summary([_make_result(1, ["A", "B", "C", "D"]), _make_result(2, ["B", "A", "C", "D"])])
+    assert lines[0] == "Games: 2, crashed: 0"
+    assert lines[1].startswith("A: average position 1.50 (±0.50), ")
+    assert lines[4].startswith("D: average position 4.00 (±0.00), ")
+
+
+def _make_result(seed_value, names_by_position, crashed=False):
+    scores = [40000, 30000, 20000, 10000]
+    return {
+        "seed": seed_value,
+        "crashed": crashed,
+        "rounds": 8,
+        "players": [
+            # first player won once, the last one dealt in once
+            {"name": name, "position": i + 1, "scores": scores[i], "wins": int(i == 0), "deal_ins": int(i == 3)}
+            for i, name in enumerate(names_by_position)
+        ],
+    }
@@ -0,0 +1,67 @@
+import random
+
+from game.bots_battle.battle_config import BattleConfig
+from game.bots_battle.game_manager import GameManager
+from game.bots_battle.local_client import LocalClient
+from game.bots_battle.wall import Wall
+
+
+def test_wall_is_stable_for_the_seed():
+    manager = GameManager([], "", "", seed_value=12345)
+
+    wall = manager._generate_wall()
+    assert sorted(wall) == list(range(0, 136))
+    # walls from our seeds shouldn't be changed, otherwise old battle results can't be reproduced
+    assert wall[:14] == [58, 40, 64, 26, 76, 61, 94, 121, 23, 46, 97, 33, 41, 60]
+
+    manager.round_number = 1
+    assert manager._generate_wall()[:14] == [104, 81, 110, 55, 58, 53, 105, 17, 80, 117, 113, 41, 100, 74]
+
+    manager.round_number = 0
+    assert manager._generate_wall() == wall
+
+
+def test_wall_does_not_depend_on_global_random():
+    first_manager = GameManager([], "", "", seed_value=12345)
+    second_manager = GameManager([], "", "", seed_value=12345)
+
+    random.seed(1)
+    first_wall = first_manager._generate_wall()
+    random.seed(2)
+    # other game with the own random generator
+    GameManager([], "", "", seed_value=1)._generate_wall()
+    assert second_manager._generate_wall() == first_wall
+
+
+def test_wall_draws():
+    wall = Wall(list(range(0, 136)))
+    assert wall.dead_wall == list(range(0, 14))
+    assert wall.dora_indicator(0) == 2
+    assert wall.ura_dora_indicator(0) == 9
+    assert len(wall) == 122
+
+    assert wall.draw_tiles(4) == [14, 15, 16, 17]
+    assert wall.draw_tile() == 18
+    # dead wall is replenished from the live wall end
+    assert wall.draw_rinshan_tile() == 135
+    assert wall.dora_indicator(1) == 3
+    assert len(wall) == 116
+
+    while len(wall) > 1:
+        wall.draw_tile()
+    assert wall.draw_tile() == 134
+    assert len(wall) == 0
+
+
+def test_duplicate_seats_rotation():
+    seats = []
+    for seat_rotation in range(0, 4):
+        clients = [LocalClient(BattleConfig.CLIENTS_CONFIGS[x](), False, "", 0) for x in range(0, 4)]
+        manager = GameManager(clients, "", "", seed_value=12345, seat_rotation=seat_rotation)
+        manager.init_game()
+        assert [x.seat for x in manager.clients] == [0, 1, 2, 3]
+        seats.append([x.player.name for x in manager.clients])
+
+    # each bot plays from each seat
+    for seat_rotation in range(1, 4):
+        assert seats[seat_rotation] == seats[0][-seat_rotation:] + seats[0][:-seat_rotation]
@@ -0,0 +1,75 @@
+import random
+
+from game.bots_battle.sequential_test import PlacementSequentialTest, _normal_quantile
+
+
+def test_better_bot_is_found():
+    rand = random.Random(1)
+    sequential_test = PlacementSequentialTest("A", "B", delta=3, confidence=0.95)
+
+    seed_value = 0
+    while not sequential_test.is_finished:
+        seed_value += 1
+        # A takes the first place two times more often than B
+        names = ["A", "B", "C", "D"]
+        rand.shuffle(names)
+        if names[0] == "B" and rand.random() < 0.5:
+            a_index = names.index("A")
+            names[0], names[a_index] = "A", "B"
+        sequential_test.add_result(_make_result(seed_value, names))
+        assert seed_value < 10000
+
+    assert sequential_test.status == PlacementSequentialTest.ACCEPTED
+    assert sequential_test.llr >= sequential_test.upper_bound
+    low, high = sequential_test.confidence_interval(sequential_test.points_differences)
+    assert 0 < low < high
+
+
+def test_equal_bots_are_not_better():
+    rand = random.Random(1)
+    sequential_test = PlacementSequentialTest("A", "B", delta=3, confidence=0.95)
+
+    seed_value = 0
+    while not sequential_test.is_finished:
+        seed_value += 1
+        names = ["A", "B", "C", "D"]
+        rand.shuffle(names)
+        sequential_test.add_result(_make_result(seed_value, names))
+        assert seed_value < 10000
+
+    assert sequential_test.status == PlacementSequentialTest.REJECTED
+    assert "A is not better than B by 3 points" in sequential_test.build_report()[0]
+
+
+def test_duplicate_games_are_one_observation():
+    sequential_test = PlacementSequentialTest("A", "B", games_per_seed=4)
+
+    sequential_test.add_result(_make_result(1, ["A", "B", "C", "D"]))
+    sequential_test.add_result(_make_result(1, ["B", "C", "D", "A"]))
+    sequential_test.add_result(_make_result(1, ["C", "D", "A", "B"]))
+    assert sequential_test.points_differences == []
+
+    sequential_test.add_result(_make_result(1, ["A", "D", "B", "C"]))
+    # A has 30 + -30 + -10 + 30, B has 10 + 30 + -30 + -10
+    assert sequential_test.points_differences == [5]
+    assert sequential_test.status is None
+
+    # the group with crashed game is skipped
+    for _ in range(0, 3):
+        sequential_test.add_result(_make_result(2, ["A", "B", "C", "D"]))
+    sequential_test.add_result(_make_result(2, [], crashed=True))
+    assert sequential_test.points_differences == [5]
+
+
+def test_normal_quantile():
+    assert round(_normal_quantile(0.975), 3) == 1.96
+    assert round(_normal_quantile(0.5), 3) == 0
+
+
+def _make_result(seed_value, names_by_position, crashed=False):
+    scores = [40000, 30000, 20000, 10000]
+    return {
+        "seed": seed_value,
+        "crashed": crashed,
+        "players": [{"name": name, "position": i + 1, "scores": scores[i]} for i, name in enumerate(names_by_position)],
+    }
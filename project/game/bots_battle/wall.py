@@ -0,0 +1,53 @@
+from typing import List
+
+
+class Wall:
+    """
+    Shuffled tiles of the round, the dead wall is cut from the beginning of them.
+    Tiles are never copied or removed: live wall tiles are drawn from the head cursor
+    and rinshan tiles from the tail cursor (dead wall takes the last live wall tile instead of the drawn one),
+    so each draw is O(1).
+    """
+
+    DEAD_WALL_SIZE = 14
+    # dead wall indices of dora and ura dora indicators
+    DORA_INDICATOR_INDEX = 2
+    URA_DORA_INDICATOR_INDEX = 9
+
+    def __init__(self, tiles: List[int]):
+        self.tiles = tiles
+        self.head = self.DEAD_WALL_SIZE
+        self.tail = len(tiles)
+
+    def __len__(self):
+        """
+        Number of tiles remaining in the live wall
+        """
+        return self.tail - self.head
+
+    def draw_tile(self) -> int:
+        assert self.head < self.tail, "Live wall is empty"
+        tile = self.tiles[self.head]
+        self.head += 1
+        return tile
+
+    def draw_tiles(self, count_of_tiles: int) -> List[int]:
+        assert self.head + count_of_tiles <= self.tail, "Live wall is empty"
+        result = self.tiles[self.head : self.head + count_of_tiles]
+        self.head += count_of_tiles
+        return result
+
+    def draw_rinshan_tile(self) -> int:
+        assert self.head < self.tail, "Live wall is empty"
+        self.tail -= 1
+        return self.tiles[self.tail]
+
+    def dora_indicator(self, number: int) -> int:
+        return self.tiles[self.DORA_INDICATOR_INDEX + number]
+
+    def ura_dora_indicator(self, number: int) -> int:
+        return self.tiles[self.URA_DORA_INDICATOR_INDEX + number]
+
+    @property
+    def dead_wall(self) -> List[int]:
+        return self.tiles[0 : self.DEAD_WALL_SIZE]
@@ -2,17 +2,17 @@ from typing import Optional
 
 import utils.decisions_constants as log
 from game.ai.configs.default import BotDefaultConfig
+from game.ai.helpers.hand_state import HandState
 from game.ai.main import MahjongAI
 from mahjong.constants import CHUN, EAST, HAKU, HATSU, NORTH, SOUTH, WEST
 from mahjong.tile import Tile, TilesConverter
 from utils.decisions_logger import DecisionsLogger, MeldPrint
+from utils.general import mask_to_tiles_34, tiles_34_to_mask
 
 
 class PlayerInterface:
     table = None
     discards = None
-    tiles = None
-    melds = None
     round_step = None
 
     # current player seat
@@ -38,6 +38,17 @@ class PlayerInterface:
     is_oikake_riichi_against_dealer_riichi_threat: bool = False
     is_riichi_against_open_hand_threat: bool = False
 
+    # incremented on each change of player tiles or melds, cached hand views are rebuilt after it
+    state_version = 0
+    _tiles = None
+    _melds = None
+
+    # cached hand views and player state they were built for
+    _hand_state: Optional[HandState] = None
+    _hand_state_key = None
+    _hand_views = None
+    _hand_views_key = None
+
     def __init__(self, table, seat, dealer_seat):
         self.table = table
         self.seat = seat
@@ -93,16 +104,17 @@ class PlayerInterface:
             self.tiles.append(meld.called_tile)
 
         self.melds.append(meld)
+        self.state_version += 1
 
     def add_discarded_tile(self, tile: Tile):
         self.discards.append(tile)
 
         # all tiles that were discarded after player riichi will be safe against him
         # because of furiten
-        tile = tile.value // 4
+        tile_bit = 1 << (tile.value // 4)
         for player in self.table.players[1:]:
-            if player.in_riichi and tile not in player.safe_tiles:
-                player.safe_tiles.append(tile)
+            if player.in_riichi:
+                player.riichi_safe_tiles_mask |= tile_bit
 
         # one discard == one round step
         self.round_step += 1
@@ -124,10 +136,45 @@ class PlayerInterface:
     def is_dealer(self):
         return self.seat == self.dealer_seat
 
+    @property
+    def tiles(self):
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, value):
+        self._tiles = value
+        self.state_version += 1
+
+    @property
+    def melds(self):
+        return self._melds
+
+    @melds.setter
+    def melds(self, value):
+        self._melds = value
+        self.state_version += 1
+
+    @property
+    def hand_state(self) -> HandState:
+        """
+        Snapshot of the current hand, it is rebuilt only when tiles or melds were changed
+        """
+        key = self._get_hand_views_key()
+        if self._hand_state_key != key:
+            self._hand_state_key = key
+            self._hand_state = HandState.from_tiles(self.tiles, self.meld_tiles)
+        return self._hand_state
+
     @property
     def is_open_hand(self):
-        opened_melds = [x for x in self.melds if x.opened]
-        return len(opened_melds) > 0
+        return self._get_hand_views()[3]
+
+    @property
+    def closed_hand(self):
+        """
+        Array of 136 tiles format without tiles from melds
+        """
+        return list(self._get_hand_views()[0])
 
     @property
     def meld_tiles(self):
@@ -135,10 +182,7 @@ class PlayerInterface:
         Array of 136 tiles format
         :return:
         """
-        result = []
-        for meld in self.melds:
-            result.extend(meld.tiles)
-        return result
+        return list(self._get_hand_views()[1])
 
     @property
     def meld_34_tiles(self):
@@ -146,20 +190,39 @@ class PlayerInterface:
         Array of array with 34 tiles indices
         :return: array
         """
-        melds = [x.tiles[:] for x in self.melds]
-        results = []
-        for meld in melds:
-            meld_34 = [meld[0] // 4, meld[1] // 4, meld[2] // 4]
-            # kan
-            if len(meld) > 3:
-                meld_34.append(meld[3] // 4)
-            results.append(meld_34)
-        return results
+        return [list(x) for x in self._get_hand_views()[2]]
 
     @property
     def valued_honors(self):
         return [CHUN, HAKU, HATSU, self.table.round_wind_tile, self.player_wind]
 
+    def _get_hand_views_key(self):
+        # tiles and melds lists can be changed in place (in tests or emulated discards),
+        # so we check their sizes in addition to the state version
+        return self.state_version, len(self._tiles), len(self._melds)
+
+    def _get_hand_views(self):
+        """
+        Closed hand, meld tiles, meld 34 tiles and open hand flag.
+        They are read many times per decision, so we rebuild them only after player state changes.
+        """
+        key = self._get_hand_views_key()
+        if self._hand_views_key != key:
+            meld_tiles = []
+            meld_34_tiles = []
+            for meld in self._melds:
+                meld_tiles.extend(meld.tiles)
+                meld_34_tiles.append(tuple([x // 4 for x in meld.tiles[:4]]))
+            meld_tiles_set = set(meld_tiles)
+            self._hand_views = (
+                tuple([x for x in self._tiles if x not in meld_tiles_set]),
+                tuple(meld_tiles),
+                tuple(meld_34_tiles),
+                any([x.opened for x in self._melds]),
+            )
+            self._hand_views_key = key
+        return self._hand_views
+
 
 class Player(PlayerInterface):
     ai: Optional[MahjongAI] = None
@@ -197,14 +260,12 @@ class Player(PlayerInterface):
 
         self.logger.debug(log.DRAW, context=context)
 
-        # it is important to recalculate all threats here
-        self.ai.defence.erase_threats_cache()
+        # tile draw is a table event too
+        self.table.version += 1
 
         self.last_draw = tile_136
-        self.tiles.append(tile_136)
-
         # we need sort it to have a better string presentation
-        self.tiles = sorted(self.tiles)
+        self.tiles = sorted(self.tiles + [tile_136])
 
         self.ai.draw_tile(tile_136)
 
@@ -220,23 +281,20 @@ class Player(PlayerInterface):
         # to recalculate revealed tiles and etc.
         self.table.add_discarded_tile(0, tile_to_discard, is_tsumogiri)
         self.tiles.remove(tile_to_discard)
+        self.state_version += 1
 
         return tile_to_discard, with_riichi
 
     def should_call_kan(self, tile, open_kan, from_riichi=False):
-        self.ai.defence.erase_threats_cache()
         return self.ai.kan.should_call_kan(tile, open_kan, from_riichi)
 
     def should_call_win(self, tile, is_tsumo, enemy_seat=None, is_chankan=False):
-        self.ai.defence.erase_threats_cache()
         return self.ai.should_call_win(tile, is_tsumo, enemy_seat, is_chankan)
 
     def should_call_kyuushu_kyuuhai(self):
-        self.ai.defence.erase_threats_cache()
         return self.ai.should_call_kyuushu_kyuuhai()
 
     def try_to_call_meld(self, tile, is_kamicha_discard):
-        self.ai.defence.erase_threats_cache()
         return self.ai.try_to_call_meld(tile, is_kamicha_discard)
 
     def enemy_called_riichi(self, player_seat):
@@ -286,45 +344,69 @@ class Player(PlayerInterface):
             ]
         )
 
-    @property
-    def closed_hand(self):
-        tiles = self.tiles[:]
-        return [item for item in tiles if item not in self.meld_tiles]
-
 
 class EnemyPlayer(PlayerInterface):
-    # array of tiles in 34 tile format
-    safe_tiles = None
+    # safe tiles are stored as 34 bits masks, one bit for each tile in 34 format
+    # tiles discarded by the player
+    genbutsu_mask = 0
+    # tiles discarded by other players after player riichi
+    riichi_safe_tiles_mask = 0
     # tiles that were discarded in the current "step"
     # so, for example kamicha discard will be a safe tile for all players
-    temporary_safe_tiles = None
+    temporary_safe_tiles_mask = 0
 
     riichi_tile_136 = None
 
     def erase_state(self):
         super().erase_state()
 
-        self.safe_tiles = []
-        self.temporary_safe_tiles = []
+        self.genbutsu_mask = 0
+        self.riichi_safe_tiles_mask = 0
+        self.temporary_safe_tiles_mask = 0
         self.riichi_tile_136 = None
 
     def add_discarded_tile(self, tile: Tile):
         super().add_discarded_tile(tile)
 
-        tile = tile.value // 4
-        if tile not in self.safe_tiles:
-            self.safe_tiles.append(tile)
+        tile_bit = 1 << (tile.value // 4)
+        self.genbutsu_mask |= tile_bit
 
         # erase temporary furiten after tile draw
-        self.temporary_safe_tiles = []
-        affected_players = [1, 2, 3]
-        affected_players.remove(self.seat)
+        self.temporary_safe_tiles_mask = 0
 
         # temporary furiten, for one "step"
-        for x in affected_players:
-            if tile not in self.table.get_player(x).temporary_safe_tiles:
-                self.table.get_player(x).temporary_safe_tiles.append(tile)
+        for x in [1, 2, 3]:
+            if x != self.seat:
+                self.table.get_player(x).temporary_safe_tiles_mask |= tile_bit
+
+    @property
+    def safe_tiles_mask(self) -> int:
+        return self.genbutsu_mask | self.riichi_safe_tiles_mask
+
+    @property
+    def all_safe_tiles_mask(self) -> int:
+        return self.genbutsu_mask | self.riichi_safe_tiles_mask | self.temporary_safe_tiles_mask
+
+    @property
+    def safe_tiles(self):
+        """
+        Array of tiles in 34 tile format
+        """
+        return mask_to_tiles_34(self.safe_tiles_mask)
+
+    @safe_tiles.setter
+    def safe_tiles(self, tiles_34):
+        self.genbutsu_mask = tiles_34_to_mask(tiles_34)
+        self.riichi_safe_tiles_mask = 0
+
+    @property
+    def temporary_safe_tiles(self):
+        return mask_to_tiles_34(self.temporary_safe_tiles_mask)
+
+    @temporary_safe_tiles.setter
+    def temporary_safe_tiles(self, tiles_34):
+        self.temporary_safe_tiles_mask = tiles_34_to_mask(tiles_34)
 
     @property
     def all_safe_tiles(self):
-        return list(set(self.temporary_safe_tiles + self.safe_tiles))
+        return mask_to_tiles_34(self.all_safe_tiles_mask)
@@ -1,5 +1,5 @@
 from game.player import EnemyPlayer, Player
-from mahjong.constants import EAST, NORTH, SOUTH, WEST
+from mahjong.constants import AKA_DORA_LIST, EAST, NORTH, SOUTH, WEST
 from mahjong.tile import Tile, TilesConverter
 from mahjong.utils import plus_dora
 from utils.decisions_logger import MeldPrint
@@ -25,9 +25,20 @@ class Table:
 
     meld_was_called = False
 
+    # incremented on each table event, turn-scoped AI caches are invalidated by it
+    version = 0
+
     # array of tiles in 34 format
     revealed_tiles = None
     revealed_tiles_136 = None
+    # for each seat one bit for each discarded tile in 34 format, used to find suji
+    discards_masks = None
+    # running counters of dora (without aka dora) and aka dora in revealed tiles
+    revealed_dora_count = 0
+    revealed_aka_dora_count = 0
+    # number of dora for each tile in 34 format (without aka dora) and dora indicators it was built for
+    _dora_34 = None
+    _dora_34_key = None
 
     # bot is playing mainly with ari-ari rules, so we can have them as default
     has_open_tanyao = True
@@ -38,6 +49,10 @@ class Table:
         self.dora_indicators = []
         self.revealed_tiles = [0] * 34
         self.revealed_tiles_136 = []
+        self.discards_masks = [0] * self.count_of_players
+        self.revealed_dora_count = 0
+        self.revealed_aka_dora_count = 0
+        self._dora_34_key = None
 
     def __str__(self):
         dora_string = TilesConverter.to_one_line_string(
@@ -54,6 +69,7 @@ class Table:
 
         # we need it to properly display log for each round
         self.round_number += 1
+        self.version += 1
 
         self.meld_was_called = False
         self.dealer_seat = dealer_seat
@@ -63,6 +79,10 @@ class Table:
 
         self.revealed_tiles = [0] * 34
         self.revealed_tiles_136 = []
+        self.discards_masks = [0] * self.count_of_players
+        self.revealed_dora_count = 0
+        self.revealed_aka_dora_count = 0
+        self._dora_34_key = None
 
         self.dora_indicators = []
         self.add_dora_indicator(dora_indicator)
@@ -86,11 +106,17 @@ class Table:
                 i += 1
 
     def erase_state(self):
+        self.version += 1
         self.dora_indicators = []
         self.revealed_tiles = [0] * 34
         self.revealed_tiles_136 = []
+        self.discards_masks = [0] * self.count_of_players
+        self.revealed_dora_count = 0
+        self.revealed_aka_dora_count = 0
+        self._dora_34_key = None
 
     def add_called_meld(self, player_seat, meld):
+        self.version += 1
         self.meld_was_called = True
 
         # if meld was called from the other player, then we skip one draw from the wall
@@ -128,6 +154,7 @@ class Table:
         """
         We need to mark player in riichi to properly defence against his riichi tile discard
         """
+        self.version += 1
         player = self.get_player(player_seat)
         player.in_riichi = True
 
@@ -136,6 +163,7 @@ class Table:
             self.player.enemy_called_riichi(player_seat)
 
     def add_called_riichi_step_two(self, player_seat):
+        self.version += 1
         player = self.get_player(player_seat)
 
         if player.scores is not None:
@@ -165,7 +193,7 @@ class Table:
                     continue
 
                 for tile in meld.tiles:
-                    dora_number += plus_dora(tile, self.dora_indicators, add_aka_dora=self.has_aka_dora)
+                    dora_number += self.is_dora(tile)
 
                 if dora_number >= 3:
                     open_hand_threat = True
@@ -177,6 +205,7 @@ class Table:
         :param tile_136: 136 format tile
         :param is_tsumogiri: was tile discarded from hand or not
         """
+        self.version += 1
         if player_seat != 0:
             self.count_of_remaining_tiles -= 1
 
@@ -184,17 +213,35 @@ class Table:
         tile.riichi_discard = False
         player = self.get_player(player_seat)
         player.add_discarded_tile(tile)
+        self.discards_masks[player_seat] |= 1 << (tile_136 // 4)
 
         self._add_revealed_tile(tile_136)
 
         player.is_ippatsu = False
 
     def add_dora_indicator(self, tile):
+        self.version += 1
         self.dora_indicators.append(tile)
         self._add_revealed_tile(tile)
 
     def is_dora(self, tile):
-        return plus_dora(tile, self.dora_indicators, add_aka_dora=self.has_aka_dora)
+        """
+        Number of dora for the tile (including aka dora), the same as plus_dora gives
+        """
+        dora_count = self._get_dora_34()[tile // 4]
+        if self.has_aka_dora and tile in AKA_DORA_LIST:
+            dora_count += 1
+        return dora_count
+
+    @property
+    def count_of_revealed_dora(self):
+        """
+        Number of dora (including aka dora) in all revealed tiles
+        """
+        self._get_dora_34()
+        if self.has_aka_dora:
+            return self.revealed_dora_count + self.revealed_aka_dora_count
+        return self.revealed_dora_count
 
     def set_players_scores(self, scores, uma=None):
         for i in range(0, len(scores)):
@@ -236,11 +283,30 @@ class Table:
     def is_common_yakuhai(self, tile_34):
         return is_sangenpai(tile_34) or tile_34 == self.round_wind_tile
 
+    def _get_dora_34(self):
+        # new kan dora changes number of dora for already revealed tiles,
+        # dora indicators list can be changed outside of the table (in tests), so we check it here
+        if not self._is_dora_34_actual():
+            self._dora_34 = [plus_dora(x * 4, self.dora_indicators) for x in range(0, 34)]
+            self._dora_34_key = (self.dora_indicators, len(self.dora_indicators))
+            self.revealed_dora_count = sum([x * y for x, y in zip(self._dora_34, self.revealed_tiles)])
+        return self._dora_34
+
+    def _is_dora_34_actual(self):
+        key = self._dora_34_key
+        return key is not None and key[0] is self.dora_indicators and key[1] == len(self.dora_indicators)
+
     def _add_revealed_tile(self, tile):
         self.revealed_tiles_136.append(tile)
         tile_34 = tile // 4
         self.revealed_tiles[tile_34] += 1
 
+        if tile in AKA_DORA_LIST:
+            self.revealed_aka_dora_count += 1
+        # otherwise counter is recalculated with the new dora indicators
+        if self._is_dora_34_actual():
+            self.revealed_dora_count += self._dora_34[tile_34]
+
         assert (
             self.revealed_tiles[tile_34] <= 4
         ), f"we have only 4 tiles in the game: {TilesConverter.to_one_line_string([tile])}"
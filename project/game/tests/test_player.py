@@ -1,7 +1,7 @@
 from game.table import Table
 from mahjong.constants import EAST, NORTH, SOUTH, WEST
 from utils.decisions_logger import MeldPrint
-from utils.test_helpers import make_meld, string_to_136_array
+from utils.test_helpers import make_meld, string_to_34_tile, string_to_136_array, string_to_136_tile
 
 
 def test_can_call_riichi_and_tempai():
@@ -122,3 +122,67 @@ def test_player_called_meld_and_closed_hand():
     player.add_called_meld(make_meld(MeldPrint.PON, honors="555"))
 
     assert len(player.closed_hand) == 10
+
+
+def test_player_hand_views_are_rebuilt_after_changes():
+    table = Table()
+    player = table.player
+
+    player.init_hand(string_to_136_array(sou="123678", pin="3599", honors="555"))
+    version = player.state_version
+    assert player.meld_34_tiles == []
+    assert not player.is_open_hand
+
+    # views are not rebuilt without changes
+    closed_hand = player.closed_hand
+    closed_hand.pop()
+    assert len(player.closed_hand) == 13
+    assert player.state_version == version
+
+    player.add_called_meld(make_meld(MeldPrint.PON, honors="555"))
+    assert player.state_version > version
+    assert player.meld_34_tiles == [[31, 31, 31]]
+    assert player.is_open_hand
+
+    # in place changes are visible too
+    player.tiles.remove(player.closed_hand[0])
+    assert len(player.closed_hand) == 9
+    player.melds.pop()
+    assert len(player.closed_hand) == 12
+    assert not player.is_open_hand
+
+
+def test_enemy_safe_tiles():
+    table = Table()
+    enemy = table.get_player(2)
+
+    table.add_discarded_tile(2, string_to_136_tile(sou="5"), False)
+    table.add_discarded_tile(2, string_to_136_tile(man="1"), False)
+    table.add_discarded_tile(2, string_to_136_array(sou="55")[1], False)
+    assert enemy.safe_tiles == [string_to_34_tile(man="1"), string_to_34_tile(sou="5")]
+    assert enemy.temporary_safe_tiles == []
+
+    # kamicha discard is safe for one step
+    table.add_discarded_tile(1, string_to_136_tile(pin="3"), False)
+    assert enemy.temporary_safe_tiles == [string_to_34_tile(pin="3")]
+    assert string_to_34_tile(pin="3") in enemy.all_safe_tiles
+    assert string_to_34_tile(pin="3") not in enemy.safe_tiles
+
+    # temporary furiten is erased after enemy discard
+    table.add_called_riichi_step_one(2)
+    table.add_discarded_tile(2, string_to_136_tile(honors="1"), False)
+    table.add_called_riichi_step_two(2)
+    assert enemy.temporary_safe_tiles == []
+    assert enemy.all_safe_tiles == enemy.safe_tiles
+
+    # tiles discarded after riichi are safe against riichi player
+    table.add_discarded_tile(0, string_to_136_tile(pin="9"), False)
+    table.add_discarded_tile(3, string_to_136_tile(honors="7"), False)
+    assert string_to_34_tile(pin="9") in enemy.safe_tiles
+    assert string_to_34_tile(honors="7") in enemy.safe_tiles
+    assert string_to_34_tile(pin="9") not in table.get_player(1).all_safe_tiles
+
+    assert enemy.all_safe_tiles_mask == sum([1 << x for x in enemy.all_safe_tiles])
+
+    enemy.safe_tiles = [string_to_34_tile(man="9")]
+    assert enemy.safe_tiles == [string_to_34_tile(man="9")]
@@ -1,5 +1,8 @@
+import random
+
 from game.table import Table
 from mahjong.constants import EAST, FIVE_RED_MAN, FIVE_RED_PIN, FIVE_RED_SOU, NORTH, SOUTH, WEST
+from mahjong.utils import plus_dora
 from utils.test_helpers import string_to_136_tile
 
 
@@ -190,3 +193,57 @@ def test_round_wind():
 
     table.init_round(12, 0, 0, 0, 0, [])
     assert table.round_wind_tile == NORTH
+
+
+def test_discards_masks_and_suji():
+    table = Table()
+    suji = table.player.ai.suji
+
+    for tile in [string_to_136_tile(man="4"), string_to_136_tile(pin="1"), string_to_136_tile(pin="7")]:
+        table.add_discarded_tile(2, tile, False)
+    table.add_discarded_tile(1, string_to_136_tile(sou="5"), False)
+
+    enemy_discards = [x.value for x in table.get_player(2).discards]
+    assert sorted(suji.find_suji_for_mask(table.discards_masks[2])) == sorted(suji.find_suji(enemy_discards))
+    # 1-4-7 man and 1-4-7 pin
+    assert sorted(suji.find_suji_for_mask(table.discards_masks[2])) == [0, 3, 6, 9, 12, 15]
+    assert table.discards_masks[0] == 0
+
+    table.init_round(0, 0, 0, string_to_136_tile(sou="1"), 0, [250, 250, 250, 250])
+    assert table.discards_masks == [0, 0, 0, 0]
+
+
+def test_revealed_dora_counters():
+    rand = random.Random(42)
+
+    for _ in range(20):
+        table = Table()
+        tiles = list(range(0, 136))
+        rand.shuffle(tiles)
+
+        table.init_round(0, 0, 0, tiles.pop(), 0, [250, 250, 250, 250])
+        for step in range(0, 60):
+            if step % 20 == 19:
+                # new kan dora changes dora of already revealed tiles
+                table.add_dora_indicator(tiles.pop())
+            else:
+                table.add_discarded_tile(step % 4, tiles.pop(), False)
+
+            for has_aka_dora in [True, False]:
+                table.has_aka_dora = has_aka_dora
+                expected = sum(
+                    [plus_dora(x, table.dora_indicators, add_aka_dora=has_aka_dora) for x in table.revealed_tiles_136]
+                )
+                assert table.count_of_revealed_dora == expected
+                assert [table.is_dora(x) for x in range(0, 136)] == [
+                    plus_dora(x, table.dora_indicators, add_aka_dora=has_aka_dora) for x in range(0, 136)
+                ]
+
+    # dora indicators can be changed directly in tests
+    table = Table()
+    table.add_discarded_tile(1, string_to_136_tile(sou="2"), False)
+    assert table.count_of_revealed_dora == 0
+    table.dora_indicators = [string_to_136_tile(sou="1")]
+    assert table.count_of_revealed_dora == 1
+    table.dora_indicators.append(string_to_136_tile(sou="1"))
+    assert table.count_of_revealed_dora == 2
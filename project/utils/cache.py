@@ -1,13 +1,149 @@
 import hashlib
 import marshal
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional
 
 from utils.decisions_logger import MeldPrint
 
+SHARED_SHANTEN_CACHE = "shanten"
+SHARED_AGARI_CACHE = "agari"
 
-def build_shanten_cache_key(tiles_34: List[int], use_chiitoitsu: bool):
-    prepared_array = tiles_34 + [int(use_chiitoitsu)]
-    return hashlib.md5(marshal.dumps(prepared_array)).hexdigest()
+# caches shared by all bots in the current process, see enable_shared_caches
+_shared_caches = {}
+
+
+def build_shanten_cache_key(tiles_34: List[int], use_chiitoitsu: bool) -> int:
+    """
+    Pack 34 tiles array to the single int (one byte for each tile count)
+    with chiitoitsu flag in the lowest bit.
+    It is much cheaper than hashing and it is unique for each hand.
+    """
+    return int.from_bytes(bytes(tiles_34), "little") << 1 | use_chiitoitsu
+
+
+def build_agari_cache_key(tiles_34: List[int], melds_34: List[List[int]]):
+    return int.from_bytes(bytes(tiles_34), "little"), tuple(tuple(x) for x in melds_34)
+
+
+class LRUCache:
+    """
+    Cache with limited size, the least recently used item is evicted when the cache is full.
+    None values are not supported, since None is returned for missed keys.
+    """
+
+    def __init__(self, max_size: int):
+        assert max_size > 0
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._items.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SharedLRUCache(LRUCache):
+    """
+    LRU cache shared by several bots.
+    Each bot works with it through its own view, so we can count hits
+    for values calculated by other bots (i.e. how much we saved by sharing).
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size)
+        self.shared_hits = 0
+
+    def view(self, owner) -> "SharedLRUCacheView":
+        return SharedLRUCacheView(self, owner)
+
+    def stats(self):
+        stats = super().stats()
+        stats["shared_hits"] = self.shared_hits
+        return stats
+
+
+class SharedLRUCacheView:
+    """
+    Has the same interface as LRUCache, items are stored in the shared cache together with their owner.
+    """
+
+    def __init__(self, cache: SharedLRUCache, owner):
+        self.cache = cache
+        self.owner = owner
+
+    def __len__(self):
+        return len(self.cache)
+
+    def get(self, key):
+        item = self.cache.get(key)
+        if item is None:
+            return None
+
+        owner, value = item
+        if owner != self.owner:
+            self.cache.shared_hits += 1
+        return value
+
+    def set(self, key, value):
+        self.cache.set(key, (self.owner, value))
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def enable_shared_caches(shanten_cache_size: int = 200000, agari_cache_size: int = 50000):
+    """
+    All bots created after this call will use the same shanten and agari caches.
+    These results depend only on the hand tiles, so it is safe to share them between bots
+    with different configs.
+
+    Shared caches are kept for the process lifetime, so bots of the next games use them too.
+    Caches are not thread safe, bots that use them should play in the same thread.
+    Caches are not shared between processes, each process (e.g. battle worker) has its own copy.
+    """
+    _shared_caches[SHARED_SHANTEN_CACHE] = SharedLRUCache(shanten_cache_size)
+    _shared_caches[SHARED_AGARI_CACHE] = SharedLRUCache(agari_cache_size)
+
+
+def disable_shared_caches():
+    _shared_caches.clear()
+
+
+def get_shared_cache(name: str) -> Optional[SharedLRUCache]:
+    return _shared_caches.get(name)
 
 
 def build_estimate_hand_value_cache_key(
@@ -21,17 +157,28 @@ def build_estimate_hand_value_cache_key(
     additional_han: int,
     is_rinshan: bool,
     is_chankan: bool,
+    player_wind: int,
+    round_wind: int,
+    has_aka_dora: bool,
+    has_open_tanyao: bool,
 ):
+    """
+    Key contains everything that affects hand cost (including round context),
+    so cached values are valid across rounds and games.
+    """
     prepared_array = (
         tiles_136
         + [is_tsumo and 1 or 0]
         + [is_riichi and 1 or 0]
-        + (melds and [x.tiles for x in melds] or [])
+        + (melds and [[x.type, x.opened and 1 or 0, x.tiles] for x in melds] or [])
         + dora_indicators
         + [count_of_riichi_sticks]
         + [count_of_honba_sticks]
         + [additional_han]
         + [is_rinshan and 1 or 0]
         + [is_chankan and 1 or 0]
+        + [player_wind, round_wind]
+        + [has_aka_dora and 1 or 0]
+        + [has_open_tanyao and 1 or 0]
     )
     return hashlib.md5(marshal.dumps(prepared_array)).hexdigest()
@@ -3,6 +3,7 @@ DRAW = "draw"
 DISCARD_OPTIONS = "discard_options"
 DISCARD = "discard"
 DISCARD_SAFE_TILE = "discard_safe_tile"
+DISCARD_TIME_BUDGET = "discard_time_budget"
 
 KAN_DEBUG = "kan_debug"
 
@@ -5,6 +5,9 @@ from typing import List
 from mahjong.constants import EAST
 from mahjong.utils import is_honor, is_man, is_pin, is_sou, simplify
 
+# one bit for each tile in 34 format
+ALL_TILES_MASK = (1 << 34) - 1
+
 
 # TODO move to mahjong lib
 def is_sangenpai(tile_34):
@@ -45,6 +48,23 @@ def is_dora_connector(tile_136: int, dora_indicators_136: List[int]) -> bool:
     return False
 
 
+def tiles_34_to_mask(tiles_34: List[int]) -> int:
+    """
+    Return 34 bits mask with one bit for each provided tile in 34 format
+    """
+    mask = 0
+    for tile_34 in tiles_34:
+        mask |= 1 << tile_34
+    return mask
+
+
+def mask_to_tiles_34(mask: int) -> List[int]:
+    """
+    Return sorted tiles in 34 format for 34 bits mask
+    """
+    return [x for x in range(0, 34) if mask >> x & 1]
+
+
 def make_random_letters_and_digit_string(length=15):
     random_chars = string.ascii_lowercase + string.digits
     return "".join(random.choice(random_chars) for _ in range(length))